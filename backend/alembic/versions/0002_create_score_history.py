@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    is_postgres = op.get_bind().dialect.name == "postgresql"
+
+    op.create_table(
+        "score_snapshots",
+        sa.Column(
+            "id",
+            sa.BigInteger().with_variant(sa.Integer, "sqlite"),
+            primary_key=True,
+            autoincrement=True,
+        ),
+        sa.Column("version", sa.Integer, nullable=False),
+        sa.Column("recorded_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("coins", sa.Integer, nullable=False),
+        sa.Column("themes", sa.JSON, nullable=False),
+    )
+    op.create_index("ix_score_snapshots_recorded_at", "score_snapshots", ["recorded_at"])
+
+    # Monthly partitions are created on demand by the history writer.
+    op.create_table(
+        "score_history",
+        sa.Column("coin", sa.String(length=64), nullable=False),
+        sa.Column("recorded_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("version", sa.Integer, nullable=False),
+        sa.Column("score", sa.Float, nullable=False),
+        sa.Column(
+            "theme_scores", sa.JSON().with_variant(postgresql.JSONB, "postgresql"), nullable=False
+        ),
+        sa.PrimaryKeyConstraint("coin", "recorded_at"),
+        postgresql_partition_by="RANGE (recorded_at)",
+    )
+    if is_postgres:
+        op.create_index(
+            "ix_score_history_recorded_at_brin",
+            "score_history",
+            ["recorded_at"],
+            postgresql_using="brin",
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("score_history")
+    op.drop_index("ix_score_snapshots_recorded_at", table_name="score_snapshots")
+    op.drop_table("score_snapshots")
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "score_rollups",
+        sa.Column("coin", sa.String(length=64), nullable=False),
+        sa.Column("resolution", sa.String(length=8), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("open", sa.Float, nullable=False),
+        sa.Column("high", sa.Float, nullable=False),
+        sa.Column("low", sa.Float, nullable=False),
+        sa.Column("close", sa.Float, nullable=False),
+        sa.Column("samples", sa.Integer, nullable=False),
+        sa.PrimaryKeyConstraint("coin", "resolution", "bucket_start"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("score_rollups")
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Serves the retention pruning of the fine rollups.
+    op.create_index(
+        "ix_score_rollups_resolution_bucket_start",
+        "score_rollups",
+        ["resolution", "bucket_start"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_score_rollups_resolution_bucket_start", table_name="score_rollups")
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Hashable, Iterable
+
+from fastapi import Request, Response, status
+from starlette.concurrency import run_in_threadpool
+
+from ..core.serialization import JSON, MEDIA_TYPES, WireFormat, negotiate
+from ..services.response_cache import CachedBody, get_response_cache
+from ..services.singleflight import SingleFlight
+
+ENCODING_PREFERENCE = ("br", "gzip")
+
+
+def _accepted_encodings(header: str) -> dict[str, float]:
+    """Quality of every coding named in ``Accept-Encoding``, ``*`` included."""
+
+    accepted = {}
+    for part in header.split(","):
+        name, *params = (item.strip() for item in part.split(";"))
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            accepted[name.lower()] = quality
+    return accepted
+
+
+def _negotiate_encoding(header: str, available: Iterable[str]) -> str | None:
+    """Best of ``available`` codings for ``header``: a name, ``"identity"`` or ``None``.
+
+    ``None`` means the client refused every coding, ``identity`` included.
+    """
+
+    accepted = _accepted_encodings(header)
+    wildcard = accepted.get("*")
+    best, best_quality = None, 0.0
+    for encoding in ENCODING_PREFERENCE:
+        quality = accepted.get(encoding, wildcard or 0.0)
+        if encoding in available and quality > best_quality:
+            best, best_quality = encoding, quality
+    # An unlisted identity stays acceptable, as a last resort.
+    identity = accepted.get("identity", wildcard)
+    if best is not None and (identity is None or best_quality >= identity):
+        return best
+    if identity is None or identity > 0:
+        return "identity"
+    return None
+
+
+def response_format(request: Request) -> WireFormat:
+    """Wire format the client asked for with ``Accept`` (JSON unless MessagePack is preferred)."""
+
+    return negotiate(request.headers.get("accept"))
+
+
+async def cached_body(
+    flight: SingleFlight, key: Hashable, render: Callable[[], bytes]
+) -> CachedBody:
+    """Return the cached body for ``key``, rendering it once off the loop on a miss."""
+
+    cache = get_response_cache()
+    entry = cache.get(key)
+    if entry is None:
+        entry = await flight.do(key, lambda: run_in_threadpool(cache.fill, key, render))
+    return entry
+
+
+def cached_response(
+    request: Request, entry: CachedBody, fmt: WireFormat = "json"
+) -> Response:
+    """Answer with ``304`` when the client has ``entry``, else its best-compressed body.
+
+    The coding is negotiated first, so a ``304`` carries the same coding-specific
+    ETag as the ``200`` it revalidates.
+    """
+
+    media_type = MEDIA_TYPES.get(fmt, JSON)
+    headers = {"Cache-Control": "no-cache", "Vary": "Accept, Accept-Encoding"}
+    encoding = _negotiate_encoding(request.headers.get("accept-encoding", ""), entry.encoded)
+    if encoding is None:
+        return Response(status_code=status.HTTP_406_NOT_ACCEPTABLE, headers=headers)
+    coding = None if encoding == "identity" else encoding
+    headers["ETag"] = entry.etag_for(coding)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and entry.matches(if_none_match, coding):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if coding is None:
+        return Response(entry.body, media_type=media_type, headers=headers)
+    headers["Content-Encoding"] = coding
+    return Response(entry.encoded[coding], media_type=media_type, headers=headers)
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 from fastapi import Depends, Header, HTTPException, status
+from starlette.concurrency import run_in_threadpool
 
 from ..core import rbac
-from ..core.security import AuthenticatedUser, decode_token
-from ..db.session import get_session
+from ..core.security import AuthenticatedUser, cached_user, decode_token
+from ..db.session import get_read_session, get_session
+from ..services.singleflight import SingleFlight, get_single_flight
 
 
 async def get_db():
@@ -12,16 +14,31 @@ async def get_db():
         yield session
 
 
+async def get_read_db():
+    async with get_read_session() as session:
+        yield session
+
+
 async def get_current_user(authorization: str = Header(..., alias="Authorization")) -> AuthenticatedUser:
     token = authorization.removeprefix("Bearer ")
-    return decode_token(token)
+    user = cached_user(token)
+    if user is not None:
+        return user
+    # A cold or rotated key set is fetched over blocking HTTP.
+    return await run_in_threadpool(decode_token, token)
 
 
 def require_role(resource: str, action: str):
     async def dependency(user: AuthenticatedUser = Depends(get_current_user)) -> AuthenticatedUser:
-        for role in user.roles:
-            if rbac.authorize(role, resource, action):
-                return user
+        if rbac.authorize_any(user.roles, resource, action):
+            return user
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
 
     return dependency
+
+
+def single_flight(name: str):
+    def dependency() -> SingleFlight:
+        return get_single_flight(name)
+
+    return dependency
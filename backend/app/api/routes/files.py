@@ -1,11 +1,19 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+import uuid
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 
 from ...api import deps
+from ...core.config import get_settings
 from ...core.security import AuthenticatedUser
 from ...services.files import get_file_service
+from ...services.ingestion import DatasetFormat, UnsupportedFormat, detect_format
+from ...tasks.ingest import ingest_dataset
+from ...tasks.jobs import get_job_store
 
 router = APIRouter(prefix="/files", tags=["files"])
 
@@ -15,11 +23,63 @@ class SignRequest(BaseModel):
     expires_in: int = Field(ge=1, le=3600)
 
 
+class BatchSignRequest(BaseModel):
+    object_names: list[Annotated[str, Field(pattern=r"^\S+$")]] = Field(..., min_length=1)
+    expires_in: int = Field(ge=1, le=3600)
+
+
+class IngestRequest(BaseModel):
+    object_name: str = Field(..., pattern=r"^\S+$")
+    format: DatasetFormat | None = None
+
+
 @router.post("/sign")
 async def sign_upload(
     payload: SignRequest,
     _: AuthenticatedUser = Depends(deps.require_role("files", "write")),
 ):
     service = get_file_service()
-    signature = service.create_upload_signature(payload.object_name, payload.expires_in)
+    signature = await run_in_threadpool(
+        service.create_upload_signature, payload.object_name, payload.expires_in
+    )
     return {"url": signature["url"], "fields": signature["fields"]}
+
+
+@router.post("/sign/batch")
+async def sign_uploads(
+    payload: BatchSignRequest,
+    _: AuthenticatedUser = Depends(deps.require_role("files", "write")),
+):
+    limit = get_settings().files_sign_batch_max
+    if len(payload.object_names) > limit:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {limit} objects per batch",
+        )
+    service = get_file_service()
+    signatures = await run_in_threadpool(
+        service.create_upload_signatures, payload.object_names, payload.expires_in
+    )
+    return {
+        "items": [
+            {"object_name": name, "url": signature["url"], "fields": signature["fields"]}
+            for name, signature in zip(payload.object_names, signatures)
+        ]
+    }
+
+
+@router.post("/ingest", status_code=202)
+async def schedule_ingestion(
+    payload: IngestRequest,
+    _: AuthenticatedUser = Depends(deps.require_role("files", "write")),
+) -> dict[str, str]:
+    try:
+        dataset_format, _compressed = detect_format(payload.object_name, payload.format)
+    except UnsupportedFormat as exc:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(exc)
+        ) from exc
+    job_id = uuid.uuid4().hex
+    await run_in_threadpool(get_job_store().create, job_id, "ingest")
+    await run_in_threadpool(ingest_dataset.send, payload.object_name, dataset_format, job_id)
+    return {"status": "scheduled", "job_id": job_id, "format": dataset_format}
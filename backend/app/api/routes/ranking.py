@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+
+from ...api import deps
+from ...api.caching import cached_body, cached_response, response_format
+from ...core.security import AuthenticatedUser
+from ...core.serialization import MSGPACK, WireFormat, encode
+from ...schemas.score import CoinRank, RankingPage
+from ...services.ranking import InvalidCursor, Rankings, UnknownTheme, get_rankings
+from ...services.singleflight import SingleFlight
+
+router = APIRouter(prefix="/ranking", tags=["scores"])
+
+
+def _render_page(
+    rankings: Rankings, limit: int, cursor: str | None, theme: str | None, fmt: WireFormat
+) -> bytes:
+    """Serialize a :class:`RankingPage`; the ranked items are encoded as they are."""
+
+    try:
+        version, items, next_cursor = rankings.page(limit, cursor, theme)
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+    except UnknownTheme as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Unknown theme") from exc
+    page = {
+        "version": version,
+        "theme": theme,
+        "items": items,
+        "next_cursor": next_cursor,
+    }
+    return encode(page, fmt)
+
+
+@router.get("", response_model=RankingPage, responses={200: {"content": {MSGPACK: {}}}})
+async def get_ranking(
+    request: Request,
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: str | None = Query(default=None),
+    theme: str | None = Query(default=None),
+    flight: SingleFlight = Depends(deps.single_flight("ranking")),
+    _: AuthenticatedUser = Depends(deps.require_role("stream", "read")),
+) -> Response:
+    rankings = get_rankings()
+    fmt = response_format(request)
+    entry = await cached_body(
+        flight,
+        ("ranking", rankings.version, theme, limit, cursor, fmt),
+        lambda: _render_page(rankings, limit, cursor, theme, fmt),
+    )
+    return cached_response(request, entry, fmt)
+
+
+@router.get("/{coin}", response_model=CoinRank)
+async def get_coin_rank(
+    coin: str,
+    theme: str | None = Query(default=None),
+    _: AuthenticatedUser = Depends(deps.require_role("stream", "read")),
+) -> CoinRank:
+    try:
+        ranked, total = get_rankings().rank(coin, theme)
+    except UnknownTheme as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Unknown theme") from exc
+    if ranked is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown coin")
+    return CoinRank(rank=ranked.rank, coin=ranked.coin, score=ranked.score, theme=theme, total=total)
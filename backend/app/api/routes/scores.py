@@ -1,23 +1,107 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+from datetime import datetime, timedelta, timezone
+from typing import Literal
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...api import deps
+from ...api.caching import cached_body, cached_response, response_format
+from ...core.config import get_settings
+from ...core.serialization import MSGPACK
 from ...core.security import AuthenticatedUser
+from ...schemas.score import ScoreHistoryPoint, ScoreHistoryRead, ScoreRead
+from ...services.score_history import (
+    RESOLUTIONS,
+    choose_resolution,
+    has_history,
+    load_rollups,
+    lttb,
+    retention_cutoffs,
+)
+from ...services.score_store import ScoreSnapshot, get_score_store
+from ...services.singleflight import SingleFlight
 
 router = APIRouter(prefix="/scores", tags=["scores"])
 
 
-def _mock_scores() -> list[dict[str, float | str]]:
-    return [
-        {"coin": "btc", "score": 0.91},
-        {"coin": "eth", "score": 0.87},
-        {"coin": "sol", "score": 0.84},
-    ]
+def resolve_theme(snapshot: ScoreSnapshot, theme: str | None) -> str | None:
+    if theme is not None and theme not in snapshot.themes:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Unknown theme")
+    return theme
 
 
-@router.get("")
+@router.get("", response_model=list[ScoreRead], responses={200: {"content": {MSGPACK: {}}}})
 async def list_scores(
+    request: Request,
+    theme: str | None = Query(default=None),
+    flight: SingleFlight = Depends(deps.single_flight("scores")),
     _: AuthenticatedUser = Depends(deps.require_role("stream", "read")),
-) -> list[dict[str, float | str]]:
-    return _mock_scores()
+) -> Response:
+    snapshot = get_score_store().snapshot
+    theme = resolve_theme(snapshot, theme)
+    fmt = response_format(request)
+    entry = await cached_body(
+        flight, ("scores", snapshot.version, theme, fmt), lambda: snapshot.render(theme, fmt)
+    )
+    return cached_response(request, entry, fmt)
+
+
+def _as_utc(moment: datetime) -> datetime:
+    return moment.replace(tzinfo=timezone.utc) if moment.tzinfo is None else moment
+
+
+@router.get("/{coin}/history", response_model=ScoreHistoryRead)
+async def get_score_history(
+    coin: str,
+    start: datetime | None = Query(default=None),
+    end: datetime | None = Query(default=None),
+    resolution: Literal["5m", "1h", "1d"] | None = Query(default=None),
+    max_points: int | None = Query(default=None, ge=3, le=5000),
+    db: AsyncSession = Depends(deps.get_read_db),
+    _: AuthenticatedUser = Depends(deps.require_role("stream", "read")),
+) -> ScoreHistoryRead:
+    """OHLC buckets of ``coin`` between ``start`` and ``end`` (default: the last 7 days).
+
+    Without ``resolution`` the finest rollup fitting ``history_max_buckets`` is
+    used; ``max_points`` further downsamples the closes with LTTB. Coins that
+    left the universe keep serving their history.
+    """
+
+    settings = get_settings()
+    max_buckets = settings.history_max_buckets
+    now = datetime.now(timezone.utc)
+    end = _as_utc(end) if end is not None else now
+    start = _as_utc(start) if start is not None else end - timedelta(days=7)
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="start must precede end"
+        )
+    if resolution is None:
+        fine_retention = timedelta(days=settings.history_fine_retention_days)
+        resolution = choose_resolution(
+            start, end, max_buckets, retention_cutoffs(now, fine_retention)
+        )
+    if resolution is None or (end - start) / RESOLUTIONS[resolution] > max_buckets:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Range too large for the requested resolution",
+        )
+
+    rows = await load_rollups(db, coin, resolution, start, end)
+    if not rows and coin not in get_score_store().snapshot.positions:
+        if not await has_history(db, coin):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown coin")
+    if max_points is not None and len(rows) > max_points:
+        x = np.array([_as_utc(row.bucket_start).timestamp() for row in rows])
+        y = np.array([row.close for row in rows])
+        rows = [rows[index] for index in lttb(x, y, max_points)]
+    points = [
+        ScoreHistoryPoint(
+            t=_as_utc(row.bucket_start), open=row.open, high=row.high, low=row.low, close=row.close
+        )
+        for row in rows
+    ]
+    return ScoreHistoryRead(coin=coin, resolution=resolution, points=points)
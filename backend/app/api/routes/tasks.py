@@ -1,17 +1,95 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+import asyncio
+import json
+from collections.abc import AsyncGenerator
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from pydantic import BaseModel, Field
+from sse_starlette.sse import EventSourceResponse
+from starlette.concurrency import run_in_threadpool
 
 from ...api import deps
 from ...core.security import AuthenticatedUser
-from ...tasks.recalculate import recalculate_scores
+from ...schemas.task import JobStatus
+from ...tasks.jobs import TERMINAL_STATES, get_job_store
+from ...tasks.market_data import refresh_market_data
+from ...tasks.recalculate import RecalculationMode, get_coalescer
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+EVENT_POLL_INTERVAL = 0.2
+
+
+class RecalculationRequest(BaseModel):
+    mode: RecalculationMode = "incremental"
+    coins: list[str] = Field(default_factory=list, max_length=10_000)
+
 
 @router.post("/recalculate", status_code=202)
 async def schedule_recalculation(
+    payload: RecalculationRequest | None = None,
+    _: AuthenticatedUser = Depends(deps.require_role("tasks", "write")),
+) -> dict[str, str | bool]:
+    request = payload or RecalculationRequest()
+    trigger = await run_in_threadpool(get_coalescer().request, request.mode, request.coins)
+    return {
+        "status": "scheduled",
+        "mode": trigger.scope,
+        "job_id": trigger.job_id,
+        "coalesced": trigger.coalesced,
+    }
+
+
+class MarketDataRequest(BaseModel):
+    coins: list[str] | None = Field(default=None, max_length=10_000)
+
+
+@router.post("/market-data", status_code=202)
+async def schedule_market_data_refresh(
+    payload: MarketDataRequest | None = None,
     _: AuthenticatedUser = Depends(deps.require_role("tasks", "write")),
 ) -> dict[str, str]:
-    recalculate_scores.send()
-    return {"status": "scheduled"}
+    message = refresh_market_data.send((payload or MarketDataRequest()).coins)
+    return {"status": "scheduled", "message_id": message.message_id}
+
+
+async def _get_job(job_id: str) -> JobStatus:
+    # The job store may be Redis behind a blocking client.
+    record = await run_in_threadpool(get_job_store().get, job_id)
+    if record is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Unknown job")
+    return JobStatus.model_validate(record)
+
+
+@router.get("/{job_id}", response_model=JobStatus)
+async def get_job(
+    job_id: str,
+    _: AuthenticatedUser = Depends(deps.require_role("tasks", "read")),
+) -> JobStatus:
+    return await _get_job(job_id)
+
+
+@router.get("/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    last_event_id: str | None = Header(default=None, alias="Last-Event-ID"),
+    _: AuthenticatedUser = Depends(deps.require_role("tasks", "read")),
+) -> EventSourceResponse:
+    await _get_job(job_id)
+    store = get_job_store()
+    start = int(last_event_id) + 1 if last_event_id and last_event_id.isdigit() else 0
+
+    async def event_publisher() -> AsyncGenerator[dict[str, str], None]:
+        position = start
+        while True:
+            events = await run_in_threadpool(store.events, job_id, position)
+            for event in events:
+                yield {"event": event["type"], "id": str(position), "data": json.dumps(event)}
+                position += 1
+            record = await run_in_threadpool(store.get, job_id)
+            if record is None or (record["state"] in TERMINAL_STATES and not events):
+                return
+            await asyncio.sleep(EVENT_POLL_INTERVAL)
+
+    return EventSourceResponse(event_publisher())
@@ -1,25 +1,99 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, status
+import json
+from collections.abc import AsyncIterator
+from typing import Any, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ...api import deps
+from ...core.config import get_settings
 from ...core.security import AuthenticatedUser
+from ...db.session import get_read_session
 from ...models.user import User
-from ...schemas.user import UserCreate, UserRead
+from ...schemas.user import UserCreate, UserImportReport, UserRead
+from ...services.singleflight import SingleFlight
+from ...services.user_import import UnsupportedImport, import_users, parse_rows
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+EXPORT_BATCH_SIZE = 1000
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "json": "application/json"}
+
+
+def _user_columns(after: int | None):
+    query = select(User.id, User.email, User.full_name).order_by(User.id)
+    if after is not None:
+        query = query.where(User.id > after)
+    return query
+
+
+def _user_payload(row: Any) -> dict[str, Any]:
+    return {"id": row.id, "email": row.email, "full_name": row.full_name}
+
+
+async def _export_users(export: str, after: int | None) -> AsyncIterator[bytes]:
+    """Stream users through a server-side cursor, one batch in memory at a time."""
+
+    separator = b"\n" if export == "ndjson" else b","
+    first = True
+    if export == "json":
+        yield b"["
+    async with get_read_session() as session:
+        query = _user_columns(after).execution_options(yield_per=EXPORT_BATCH_SIZE)
+        result = await session.stream(query)
+        async for rows in result.partitions():
+            lines = [json.dumps(_user_payload(row)).encode() for row in rows]
+            chunk = separator.join(lines)
+            if export == "ndjson":
+                yield chunk + separator
+            else:
+                yield chunk if first else separator + chunk
+            first = False
+    if export == "json":
+        yield b"]"
+
 
 @router.get("", response_model=list[UserRead])
 async def list_users(
-    db: AsyncSession = Depends(deps.get_db),
+    request: Request,
+    limit: int = Query(default=100, ge=1, le=1000),
+    after: int | None = Query(default=None, ge=0),
+    export: Literal["ndjson", "json"] | None = Query(default=None),
+    flight: SingleFlight = Depends(deps.single_flight("users")),
     _: AuthenticatedUser = Depends(deps.require_role("users", "write")),
-) -> list[UserRead]:
-    result = await db.execute(select(User))
-    return [UserRead.model_validate(user) for user in result.scalars().all()]
+) -> Response:
+    """List users ordered by id, ``limit`` at a time after the id ``after``.
+
+    The next page is advertised in a ``Link: rel="next"`` header. With ``export``
+    every user after ``after`` is streamed as NDJSON or as one JSON array.
+    """
+
+    if export is not None:
+        return StreamingResponse(
+            _export_users(export, after), media_type=EXPORT_MEDIA_TYPES[export]
+        )
+
+    async def load() -> tuple[bytes, int | None]:
+        # Callers joining this flight share the result, so it must not run on
+        # the session of whichever request started it.
+        async with get_read_session() as session:
+            result = await session.execute(_user_columns(after).limit(limit + 1))
+            rows = result.all()
+        next_after = rows[limit - 1].id if len(rows) > limit else None
+        body = json.dumps([_user_payload(row) for row in rows[:limit]]).encode()
+        return body, next_after
+
+    body, next_after = await flight.do(("page", limit, after), load)
+    headers = {}
+    if next_after is not None:
+        next_url = request.url.include_query_params(limit=limit, after=next_after)
+        headers["Link"] = f'<{next_url}>; rel="next"'
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.post("", response_model=UserRead, status_code=status.HTTP_201_CREATED)
@@ -37,3 +111,45 @@ async def create_user(
         raise exc
     await db.refresh(user)
     return UserRead.model_validate(user)
+
+
+async def _read_body(request: Request, max_bytes: int) -> bytes:
+    """Read the request body, answering ``413`` as soon as it exceeds ``max_bytes``."""
+
+    too_large = HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Body too large"
+    )
+    declared = request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > max_bytes:
+        raise too_large
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_bytes:
+            raise too_large
+    return bytes(body)
+
+
+@router.post("/import", response_model=UserImportReport)
+async def import_user_batch(
+    request: Request,
+    db: AsyncSession = Depends(deps.get_db),
+    _: AuthenticatedUser = Depends(deps.require_role("users", "write")),
+) -> UserImportReport:
+    """Create users from a JSON array or a CSV body, reporting rejected rows."""
+
+    settings = get_settings()
+    body = await _read_body(request, settings.user_import_max_bytes)
+    try:
+        rows = parse_rows(request.headers.get("content-type", ""), body)
+    except UnsupportedImport as exc:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail=str(exc)
+        ) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    if len(rows) > settings.user_import_max_rows:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Too many rows"
+        )
+    return await import_users(db, rows, settings.user_import_batch_size)
@@ -9,15 +9,38 @@ from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExport
 from opentelemetry.sdk.resources import Resource
 from opentelemetry.sdk.trace import TracerProvider
 from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from prometheus_fastapi_instrumentator import Instrumentator
+from prometheus_client import Histogram
+from prometheus_fastapi_instrumentator import Instrumentator, metrics
+from prometheus_fastapi_instrumentator.metrics import Info
 from sentry_sdk import init as sentry_init
 from sentry_sdk.integrations.asgi import SentryAsgiMiddleware
 
 from .config import get_settings
 from ..api import deps
+from ..db.instrumentation import QueryStats, QueryTimingMiddleware
 
 logger = logging.getLogger(__name__)
 
+DB_QUERIES = Histogram(
+    "tokenlysis_db_queries_per_request",
+    "SQL statements executed per HTTP request.",
+    ["handler", "method"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+DB_SECONDS = Histogram(
+    "tokenlysis_db_seconds_per_request",
+    "Time spent in SQL statements per HTTP request.",
+    ["handler", "method"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+
+def db_metrics(info: Info) -> None:
+    stats = getattr(info.request.state, "db", None)
+    if isinstance(stats, QueryStats):
+        DB_QUERIES.labels(info.modified_handler, info.method).observe(stats.count)
+        DB_SECONDS.labels(info.modified_handler, info.method).observe(stats.seconds)
+
 
 def configure_observability(app: FastAPI) -> None:
     settings = get_settings()
@@ -34,7 +57,8 @@ def configure_observability(app: FastAPI) -> None:
         trace.set_tracer_provider(provider)
         logger.info("OpenTelemetry tracing configured", extra={"endpoint": settings.otel_endpoint})
 
-    instrumentator = Instrumentator().instrument(app)
+    app.add_middleware(QueryTimingMiddleware)
+    instrumentator = Instrumentator().add(metrics.default()).add(db_metrics).instrument(app)
     instrumentator.expose(
         app,
         endpoint=settings.prometheus_endpoint,
@@ -1,11 +1,20 @@
 from __future__ import annotations
 
+import logging
+import os
+import threading
+import time
+from collections.abc import Iterable
 from functools import lru_cache
 
 import casbin
 
 from .config import get_settings
 
+logger = logging.getLogger(__name__)
+
+Decision = tuple[str, str, str]
+
 
 @lru_cache(1)
 def get_enforcer() -> casbin.Enforcer:
@@ -13,6 +22,84 @@ def get_enforcer() -> casbin.Enforcer:
     return casbin.Enforcer(settings.casbin_model_path, settings.casbin_policy_path)
 
 
+def compile_decisions(enforcer: casbin.Enforcer) -> frozenset[Decision]:
+    """Ask ``enforcer`` about every subject, object and action the policy mentions.
+
+    Subjects include both sides of ``g`` rules, so inherited permissions end up
+    in the table; anything absent from it is denied.
+    """
+
+    rules = enforcer.get_policy()
+    subjects = {rule[0] for rule in rules}
+    for rule in enforcer.get_grouping_policy():
+        subjects.update(rule[:2])
+    targets = {(rule[1], rule[2]) for rule in rules}
+    return frozenset(
+        (subject, obj, action)
+        for subject in subjects
+        for obj, action in targets
+        if enforcer.enforce(subject, obj, action)
+    )
+
+
+class DecisionTable:
+    """Precompiled casbin decisions, rebuilt when the policy file changes.
+
+    The file is checked at most every ``check_seconds``; a new table replaces
+    the old one in a single assignment, and a policy that fails to load keeps
+    the previous table in place.
+    """
+
+    def __init__(self, model_path: str, policy_path: str, check_seconds: float = 5.0) -> None:
+        self._model_path = model_path
+        self._policy_path = policy_path
+        self._check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self._mtime = os.stat(policy_path).st_mtime_ns
+        self._checked_at = time.monotonic()
+        self._decisions = compile_decisions(casbin.Enforcer(model_path, policy_path))
+
+    def reload(self) -> bool:
+        """Recompile the table if the policy file changed; return whether it did."""
+
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            self._checked_at = time.monotonic()
+            mtime = os.stat(self._policy_path).st_mtime_ns
+            if mtime == self._mtime:
+                return False
+            enforcer = casbin.Enforcer(self._model_path, self._policy_path)
+            decisions = compile_decisions(enforcer)
+            self._mtime = mtime
+            self._decisions = decisions
+        except Exception:
+            logger.exception("Failed to reload the RBAC policy, keeping the current one")
+            return False
+        finally:
+            self._lock.release()
+        get_enforcer.cache_clear()
+        logger.info("Reloaded RBAC policy", extra={"decisions": len(decisions)})
+        return True
+
+    def allows(self, roles: Iterable[str], obj: str, action: str) -> bool:
+        if time.monotonic() - self._checked_at >= self._check_seconds:
+            self.reload()
+        decisions = self._decisions
+        return any((role, obj, action) in decisions for role in roles)
+
+
+@lru_cache(1)
+def get_decision_table() -> DecisionTable:
+    settings = get_settings()
+    return DecisionTable(
+        settings.casbin_model_path, settings.casbin_policy_path, settings.rbac_reload_seconds
+    )
+
+
 def authorize(subject: str, obj: str, action: str) -> bool:
-    enforcer = get_enforcer()
-    return enforcer.enforce(subject, obj, action)
+    return get_decision_table().allows((subject,), obj, action)
+
+
+def authorize_any(subjects: Iterable[str], obj: str, action: str) -> bool:
+    return get_decision_table().allows(subjects, obj, action)
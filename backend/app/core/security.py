@@ -1,11 +1,24 @@
 from __future__ import annotations
 
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from functools import lru_cache
 from typing import Any
 
+import httpx
+import jwt
 from fastapi import HTTPException, status
 
 from .config import get_settings
 
+logger = logging.getLogger(__name__)
+
+JwksFetcher = Callable[[], dict[str, Any]]
+
 
 class AuthenticatedUser(dict):
     """Simple mapping storing claims extracted from an OIDC token."""
@@ -19,19 +32,217 @@ class AuthenticatedUser(dict):
         return list(self.get("roles", []))
 
 
-def decode_token(token: str) -> AuthenticatedUser:
-    """Decode and validate the provided OIDC token.
+def fetch_jwks(issuer: str, jwks_url: str | None = None) -> JwksFetcher:
+    """Return a fetcher for the issuer's key set, discovered from its OIDC metadata."""
+
+    def fetch() -> dict[str, Any]:
+        url = jwks_url
+        with httpx.Client(timeout=5.0) as client:
+            if url is None:
+                metadata = client.get(f"{issuer.rstrip('/')}/.well-known/openid-configuration")
+                metadata.raise_for_status()
+                url = metadata.json()["jwks_uri"]
+            response = client.get(url)
+            response.raise_for_status()
+            return response.json()
+
+    return fetch
 
-    The implementation keeps the logic minimal for the demo environment while
-    maintaining well-defined failure modes. Real deployments should replace this
-    with Authlib or another OIDC-compliant verifier.
+
+class JwksCache:
+    """Signing keys of the issuer indexed by ``kid``.
+
+    Keys older than ``refresh_seconds`` keep being served while a background
+    thread refreshes them. An unknown ``kid`` triggers an immediate refetch, at
+    most once every ``min_refetch_seconds``, so forged kids cannot hammer the
+    identity provider; concurrent misses wait for that one fetch.
     """
 
+    def __init__(
+        self,
+        fetch: JwksFetcher,
+        refresh_seconds: float = 300.0,
+        min_refetch_seconds: float = 30.0,
+    ) -> None:
+        self._fetch = fetch
+        self._refresh_seconds = refresh_seconds
+        self._min_refetch_seconds = min_refetch_seconds
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._fetched_at = float("-inf")
+        self._refreshing = False
+
+    def _load(self) -> None:
+        with self._fetch_lock:
+            jwks = self._fetch()
+        keys = {}
+        for data in jwks.get("keys", []):
+            if data.get("use", "sig") != "sig" or "kid" not in data:
+                continue
+            try:
+                keys[data["kid"]] = jwt.PyJWK(data)
+            except jwt.PyJWKError:
+                logger.warning("Skipping unsupported signing key", extra={"kid": data["kid"]})
+        with self._lock:
+            self._keys = keys
+            self._fetched_at = time.monotonic()
+
+    def _refresh_in_background(self) -> None:
+        def refresh() -> None:
+            try:
+                self._load()
+            except Exception:
+                logger.exception("Failed to refresh the OIDC signing keys")
+            finally:
+                self._refreshing = False
+
+        self._refreshing = True
+        threading.Thread(target=refresh, name="jwks-refresh", daemon=True).start()
+
+    def prefetch(self) -> bool:
+        """Load the keys ahead of the first request; failures are logged, not raised."""
+
+        try:
+            self._load()
+        except Exception:
+            logger.exception("Failed to prefetch the OIDC signing keys")
+            return False
+        return True
+
+    def get(self, kid: str) -> jwt.PyJWK | None:
+        with self._lock:
+            key = self._keys.get(kid)
+            age = time.monotonic() - self._fetched_at
+            if key is not None:
+                if age > self._refresh_seconds and not self._refreshing:
+                    self._refresh_in_background()
+                return key
+            due = age >= self._min_refetch_seconds
+            if due:
+                self._fetched_at = time.monotonic()
+        if due:
+            self._load()
+        else:
+            with self._fetch_lock:  # let a refetch already in flight land
+                pass
+        with self._lock:
+            return self._keys.get(kid)
+
+
+class VerifiedTokenCache:
+    """LRU of verified claims keyed by token hash; an entry never outlives its ``exp``."""
+
+    def __init__(self, max_entries: int = 10_000) -> None:
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+        self._entries: OrderedDict[bytes, tuple[float, dict[str, Any]]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> dict[str, Any] | None:
+        key = self.key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, token: str, claims: dict[str, Any]) -> None:
+        if self._max_entries == 0:
+            return
+        with self._lock:
+            self._entries[self.key(token)] = (float(claims["exp"]), claims)
+            if len(self._entries) > self._max_entries:
+                now = time.time()
+                for key in [key for key, (exp, _) in self._entries.items() if exp <= now]:
+                    del self._entries[key]
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+
+class TokenVerifier:
+    """Verifies OIDC access tokens against the issuer's JWKS."""
+
+    def __init__(
+        self,
+        issuer: str,
+        audience: str,
+        keys: JwksCache,
+        algorithms: list[str],
+        cache: VerifiedTokenCache | None = None,
+    ) -> None:
+        self.issuer = issuer
+        self.audience = audience
+        self.keys = keys
+        self.algorithms = algorithms
+        self.cache = cache if cache is not None else VerifiedTokenCache()
+
+    def verify(self, token: str) -> dict[str, Any]:
+        """Return the claims of ``token``; raises :class:`jwt.InvalidTokenError`."""
+
+        claims = self.cache.get(token)
+        if claims is not None:
+            return claims
+        header = jwt.get_unverified_header(token)
+        key = self.keys.get(header.get("kid", ""))
+        if key is None:
+            raise jwt.InvalidTokenError("Unknown signing key")
+        claims = jwt.decode(
+            token,
+            key.key,
+            algorithms=self.algorithms,
+            audience=self.audience,
+            issuer=self.issuer,
+            options={"require": ["exp", "iss", "sub"]},
+        )
+        self.cache.put(token, claims)
+        return claims
+
+
+@lru_cache(1)
+def get_token_verifier() -> TokenVerifier:
     settings = get_settings()
-    if not token:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing token")
+    issuer = str(settings.oidc_issuer)
+    keys = JwksCache(
+        fetch_jwks(issuer, settings.oidc_jwks_url),
+        refresh_seconds=settings.oidc_jwks_refresh_seconds,
+        min_refetch_seconds=settings.oidc_jwks_min_refetch_seconds,
+    )
+    return TokenVerifier(
+        issuer,
+        settings.oidc_audience,
+        keys,
+        settings.oidc_algorithms,
+        VerifiedTokenCache(settings.token_cache_size),
+    )
+
+
+def _user(claims: dict[str, Any]) -> AuthenticatedUser:
+    user = AuthenticatedUser(claims)
+    if "roles" not in user:
+        user["roles"] = list(claims.get("realm_access", {}).get("roles", []))
+    return user
+
+
+def cached_user(token: str) -> AuthenticatedUser | None:
+    """Return the user of ``token`` if it can be resolved without verifying a signature.
+
+    That is a test token, when ``auth_test_tokens`` is enabled, or a token whose
+    verified claims are still cached. ``None`` means :func:`decode_token` is needed.
+    """
 
-    if token.startswith("test-token-with-"):
+    settings = get_settings()
+    if settings.auth_test_tokens and token.startswith("test-token-with-"):
         role = token.removeprefix("test-token-with-")
         return AuthenticatedUser(
             {
@@ -42,5 +253,29 @@ def decode_token(token: str) -> AuthenticatedUser:
                 "iss": settings.oidc_issuer,
             }
         )
+    if not token:
+        return None
+    claims = get_token_verifier().cache.get(token)
+    return _user(claims) if claims is not None else None
+
+
+def decode_token(token: str) -> AuthenticatedUser:
+    """Decode and validate the provided OIDC token.
+
+    ``test-token-with-<role>`` tokens are only accepted when ``auth_test_tokens``
+    is enabled, which it is not by default.
+    """
+
+    if not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing token")
+    user = cached_user(token)
+    if user is not None:
+        return user
 
-    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    try:
+        claims = get_token_verifier().verify(token)
+    except jwt.ExpiredSignatureError as exc:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired") from exc
+    except (jwt.PyJWTError, httpx.HTTPError, KeyError, ValueError) as exc:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token") from exc
+    return _user(claims)
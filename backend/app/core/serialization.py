@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import dataclasses
+from typing import Any, Literal
+
+import msgpack
+import numpy as np
+import orjson
+
+WireFormat = Literal["json", "msgpack"]
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+MEDIA_TYPES: dict[WireFormat, str] = {"json": JSON, "msgpack": MSGPACK}
+MSGPACK_ALIASES = frozenset({MSGPACK, "application/x-msgpack", "application/vnd.msgpack"})
+MSGPACK_SUBPROTOCOL = "msgpack"
+
+
+def _msgpack_default(value: Any) -> Any:
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {field.name: getattr(value, field.name) for field in dataclasses.fields(value)}
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def dumps(value: Any) -> bytes:
+    """JSON bytes via orjson; dataclasses and numeric numpy arrays are encoded natively."""
+
+    return orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def loads(data: str | bytes) -> Any:
+    return orjson.loads(data)
+
+
+def packb(value: Any) -> bytes:
+    return msgpack.packb(value, use_bin_type=True, default=_msgpack_default)
+
+
+def unpackb(data: bytes) -> Any:
+    return msgpack.unpackb(data, raw=False)
+
+
+def encode(value: Any, fmt: WireFormat) -> bytes:
+    return packb(value) if fmt == "msgpack" else dumps(value)
+
+
+def negotiate(accept: str | None) -> WireFormat:
+    """Pick MessagePack only when ``Accept`` prefers it to JSON.
+
+    Preference is the quality value, then how specifically the media range
+    names the type; ties and missing headers fall back to JSON.
+    """
+
+    best: dict[WireFormat, tuple[float, int]] = {"json": (0.0, -1), "msgpack": (0.0, -1)}
+    for part in (accept or "").split(","):
+        media_range, *params = (item.strip() for item in part.split(";"))
+        media_range = media_range.lower()
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_range in MSGPACK_ALIASES:
+            matches = {"msgpack": 2}
+        elif media_range == JSON:
+            matches = {"json": 2}
+        elif media_range == "application/*":
+            matches = {"json": 1, "msgpack": 1}
+        elif media_range == "*/*":
+            matches = {"json": 0, "msgpack": 0}
+        else:
+            continue
+        for fmt, specificity in matches.items():
+            current = best[fmt]  # type: ignore[index]
+            if specificity > current[1]:
+                best[fmt] = (quality, specificity)  # type: ignore[index]
+    if best["msgpack"][0] > 0 and best["msgpack"] > best["json"]:
+        return "msgpack"
+    return "json"
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+
+class RepeatedQueryError(RuntimeError):
+    """Raised in N+1 detection mode when a request repeats the same statement too often."""
+
+
+@dataclass
+class QueryStats:
+    """SQL executed while handling one request."""
+
+    count: int = 0
+    seconds: float = 0.0
+    statements: Counter[str] = field(default_factory=Counter)
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000:.2f};desc="{self.count} queries"'
+
+
+@dataclass(frozen=True)
+class QueryPolicy:
+    slow_query_ms: float = 500.0
+    repeated_query_limit: int | None = None
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("tokenlysis_query_stats", default=None)
+
+
+def current_stats() -> QueryStats | None:
+    return _current.get()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Account the statements run by the current task (and its children) to new stats."""
+
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def instrument_engine(engine: Engine, policy: QueryPolicy) -> None:
+    """Time every statement of ``engine`` and account it to the current request."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        if elapsed * 1000 >= policy.slow_query_ms:
+            logger.warning(
+                "Slow query",
+                extra={"duration_ms": round(elapsed * 1000, 2), "statement": statement},
+            )
+        stats = _current.get()
+        if stats is None:
+            return
+        stats.count += 1
+        stats.seconds += elapsed
+        stats.statements[statement] += 1
+        limit = policy.repeated_query_limit
+        if limit is not None and stats.statements[statement] > limit:
+            raise RepeatedQueryError(
+                f"Statement executed {stats.statements[statement]} times in one request "
+                f"(limit {limit}): {statement}"
+            )
+
+
+class QueryTimingMiddleware:
+    """Tracks the queries of each HTTP request and reports them in ``Server-Timing``.
+
+    The stats are also stored in ``request.state.db`` for the Prometheus metrics.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with track_queries() as stats:
+            scope.setdefault("state", {})["db"] = stats
+
+            async def send_with_timing(message: dict[str, Any]) -> None:
+                if message["type"] == "http.response.start" and stats.count:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", stats.server_timing().encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
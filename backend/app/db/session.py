@@ -2,25 +2,66 @@ from __future__ import annotations
 
 from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
+from typing import Any
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
-from ..core.config import get_settings
+from ..core.config import Settings, get_settings
 from .base import Base
+from .instrumentation import QueryPolicy, instrument_engine
 
 
 _engine = None
 _SessionLocal: async_sessionmaker[AsyncSession] | None = None
+_read_engine = None
+_ReadSessionLocal: async_sessionmaker[AsyncSession] | None = None
+
+
+def engine_options(url: str, settings: Settings) -> dict[str, Any]:
+    """Pool and driver options from ``settings``; SQLite keeps SQLAlchemy's defaults."""
+
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        return {}
+    options: dict[str, Any] = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if parsed.get_driver_name() == "asyncpg":
+        # 0 disables prepared statements, as required behind PgBouncer in transaction mode.
+        options["connect_args"] = {"statement_cache_size": settings.db_statement_cache_size}
+    return options
+
+
+def build_engine(url: str) -> AsyncEngine:
+    settings = get_settings()
+    engine = create_async_engine(url, echo=False, future=True, **engine_options(url, settings))
+    policy = QueryPolicy(settings.db_slow_query_ms, settings.db_repeated_query_limit)
+    instrument_engine(engine.sync_engine, policy)
+    return engine
 
 
 def get_engine():
     global _engine
     if _engine is None:
-        settings = get_settings()
-        _engine = create_async_engine(settings.database_url, echo=False, future=True)
+        _engine = build_engine(get_settings().database_url)
     return _engine
 
 
+def get_read_engine():
+    """Engine of the read replica, or the primary engine when none is configured."""
+
+    global _read_engine
+    if _read_engine is None:
+        replica_url = get_settings().database_replica_url
+        _read_engine = build_engine(replica_url) if replica_url else get_engine()
+    return _read_engine
+
+
 def get_sessionmaker() -> async_sessionmaker[AsyncSession]:
     global _SessionLocal
     if _SessionLocal is None:
@@ -28,13 +69,31 @@ def get_sessionmaker() -> async_sessionmaker[AsyncSession]:
     return _SessionLocal
 
 
+def get_read_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    global _ReadSessionLocal
+    if _ReadSessionLocal is None:
+        _ReadSessionLocal = async_sessionmaker(get_read_engine(), expire_on_commit=False)
+    return _ReadSessionLocal
+
+
 @asynccontextmanager
 async def get_session() -> AsyncIterator[AsyncSession]:
+    """Session on the primary; a connection is only checked out by its first statement."""
+
     sessionmaker = get_sessionmaker()
     async with sessionmaker() as session:
         yield session
 
 
+@asynccontextmanager
+async def get_read_session() -> AsyncIterator[AsyncSession]:
+    """Session for read-only work, bound to the replica when one is configured."""
+
+    sessionmaker = get_read_sessionmaker()
+    async with sessionmaker() as session:
+        yield session
+
+
 @asynccontextmanager
 async def create_test_session() -> AsyncIterator[AsyncSession]:
     engine = create_async_engine("sqlite+aiosqlite:///:memory:", future=True)
@@ -1,26 +1,107 @@
 from __future__ import annotations
 
 import asyncio
-import json
-from collections.abc import AsyncGenerator
+import contextlib
+from collections.abc import AsyncGenerator, AsyncIterator
+from typing import Any
 
-from fastapi import Depends, FastAPI
+from fastapi import Depends, FastAPI, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from sse_starlette.sse import EventSourceResponse
-from starlette.websockets import WebSocket
+from starlette.concurrency import run_in_threadpool
+from starlette.websockets import WebSocket, WebSocketDisconnect
 
 from .admin.setup import mount_admin
 from .api import deps
-from .api.routes import files, scores, tasks, users
-from .api.routes.scores import _mock_scores 
+from .api.routes import files, ranking, scores, tasks, users
 from .core.config import get_settings
 from .core.observability import configure_observability
-from .core.security import AuthenticatedUser
+from .core.security import AuthenticatedUser, get_token_verifier
+from .core.serialization import MSGPACK_SUBPROTOCOL, WireFormat, loads, unpackb
+from .services.broadcast import get_score_broadcaster
+from .services.score_store import get_score_store
+from .services.shared_snapshot import get_replicator
+from .services.subscriptions import (
+    SocketChannel,
+    SocketMessage,
+    SubscriptionIndex,
+    get_subscription_index,
+)
+
+
+async def _pump_socket(websocket: WebSocket, channel: SocketChannel) -> None:
+    async for message in channel.messages():
+        if isinstance(message, bytes):
+            await websocket.send_bytes(message)
+        else:
+            await websocket.send_text(message)
+
+
+def _decode_socket_message(message: dict[str, Any]) -> Any:
+    """Text frames carry JSON and binary frames MessagePack, whatever the socket format."""
+
+    if message.get("bytes") is not None:
+        return unpackb(message["bytes"])
+    return loads(message.get("text") or "")
+
+
+def _string_list(value: Any) -> list[str] | None:
+    """``value`` as a list of strings, or ``None`` if it is anything else."""
+
+    if value is None:
+        return []
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return list(value)
+    return None
+
+
+def _handle_socket_message(
+    index: SubscriptionIndex, channel: SocketChannel, message: dict[str, Any]
+) -> str | None:
+    """Apply a subscribe/unsubscribe message and return an error, if any."""
+
+    kind = message.get("type", "subscribe")
+    coins = _string_list(message.get("coins"))
+    themes = _string_list(message.get("themes"))
+    coin = message.get("coin")
+    if coins is None or themes is None or not isinstance(coin, (str, type(None))):
+        return "coin must be a string; coins and themes must be lists of strings"
+    if coin:
+        coins.append(coin)
+    if kind == "subscribe":
+        try:
+            index.subscribe(channel, get_score_store().snapshot, coins, themes)
+        except ValueError as exc:
+            return str(exc)
+        return None
+    if kind == "unsubscribe":
+        index.unsubscribe(channel, coins, themes)
+        return None
+    return f"Unknown message type: {kind}"
+
+
+@contextlib.asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """Load the OIDC signing keys, then relay score updates published by other workers."""
+
+    if get_settings().oidc_prefetch_jwks:
+        await run_in_threadpool(get_token_verifier().keys.prefetch)
+    # Registers the replicator with the score store before the first request.
+    replicator = asyncio.create_task(get_replicator().run())
+    try:
+        yield
+    finally:
+        replicator.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await replicator
 
 
 def create_app() -> FastAPI:
     settings = get_settings()
-    app = FastAPI(title=settings.app_name)
+    app = FastAPI(
+        title=settings.app_name, lifespan=lifespan, default_response_class=ORJSONResponse
+    )
 
     app.add_middleware(
         CORSMiddleware,
@@ -36,20 +117,29 @@ def create_app() -> FastAPI:
     app.include_router(tasks.router, prefix="/api")
     app.include_router(files.router, prefix="/api")
     app.include_router(scores.router, prefix="/api")
+    app.include_router(ranking.router, prefix="/api")
     app.state.admin = mount_admin(app)
 
     @app.get("/api/stream/scores")
     async def stream_scores(
+        last_event_id: str | None = Header(default=None, alias="Last-Event-ID"),
         _: AuthenticatedUser = Depends(deps.require_role("stream", "read")),
     ) -> EventSourceResponse:
-        async def event_publisher() -> AsyncGenerator[dict[str, str], None]:
-            for coin in ("btc", "eth"):
-                payload = json.dumps({"coin": coin, "score": 0.75})
-                yield {"event": "score", "data": payload}
-                await asyncio.sleep(0)
+        broadcaster = get_score_broadcaster()
+        resume_from = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+        subscription = broadcaster.hub.subscribe(
+            resume_from, broadcaster.initial_frames(get_score_store().snapshot)
+        )
+
+        async def event_publisher() -> AsyncGenerator[bytes, None]:
+            try:
+                async for frame in subscription.frames(settings.stream_max_seconds):
+                    yield frame.data
+            finally:
+                broadcaster.hub.unsubscribe(subscription)
 
         return EventSourceResponse(event_publisher())
-    
+
     @app.get("/readyz", include_in_schema=False)
     def readyz():
         return {"status": "ok"}
@@ -61,10 +151,6 @@ def create_app() -> FastAPI:
     @app.get("/api", include_in_schema=False)
     def api_index():
         return {"ok": True}
-        
-    @app.get("/api/ranking")
-    async def get_ranking(_: deps.AuthenticatedUser = Depends(deps.require_role("stream", "read"))):
-        return _mock_scores()
 
     @app.get("/livez", include_in_schema=False)
     def livez():
@@ -72,14 +158,39 @@ def create_app() -> FastAPI:
 
     @app.websocket("/ws/scores")
     async def websocket_scores(websocket: WebSocket) -> None:
-        await websocket.accept()
+        """Stream score deltas as JSON text, or as MessagePack with the ``msgpack`` subprotocol."""
+
+        fmt: WireFormat = "json"
+        if MSGPACK_SUBPROTOCOL in websocket.scope.get("subprotocols", []):
+            fmt = "msgpack"
+        await websocket.accept(subprotocol=MSGPACK_SUBPROTOCOL if fmt == "msgpack" else None)
+        index = get_subscription_index()
+        channel = SocketChannel(fmt)
+        writer = asyncio.create_task(_pump_socket(websocket, channel))
         try:
             while True:
-                message = await websocket.receive_json()
-                coin = message.get("coin", "btc")
-                await websocket.send_json({"coin": coin, "score": 0.82})
+                raw = await websocket.receive()
+                if raw["type"] == "websocket.disconnect":
+                    break
+                try:
+                    message = _decode_socket_message(raw)
+                except ValueError:
+                    message = None
+                if isinstance(message, dict):
+                    error = _handle_socket_message(index, channel, message)
+                else:
+                    error = "Malformed message"
+                if error is not None:
+                    payload = SocketMessage({"type": "error", "detail": error})
+                    channel.offer([(("error", None), payload)])
+        except WebSocketDisconnect:
+            pass
         except Exception:  # pragma: no cover
             await websocket.close()
+        finally:
+            index.unsubscribe(channel)
+            channel.close()
+            writer.cancel()
 
     return app
 
@@ -1,3 +1,4 @@
+from .score import ScoreHistory, ScoreRollup, ScoreSnapshotRecord
 from .user import User
 
-__all__ = ["User"]
+__all__ = ["ScoreHistory", "ScoreRollup", "ScoreSnapshotRecord", "User"]
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import JSON, BigInteger, DateTime, Float, Index, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..db.base import Base
+
+
+class ScoreSnapshotRecord(Base):
+    """One published score snapshot; its rows live in :class:`ScoreHistory`."""
+
+    __tablename__ = "score_snapshots"
+
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True
+    )
+    version: Mapped[int] = mapped_column(Integer)
+    recorded_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
+    coins: Mapped[int] = mapped_column(Integer)
+    themes: Mapped[list[str]] = mapped_column(JSON)
+
+
+class ScoreHistory(Base):
+    """Score of one coin at one snapshot.
+
+    On PostgreSQL the table is range-partitioned by month on ``recorded_at``;
+    the primary key serves both "latest per coin" and per-coin range scans.
+    """
+
+    __tablename__ = "score_history"
+    __table_args__ = {"postgresql_partition_by": "RANGE (recorded_at)"}
+
+    coin: Mapped[str] = mapped_column(String(64), primary_key=True)
+    recorded_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer)
+    score: Mapped[float] = mapped_column(Float)
+    theme_scores: Mapped[dict[str, float]] = mapped_column(JSON().with_variant(JSONB, "postgresql"))
+
+
+class ScoreRollup(Base):
+    """Open/high/low/close of a coin's composite score over one time bucket."""
+
+    __tablename__ = "score_rollups"
+    __table_args__ = (
+        Index("ix_score_rollups_resolution_bucket_start", "resolution", "bucket_start"),
+    )
+
+    coin: Mapped[str] = mapped_column(String(64), primary_key=True)
+    resolution: Mapped[str] = mapped_column(String(8), primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    open: Mapped[float] = mapped_column(Float)
+    high: Mapped[float] = mapped_column(Float)
+    low: Mapped[float] = mapped_column(Float)
+    close: Mapped[float] = mapped_column(Float)
+    samples: Mapped[int] = mapped_column(Integer)
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class ScoreRead(BaseModel):
+    coin: str
+    score: float
+
+
+class RankingEntry(BaseModel):
+    rank: int
+    coin: str
+    score: float
+
+
+class RankingPage(BaseModel):
+    version: int
+    theme: str | None = None
+    items: list[RankingEntry]
+    next_cursor: str | None = None
+
+
+class CoinRank(RankingEntry):
+    theme: str | None = None
+    total: int
+
+
+class ScoreHistoryPoint(BaseModel):
+    t: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+
+
+class ScoreHistoryRead(BaseModel):
+    coin: str
+    resolution: str
+    points: list[ScoreHistoryPoint]
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class JobStatus(BaseModel):
+    id: str
+    scope: str
+    state: Literal["pending", "running", "succeeded", "failed"]
+    created_at: float
+    started_at: float | None = None
+    finished_at: float | None = None
+    duration_ms: float | None = None
+    shards_total: int = 0
+    shards_done: int = 0
+    coins_updated: int = 0
+    rows_ingested: int = 0
+    error: str | None = None
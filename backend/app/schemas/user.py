@@ -14,3 +14,16 @@ class UserRead(BaseModel):
     full_name: str
 
     model_config = {"from_attributes": True}
+
+
+class UserImportIssue(BaseModel):
+    row: int
+    email: str | None = None
+    detail: str
+
+
+class UserImportReport(BaseModel):
+    received: int
+    inserted: int
+    conflicts: list[UserImportIssue]
+    invalid: list[UserImportIssue]
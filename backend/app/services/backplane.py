@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import queue
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+
+from ..core.config import get_settings
+from .score_store import ScoreSnapshot, ScoreStore, build_snapshot, get_score_store
+
+logger = logging.getLogger(__name__)
+
+# KEYS: version counter; ARGV: the caller's current version.
+_NEXT_VERSION = """
+local version = redis.call('INCR', KEYS[1])
+if version <= tonumber(ARGV[1]) then
+    version = tonumber(ARGV[1]) + 1
+    redis.call('SET', KEYS[1], version)
+end
+return version
+"""
+
+
+class Backplane(ABC):
+    """Pub/sub channel carrying pre-serialized score updates between processes."""
+
+    @abstractmethod
+    def publish(self, payload: bytes) -> None: ...
+
+    @abstractmethod
+    def messages(self) -> AsyncIterator[bytes]: ...
+
+    @abstractmethod
+    def next_version(self, current: int) -> int:
+        """Allocate a snapshot version greater than ``current`` and than any allocated before."""
+
+
+class InProcessBackplane(Backplane):
+    """Delivers every payload to the subscribers of this process, on their own loop."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._queues: set[tuple[asyncio.AbstractEventLoop, asyncio.Queue[bytes]]] = set()
+        self._version = 0
+
+    def next_version(self, current: int) -> int:
+        with self._lock:
+            self._version = max(self._version, current) + 1
+            return self._version
+
+    def publish(self, payload: bytes) -> None:
+        with self._lock:
+            queues = list(self._queues)
+        for loop, queue in queues:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, payload)
+            except RuntimeError:
+                with self._lock:
+                    self._queues.discard((loop, queue))
+
+    async def messages(self) -> AsyncIterator[bytes]:
+        entry = (asyncio.get_running_loop(), asyncio.Queue[bytes]())
+        with self._lock:
+            self._queues.add(entry)
+        try:
+            while True:
+                yield await entry[1].get()
+        finally:
+            with self._lock:
+                self._queues.discard(entry)
+
+
+class RedisBackplane(Backplane):
+    """Redis pub/sub: one ``PUBLISH`` per update whatever the number of workers.
+
+    Payloads are queued and published in order by a sender thread, so the score
+    store never waits on Redis while it holds its lock. Versions come from one
+    counter next to the channel.
+    """
+
+    def __init__(self, url: str, channel: str = "tokenlysis:scores") -> None:
+        import redis
+
+        self._url = url
+        self._channel = channel
+        self._redis = redis.Redis.from_url(url)
+        self._next_version = self._redis.register_script(_NEXT_VERSION)
+        self._outbox: queue.SimpleQueue[bytes] = queue.SimpleQueue()
+        self._sender = threading.Thread(target=self._send, name="score-backplane", daemon=True)
+        self._sender.start()
+
+    def _send(self) -> None:
+        import redis
+
+        while True:
+            payload = self._outbox.get()
+            try:
+                self._redis.publish(self._channel, payload)
+            except redis.RedisError:
+                logger.exception("Failed to publish a score update")
+
+    def publish(self, payload: bytes) -> None:
+        self._outbox.put(payload)
+
+    def next_version(self, current: int) -> int:
+        return int(self._next_version(keys=[f"{self._channel}:version"], args=[current]))
+
+    async def messages(self) -> AsyncIterator[bytes]:
+        from redis import asyncio as aioredis
+
+        client = aioredis.Redis.from_url(self._url)
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self._channel)
+        try:
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    yield message["data"]
+        finally:
+            await pubsub.unsubscribe(self._channel)
+            await pubsub.aclose()
+            await client.aclose()
+
+
+def encode_update(origin: str, previous: ScoreSnapshot, snapshot: ScoreSnapshot) -> bytes | None:
+    """Serialize the rows that changed between two snapshots as one message.
+
+    The whole snapshot is sent when the universe or the themes changed.
+    """
+
+    full = not (
+        previous.themes == snapshot.themes and np.array_equal(previous.coins, snapshot.coins)
+    )
+    if full:
+        rows = np.arange(len(snapshot))
+    else:
+        changed = previous.scores != snapshot.scores
+        changed |= (previous.theme_scores != snapshot.theme_scores).any(axis=1)
+        rows = np.flatnonzero(changed)
+        if not len(rows):
+            return None
+    payload: dict[str, Any] = {
+        "origin": origin,
+        "version": snapshot.version,
+        "full": full,
+        "themes": list(snapshot.themes),
+        "coins": snapshot.coins[rows].tolist(),
+        "scores": snapshot.scores[rows].tolist(),
+        "theme_scores": snapshot.theme_scores[rows].tolist(),
+        "updated_at": snapshot.updated_at[rows].tolist(),
+    }
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+class ScoreReplicator:
+    """Keeps the score stores of every process in sync through a :class:`Backplane`.
+
+    Local publishes are forwarded as one batched message per snapshot; updates
+    from other processes are merged into the local store under the producer's
+    version, so every worker serves the same versions and ETags. Updates no
+    newer than the local snapshot are dropped. The store's listeners (SSE hub,
+    WebSocket index, rankings) then fan them out to local clients only.
+    """
+
+    def __init__(self, store: ScoreStore, backplane: Backplane, origin: str | None = None) -> None:
+        self.store = store
+        self.backplane = backplane
+        self.origin = origin or uuid.uuid4().hex
+        self._applying = threading.local()
+
+    def next_version(self, current: int) -> int:
+        return self.backplane.next_version(current)
+
+    def __call__(self, previous: ScoreSnapshot, snapshot: ScoreSnapshot) -> None:
+        if getattr(self._applying, "active", False):
+            return
+        payload = encode_update(self.origin, previous, snapshot)
+        if payload is not None:
+            self.backplane.publish(payload)
+
+    def apply(self, payload: bytes) -> bool:
+        """Merge an update from another process; return whether it was applied."""
+
+        update = json.loads(payload)
+        current = self.store.snapshot
+        if update["origin"] == self.origin or update["version"] <= current.version:
+            return False
+        themes = tuple(update["themes"])
+        coins = update["coins"]
+        scores = np.array(update["scores"], dtype=np.float64)
+        theme_scores = np.array(update["theme_scores"], dtype=np.float64)
+        theme_scores = theme_scores.reshape(len(coins), len(themes))
+        updated_at = np.array(update["updated_at"], dtype=np.int64)
+        if not update["full"] and themes == current.themes:
+            positions = current.positions
+            all_coins = current.coins.tolist()
+            rows = []
+            for coin in coins:
+                if coin not in positions:
+                    positions = {**positions, coin: len(all_coins)}
+                    all_coins.append(coin)
+                rows.append(positions[coin])
+            size = len(all_coins)
+            merged_scores = np.resize(current.scores, size)
+            merged_themes = np.resize(current.theme_scores, (size, len(themes)))
+            merged_updated = np.resize(current.updated_at, size)
+            merged_scores[rows] = scores
+            merged_themes[rows] = theme_scores
+            merged_updated[rows] = updated_at
+            coins, scores, theme_scores, updated_at = (
+                all_coins, merged_scores, merged_themes, merged_updated
+            )
+        snapshot = build_snapshot(
+            int(update["version"]), coins, scores, theme_scores, themes, updated_at
+        )
+        self._applying.active = True
+        try:
+            return self.store.install(snapshot)
+        finally:
+            self._applying.active = False
+
+    async def run(self, retry_seconds: float = 1.0) -> None:
+        """Apply remote updates until cancelled, reconnecting after backplane errors."""
+
+        while True:
+            try:
+                async for payload in self.backplane.messages():
+                    try:
+                        self.apply(payload)
+                    except (KeyError, TypeError, ValueError):
+                        logger.warning("Dropping malformed backplane message")
+            except Exception:
+                logger.exception("Score backplane subscription failed, retrying")
+            await asyncio.sleep(retry_seconds)
+
+
+@lru_cache(1)
+def get_backplane() -> Backplane:
+    settings = get_settings()
+    if settings.backplane == "redis":
+        return RedisBackplane(settings.redis_url)
+    return InProcessBackplane()
+
+
+@lru_cache(1)
+def get_score_replicator() -> ScoreReplicator:
+    store = get_score_store()
+    replicator = ScoreReplicator(store, get_backplane())
+    store.add_listener(replicator)
+    store.set_version_source(replicator.next_version)
+    return replicator
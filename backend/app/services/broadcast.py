@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import deque
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Literal
+
+import numpy as np
+
+from ..core.config import get_settings
+from ..core.serialization import dumps
+from .score_store import ScoreSnapshot, get_score_store
+
+OverflowPolicy = Literal["drop_oldest", "coalesce"]
+
+
+@dataclass(frozen=True)
+class Frame:
+    """A server-sent event encoded once and shared by every subscriber."""
+
+    id: int
+    event: str
+    key: str | None
+    data: bytes
+
+
+def encode_frame(frame_id: int, event: str, payload: Any) -> bytes:
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (frame_id, event.encode(), dumps(payload))
+
+
+class Subscription:
+    """Bounded per-client queue fed by :class:`BroadcastHub`.
+
+    When the queue is full the ``coalesce`` policy keeps only the latest frame
+    of every key (e.g. one score per coin); ``drop_oldest`` discards the oldest
+    frame. Either way a stuck client holds at most ``maxsize`` frames.
+    """
+
+    def __init__(self, maxsize: int, overflow: OverflowPolicy) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._lock = threading.Lock()
+        self._frames: deque[Frame] = deque()
+        self._maxsize = maxsize
+        self._overflow = overflow
+        self.closed = False
+        self.dropped = 0
+
+    def push(self, frames: Iterable[Frame]) -> None:
+        with self._lock:
+            if self.closed:
+                return
+            self._frames.extend(frames)
+            if len(self._frames) > self._maxsize:
+                self._shrink()
+        self._wake()
+
+    def _shrink(self) -> None:
+        before = len(self._frames)
+        if self._overflow == "coalesce":
+            latest: dict[str | int, Frame] = {}
+            for frame in self._frames:
+                latest[frame.key if frame.key is not None else frame.id] = frame
+            self._frames = deque(sorted(latest.values(), key=lambda frame: frame.id))
+        while len(self._frames) > self._maxsize:
+            self._frames.popleft()
+        self.dropped += before - len(self._frames)
+
+    def _wake(self) -> None:
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._wakeup.set()
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            self.closed = True
+
+    def close(self) -> None:
+        self.closed = True
+        self._wake()
+
+    async def frames(self, timeout: float | None = None) -> AsyncIterator[Frame]:
+        """Yield queued frames until closed or ``timeout`` seconds have elapsed."""
+
+        deadline = None if timeout is None else self._loop.time() + timeout
+        while not self.closed:
+            with self._lock:
+                batch, self._frames = self._frames, deque()
+                if not batch:
+                    self._wakeup.clear()
+            if batch:
+                for frame in batch:
+                    yield frame
+                continue
+            remaining = None if deadline is None else deadline - self._loop.time()
+            if remaining is not None and remaining <= 0:
+                return
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), remaining)
+            except asyncio.TimeoutError:
+                return
+
+
+class BroadcastHub:
+    """Single producer, many subscribers: every event is serialized exactly once.
+
+    The last ``history`` frames are kept in a ring buffer so a reconnecting
+    client can resume from its ``Last-Event-ID``.
+    """
+
+    def __init__(
+        self,
+        history: int = 1024,
+        queue_size: int = 256,
+        overflow: OverflowPolicy = "coalesce",
+    ) -> None:
+        self._lock = threading.Lock()
+        self._history: deque[Frame] = deque(maxlen=history)
+        self._subscribers: set[Subscription] = set()
+        self._queue_size = queue_size
+        self._overflow = overflow
+        self._last_id = 0
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event: str, items: Iterable[tuple[str | None, Any]]) -> list[Frame]:
+        """Encode each ``(key, payload)`` once and fan the frames out."""
+
+        with self._lock:
+            frames = []
+            for key, payload in items:
+                self._last_id += 1
+                data = encode_frame(self._last_id, event, payload)
+                frames.append(Frame(self._last_id, event, key, data))
+            self._history.extend(frames)
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            subscriber.push(frames)
+        return frames
+
+    def subscribe(
+        self, last_event_id: int | None = None, initial: Iterable[Frame] = ()
+    ) -> Subscription:
+        """Register a subscriber, replaying history after ``last_event_id`` when possible.
+
+        ``initial`` is sent instead when the client is new or too far behind.
+        """
+
+        subscription = Subscription(self._queue_size, self._overflow)
+        with self._lock:
+            oldest = self._history[0].id if self._history else self._last_id + 1
+            if last_event_id is not None and oldest - 1 <= last_event_id <= self._last_id:
+                backlog = [frame for frame in self._history if frame.id > last_event_id]
+            else:
+                backlog = list(initial)
+            self._subscribers.add(subscription)
+        subscription.push(backlog)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+        subscription.close()
+
+    def close(self) -> None:
+        with self._lock:
+            subscribers, self._subscribers = list(self._subscribers), set()
+        for subscriber in subscribers:
+            subscriber.close()
+
+
+def _score_items(snapshot: ScoreSnapshot, rows: np.ndarray) -> Iterable[tuple[str, Any]]:
+    coins = snapshot.coins[rows].tolist()
+    scores = snapshot.scores[rows].tolist()
+    return ((coin, {"coin": coin, "score": score}) for coin, score in zip(coins, scores))
+
+
+class ScoreBroadcaster:
+    """Publishes the coins whose composite score changed between two snapshots."""
+
+    def __init__(self, hub: BroadcastHub) -> None:
+        self.hub = hub
+        self._initial: tuple[int, int, list[Frame]] | None = None
+
+    def __call__(self, previous: ScoreSnapshot, snapshot: ScoreSnapshot) -> None:
+        if np.array_equal(previous.coins, snapshot.coins):
+            rows = np.flatnonzero(previous.scores != snapshot.scores)
+        else:
+            rows = np.arange(len(snapshot))
+        if len(rows):
+            self.hub.publish("score", _score_items(snapshot, rows))
+
+    def initial_frames(self, snapshot: ScoreSnapshot) -> list[Frame]:
+        """Frames describing the whole snapshot, encoded once per version."""
+
+        last_id = self.hub.last_id
+        cached = self._initial
+        if cached is not None and cached[:2] == (snapshot.version, last_id):
+            return cached[2]
+        frames = [
+            Frame(last_id, "score", coin, encode_frame(last_id, "score", payload))
+            for coin, payload in _score_items(snapshot, np.arange(len(snapshot)))
+        ]
+        self._initial = (snapshot.version, last_id, frames)
+        return frames
+
+
+@lru_cache(1)
+def get_score_broadcaster() -> ScoreBroadcaster:
+    settings = get_settings()
+    hub = BroadcastHub(history=settings.stream_history, queue_size=settings.stream_queue_size)
+    broadcaster = ScoreBroadcaster(hub)
+    get_score_store().add_listener(broadcaster)
+    return broadcaster
@@ -1,6 +1,12 @@
 from __future__ import annotations
 
-from datetime import timedelta
+import base64
+import hashlib
+import hmac
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Any
 
 import boto3
@@ -8,8 +14,75 @@ from botocore.client import Config
 
 from ..core.config import get_settings
 
+ALGORITHM = "AWS4-HMAC-SHA256"
+
+
+class PostPolicySigner:
+    """Signs S3 browser-upload (POST policy) forms with SigV4.
+
+    The derived signing key only depends on the day, so it is computed once per
+    day instead of four HMACs per signature.
+    """
+
+    def __init__(self, access_key: str, secret_key: str, region: str, service: str = "s3") -> None:
+        self._access_key = access_key
+        self._secret_key = secret_key
+        self._region = region
+        self._service = service
+        self._lock = threading.Lock()
+        self._keys: dict[str, bytes] = {}
+
+    def signing_key(self, date_stamp: str) -> bytes:
+        with self._lock:
+            key = self._keys.get(date_stamp)
+            if key is None:
+                key = f"AWS4{self._secret_key}".encode()
+                for part in (date_stamp, self._region, self._service, "aws4_request"):
+                    key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+                self._keys = {date_stamp: key}
+            return key
+
+    def sign(
+        self,
+        bucket: str,
+        key: str,
+        fields: dict[str, str],
+        conditions: list[Any],
+        expires_in: int,
+        now: datetime | None = None,
+    ) -> dict[str, str]:
+        """Return the form fields, policy and signature for uploading ``key``."""
+
+        now = (now or datetime.now(timezone.utc)).astimezone(timezone.utc)
+        date_stamp = now.strftime("%Y%m%d")
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        credential = f"{self._access_key}/{date_stamp}/{self._region}/{self._service}/aws4_request"
+        signed_fields = {
+            **fields,
+            "key": key,
+            "x-amz-algorithm": ALGORITHM,
+            "x-amz-credential": credential,
+            "x-amz-date": amz_date,
+        }
+        policy = {
+            "expiration": (now + timedelta(seconds=expires_in)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "conditions": [
+                *conditions,
+                {"bucket": bucket},
+                {"key": key},
+                {"x-amz-algorithm": ALGORITHM},
+                {"x-amz-credential": credential},
+                {"x-amz-date": amz_date},
+            ],
+        }
+        encoded = base64.b64encode(json.dumps(policy).encode()).decode()
+        signature = hmac.new(self.signing_key(date_stamp), encoded.encode(), hashlib.sha256)
+        return {**signed_fields, "policy": encoded, "x-amz-signature": signature.hexdigest()}
+
 
 class FileService:
+    """Process-wide S3 access: one boto3 client and one policy signer."""
+
     def __init__(self) -> None:
         settings = get_settings()
         self._client = boto3.client(
@@ -17,21 +90,40 @@ class FileService:
             endpoint_url=str(settings.s3_endpoint),
             aws_access_key_id=settings.s3_access_key,
             aws_secret_access_key=settings.s3_secret_key,
-            config=Config(signature_version="s3v4"),
+            region_name=settings.s3_region,
+            config=Config(signature_version="s3v4", s3={"addressing_style": "path"}),
         )
         self._bucket = settings.s3_bucket
+        self._upload_url = f"{self._client.meta.endpoint_url.rstrip('/')}/{self._bucket}"
+        self._signer = PostPolicySigner(
+            settings.s3_access_key, settings.s3_secret_key, settings.s3_region
+        )
+
+    @property
+    def client(self) -> Any:
+        return self._client
+
+    @property
+    def bucket(self) -> str:
+        return self._bucket
 
-    def create_upload_signature(self, object_name: str, expires_in: int) -> dict[str, Any]:
+    def create_upload_signature(
+        self, object_name: str, expires_in: int, now: datetime | None = None
+    ) -> dict[str, Any]:
         fields = {"acl": "private", "success_action_status": "201"}
-        conditions: list[Any] = [{"acl": "private"}]
-        return self._client.generate_presigned_post(
-            Bucket=self._bucket,
-            Key=object_name,
-            Fields=fields,
-            Conditions=conditions,
-            ExpiresIn=expires_in,
-        )
+        conditions: list[Any] = [{"acl": "private"}, {"success_action_status": "201"}]
+        signed = self._signer.sign(self._bucket, object_name, fields, conditions, expires_in, now)
+        return {"url": self._upload_url, "fields": signed}
+
+    def create_upload_signatures(
+        self, object_names: list[str], expires_in: int
+    ) -> list[dict[str, Any]]:
+        """Sign every object name with one timestamp, sharing the derived key."""
+
+        now = datetime.now(timezone.utc)
+        return [self.create_upload_signature(name, expires_in, now) for name in object_names]
 
 
+@lru_cache(1)
 def get_file_service() -> FileService:
     return FileService()
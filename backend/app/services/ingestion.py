@@ -0,0 +1,364 @@
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import json
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, BinaryIO, Literal
+
+import numpy as np
+from prometheus_client import Counter
+
+from ..core.config import get_settings
+from .score_inputs import InputStore
+
+DatasetFormat = Literal["csv", "ndjson", "parquet"]
+
+FORMATS: dict[str, DatasetFormat] = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".parquet": "parquet",
+}
+
+INGESTED_ROWS = Counter(
+    "tokenlysis_ingested_rows_total",
+    "Dataset rows read by the ingestion pipeline.",
+    ["format", "outcome"],
+)
+
+
+class UnsupportedFormat(ValueError):
+    """Raised for a dataset whose format cannot be inferred or read here."""
+
+
+@dataclass(frozen=True)
+class ColumnBatch:
+    """Up to ``batch_rows`` parsed rows: coin ids and a ``coins x features`` float matrix.
+
+    ``rejected`` counts the rows dropped since the previous batch.
+    """
+
+    coins: list[str]
+    feature_names: tuple[str, ...]
+    values: np.ndarray
+    rejected: int = 0
+
+
+@dataclass
+class IngestionReport:
+    key: str
+    format: str
+    rows: int = 0
+    rejected: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    coins: set[str] = field(default_factory=set, repr=False)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "key": self.key,
+            "format": self.format,
+            "rows": self.rows,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "coins": len(self.coins),
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+        }
+
+
+class ObjectSource(ABC):
+    """Where uploaded datasets are read from."""
+
+    @abstractmethod
+    def open(self, key: str) -> BinaryIO:
+        """Open ``key`` as a buffered, seekable binary stream."""
+
+
+class LocalObjectSource(ObjectSource):
+    """Datasets stored under a local directory, standing in for the bucket."""
+
+    def __init__(self, root: str | Path, read_bytes: int = io.DEFAULT_BUFFER_SIZE) -> None:
+        self._root = Path(root).resolve()
+        self._read_bytes = read_bytes
+
+    def open(self, key: str) -> BinaryIO:
+        path = (self._root / key).resolve()
+        if not path.is_relative_to(self._root):
+            raise FileNotFoundError(key)
+        return open(path, "rb", buffering=self._read_bytes)
+
+
+class _S3RangeReader(io.RawIOBase):
+    """Seekable view of an S3 object that fetches each read with a ranged GET."""
+
+    def __init__(self, client: Any, bucket: str, key: str) -> None:
+        self._client = client
+        self._bucket = bucket
+        self._key = key
+        self._size = int(client.head_object(Bucket=bucket, Key=key)["ContentLength"])
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: self._size}[whence]
+        self._position = max(base + offset, 0)
+        return self._position
+
+    def readinto(self, buffer: Any) -> int:
+        if self._position >= self._size or not len(buffer):
+            return 0
+        end = min(self._position + len(buffer), self._size) - 1
+        response = self._client.get_object(
+            Bucket=self._bucket, Key=self._key, Range=f"bytes={self._position}-{end}"
+        )
+        data = response["Body"].read()
+        buffer[: len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+
+class S3ObjectSource(ObjectSource):
+    """Datasets in the upload bucket, read ``read_bytes`` at a time on the pooled client."""
+
+    def __init__(self, client: Any, bucket: str, read_bytes: int) -> None:
+        self._client = client
+        self._bucket = bucket
+        self._read_bytes = read_bytes
+
+    def open(self, key: str) -> BinaryIO:
+        raw = _S3RangeReader(self._client, self._bucket, key)
+        return io.BufferedReader(raw, buffer_size=self._read_bytes)  # type: ignore[return-value]
+
+
+@lru_cache(1)
+def get_object_source() -> ObjectSource:
+    settings = get_settings()
+    if settings.ingestion_source == "local":
+        return LocalObjectSource(settings.ingestion_local_root, settings.ingestion_read_bytes)
+    from .files import get_file_service
+
+    service = get_file_service()
+    return S3ObjectSource(service.client, service.bucket, settings.ingestion_read_bytes)
+
+
+def detect_format(key: str, explicit: str | None = None) -> tuple[DatasetFormat, bool]:
+    """Return the dataset format of ``key`` and whether it is gzip-compressed."""
+
+    compressed = key.lower().endswith(".gz")
+    if explicit is not None:
+        if explicit not in FORMATS.values():
+            raise UnsupportedFormat(f"Unsupported format: {explicit}")
+        return explicit, compressed  # type: ignore[return-value]
+    stem = key[:-3] if compressed else key
+    suffix = Path(stem).suffix.lower()
+    if suffix not in FORMATS:
+        raise UnsupportedFormat(f"Cannot infer the format of {key}")
+    return FORMATS[suffix], compressed
+
+
+def _parse_float(cell: str) -> float | None:
+    try:
+        return float(cell) if cell.strip() else float("nan")
+    except ValueError:
+        return None
+
+
+def _csv_matrix(cells: list[list[str]], width: int) -> tuple[np.ndarray, np.ndarray]:
+    """Convert string cells at once, falling back to row by row when one is malformed."""
+
+    raw = np.array(cells, dtype=np.str_).reshape(len(cells), width)
+    try:
+        values = np.where(np.char.strip(raw) == "", "nan", raw).astype(np.float64)
+        return values, np.ones(len(cells), dtype=bool)
+    except ValueError:
+        pass
+    values = np.full((len(cells), width), np.nan)
+    valid = np.ones(len(cells), dtype=bool)
+    for index, row in enumerate(cells):
+        parsed = [_parse_float(cell) for cell in row]
+        if any(value is None for value in parsed):
+            valid[index] = False
+        else:
+            values[index] = parsed
+    return values, valid
+
+
+def read_csv(stream: BinaryIO, batch_rows: int) -> Iterator[ColumnBatch]:
+    """Stream a CSV with a ``coin`` column; every other column is a numeric feature."""
+
+    reader = csv.reader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    header = next(reader, None)
+    if header is None:
+        return
+    header = [name.strip() for name in header]
+    if "coin" not in header:
+        raise ValueError("CSV must have a header row with a coin column")
+    coin_index = header.index("coin")
+    names = tuple(name for index, name in enumerate(header) if index != coin_index)
+    coins: list[str] = []
+    cells: list[list[str]] = []
+    rejected = 0
+
+    def flush() -> ColumnBatch:
+        values, valid = _csv_matrix(cells, len(names))
+        kept = [coin for coin, ok in zip(coins, valid.tolist()) if ok]
+        return ColumnBatch(kept, names, values[valid], rejected + int((~valid).sum()))
+
+    for record in reader:
+        if len(record) != len(header) or not record[coin_index].strip():
+            rejected += 1
+            continue
+        coins.append(record[coin_index].strip())
+        cells.append(record[:coin_index] + record[coin_index + 1 :])
+        if len(coins) >= batch_rows:
+            yield flush()
+            coins, cells, rejected = [], [], 0
+    if coins or rejected:
+        yield flush()
+
+
+def read_ndjson(stream: BinaryIO, batch_rows: int) -> Iterator[ColumnBatch]:
+    """Stream one JSON object per line; numeric fields other than ``coin`` are features."""
+
+    coins: list[str] = []
+    rows: list[dict[str, float]] = []
+    columns: dict[str, int] = {}
+    rejected = 0
+
+    def flush() -> ColumnBatch:
+        values = np.full((len(rows), len(columns)), np.nan)
+        for index, row in enumerate(rows):
+            for name, value in row.items():
+                values[index, columns[name]] = value
+        return ColumnBatch(coins, tuple(columns), values, rejected)
+
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            coin = record.pop("coin")
+            if not isinstance(coin, str) or not coin.strip():
+                raise ValueError("coin")
+            row = {
+                name: float("nan") if value is None else float(value)
+                for name, value in record.items()
+                if not isinstance(value, bool)
+            }
+        except (ValueError, TypeError, KeyError, AttributeError):
+            rejected += 1
+            continue
+        for name in row:
+            columns.setdefault(name, len(columns))
+        coins.append(coin.strip())
+        rows.append(row)
+        if len(coins) >= batch_rows:
+            yield flush()
+            coins, rows, columns, rejected = [], [], {}, 0
+    if coins or rejected:
+        yield flush()
+
+
+def read_parquet(stream: BinaryIO, batch_rows: int) -> Iterator[ColumnBatch]:
+    """Stream record batches of a Parquet file; integer and float columns are features."""
+
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:  # pragma: no cover - pinned, imported on first use
+        raise UnsupportedFormat("Parquet ingestion requires pyarrow") from exc
+
+    parquet = pq.ParquetFile(stream)
+    schema = parquet.schema_arrow
+    if "coin" not in schema.names:
+        raise ValueError("Parquet file must have a coin column")
+    names = tuple(
+        column.name
+        for column in schema
+        if column.name != "coin"
+        and (pa.types.is_integer(column.type) or pa.types.is_floating(column.type))
+    )
+    for record_batch in parquet.iter_batches(batch_size=batch_rows, columns=["coin", *names]):
+        coins = record_batch.column("coin").to_pylist()
+        valid = np.array([isinstance(coin, str) and bool(coin) for coin in coins], dtype=bool)
+        columns = [
+            record_batch.column(name).to_numpy(zero_copy_only=False).astype(np.float64)
+            for name in names
+        ]
+        values = np.column_stack(columns) if columns else np.empty((len(coins), 0))
+        kept = [coin for coin, ok in zip(coins, valid.tolist()) if ok]
+        yield ColumnBatch(kept, names, values[valid], int((~valid).sum()))
+
+
+READERS: dict[DatasetFormat, Callable[[BinaryIO, int], Iterator[ColumnBatch]]] = {
+    "csv": read_csv,
+    "ndjson": read_ndjson,
+    "parquet": read_parquet,
+}
+
+
+@contextmanager
+def open_dataset(source: ObjectSource, key: str, compressed: bool) -> Iterator[BinaryIO]:
+    with source.open(key) as stream:
+        if compressed:
+            with gzip.GzipFile(fileobj=stream) as decompressed:
+                yield decompressed  # type: ignore[misc]
+        else:
+            yield stream
+
+
+def ingest(
+    source: ObjectSource,
+    key: str,
+    store: InputStore,
+    fmt: str | None = None,
+    batch_rows: int = 50_000,
+    progress: Callable[[IngestionReport], None] | None = None,
+) -> IngestionReport:
+    """Stream ``key`` from ``source`` into ``store`` one columnar batch at a time.
+
+    Memory stays bounded by ``batch_rows`` and the source read size, whatever
+    the size of the object. ``progress`` is called after every batch.
+    """
+
+    dataset_format, compressed = detect_format(key, fmt)
+    if dataset_format == "parquet" and compressed:
+        raise UnsupportedFormat("Parquet files cannot be gzip-compressed")
+    report = IngestionReport(key=key, format=dataset_format)
+    started = time.perf_counter()
+    with open_dataset(source, key, compressed) as stream:
+        for batch in READERS[dataset_format](stream, batch_rows):
+            if batch.coins:
+                store.upsert_many(batch.coins, batch.feature_names, batch.values)
+            report.rows += len(batch.coins)
+            report.rejected += batch.rejected
+            report.batches += 1
+            report.coins.update(batch.coins)
+            report.seconds = time.perf_counter() - started
+            INGESTED_ROWS.labels(dataset_format, "accepted").inc(len(batch.coins))
+            INGESTED_ROWS.labels(dataset_format, "rejected").inc(batch.rejected)
+            if progress is not None:
+                progress(report)
+    report.seconds = time.perf_counter() - started
+    return report
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import threading
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
+
+import httpx
+import numpy as np
+
+from ..core.config import get_settings
+from .score_inputs import InputStore
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# CoinGecko ``/coins/markets`` field -> scoring feature
+MARKET_FEATURES: dict[str, str] = {
+    "market_cap": "market_cap",
+    "total_volume": "volume_24h",
+}
+
+
+@dataclass
+class _Validators:
+    etag: str | None
+    last_modified: str | None
+    payload: Any
+
+
+@dataclass
+class RefreshReport:
+    requests: int = 0
+    not_modified: int = 0
+    refreshed: list[str] = field(default_factory=list)
+
+
+def write_features(store: InputStore, coins: list[str], values: np.ndarray) -> None:
+    if coins:
+        store.upsert_many(coins, list(MARKET_FEATURES.values()), values)
+
+
+class MarketDataClient:
+    """Fetches coin metrics from a CoinGecko-compatible API.
+
+    All requests share ``client``'s connection pool; at most ``per_host``
+    requests run against one host at a time. Responses carrying an ``ETag`` or
+    ``Last-Modified`` are remembered and revalidated, so an unchanged batch
+    costs a ``304`` and is not written again.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        vs_currency: str = "usd",
+        batch_size: int = 250,
+        per_host: int = 4,
+        retries: int = 3,
+        backoff_seconds: float = 0.5,
+        max_backoff_seconds: float = 30.0,
+    ) -> None:
+        self._client = client
+        self._vs_currency = vs_currency
+        self._batch_size = batch_size
+        self._per_host = per_host
+        self._retries = retries
+        self._backoff = backoff_seconds
+        self._max_backoff = max_backoff_seconds
+        self._hosts: dict[str, asyncio.Semaphore] = {}
+        self._validators: dict[str, _Validators] = {}
+
+    def _host_limit(self, url: httpx.URL) -> asyncio.Semaphore:
+        semaphore = self._hosts.get(url.host)
+        if semaphore is None:
+            semaphore = self._hosts[url.host] = asyncio.Semaphore(self._per_host)
+        return semaphore
+
+    def _delay(self, attempt: int, response: httpx.Response | None) -> float:
+        delay = random.uniform(0, min(self._max_backoff, self._backoff * 2**attempt))
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, min(float(retry_after), self._max_backoff))
+        return delay
+
+    async def get_json(self, path: str, params: Mapping[str, str]) -> tuple[Any, bool]:
+        """GET ``path`` and return its JSON body and whether it changed since the last call."""
+
+        request = self._client.build_request("GET", path, params=params)
+        key = str(request.url)
+        cached = self._validators.get(key)
+        if cached is not None:
+            if cached.etag:
+                request.headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                request.headers["If-Modified-Since"] = cached.last_modified
+        attempt = 0
+        while True:
+            response: httpx.Response | None = None
+            try:
+                async with self._host_limit(request.url):
+                    response = await self._client.send(request)
+            except httpx.TransportError:
+                if attempt >= self._retries:
+                    raise
+            else:
+                if response.status_code == 304 and cached is not None:
+                    return cached.payload, False
+                if response.status_code not in RETRY_STATUSES or attempt >= self._retries:
+                    response.raise_for_status()
+                    break
+            await asyncio.sleep(self._delay(attempt, response))
+            attempt += 1
+        payload = response.json()
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            self._validators[key] = _Validators(etag, last_modified, payload)
+        return payload, True
+
+    async def fetch_markets(self, ids: Sequence[str]) -> tuple[list[dict[str, Any]], int, int]:
+        """Market rows of ``ids`` via batched ``/coins/markets`` calls, fetched concurrently.
+
+        Returns the rows of the batches that changed, the request count and how
+        many batches were not modified.
+        """
+
+        ordered = sorted(set(ids))
+        batches = [
+            ordered[start : start + self._batch_size]
+            for start in range(0, len(ordered), self._batch_size)
+        ]
+        results = await asyncio.gather(
+            *(
+                self.get_json(
+                    "coins/markets",
+                    {
+                        "vs_currency": self._vs_currency,
+                        "ids": ",".join(batch),
+                        "per_page": str(len(batch)),
+                        "page": "1",
+                    },
+                )
+                for batch in batches
+            )
+        )
+        rows = [row for payload, changed in results if changed for row in payload]
+        return rows, len(batches), sum(1 for _, changed in results if not changed)
+
+    async def fetch_features(
+        self, coins: Mapping[str, str]
+    ) -> tuple[RefreshReport, list[str], np.ndarray]:
+        """Fetch ``coins`` (local id -> upstream id) and return their market features.
+
+        Returns the report, the coins of the changed batches and one row of
+        :data:`MARKET_FEATURES` values per coin.
+        """
+
+        upstream = {remote: coin for coin, remote in coins.items()}
+        rows, requests, not_modified = await self.fetch_markets(list(upstream))
+        report = RefreshReport(requests=requests, not_modified=not_modified)
+        refreshed: list[str] = []
+        values: list[list[float]] = []
+        for row in rows:
+            coin = upstream.get(row.get("id"))
+            if coin is None:
+                continue
+            refreshed.append(coin)
+            values.append(
+                [
+                    float(row[source]) if row.get(source) is not None else np.nan
+                    for source in MARKET_FEATURES
+                ]
+            )
+        report.refreshed = sorted(refreshed)
+        return report, refreshed, np.array(values).reshape(len(refreshed), len(MARKET_FEATURES))
+
+    async def refresh(self, store: InputStore, coins: Mapping[str, str]) -> RefreshReport:
+        """Fetch ``coins`` and upsert their market features; the store marks changes dirty."""
+
+        report, refreshed, values = await self.fetch_features(coins)
+        write_features(store, refreshed, values)
+        return report
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+class MarketDataFetcher:
+    """Owns the pooled HTTP client on a private event loop thread.
+
+    Dramatiq actors are synchronous; running every refresh on the same loop
+    keeps the connection pool (and the revalidation cache) alive between runs.
+    """
+
+    def __init__(self) -> None:
+        self._client: MarketDataClient | None = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="market-data", daemon=True
+        )
+        self._thread.start()
+
+    def _get_client(self) -> MarketDataClient:
+        if self._client is None:
+            settings = get_settings()
+            http = httpx.AsyncClient(
+                base_url=settings.market_data_url.rstrip("/") + "/",
+                timeout=settings.market_data_timeout,
+                limits=httpx.Limits(
+                    max_connections=settings.market_data_max_connections,
+                    max_keepalive_connections=settings.market_data_max_connections,
+                ),
+                headers={"Accept": "application/json"},
+            )
+            self._client = MarketDataClient(
+                http,
+                vs_currency=settings.market_data_vs_currency,
+                batch_size=settings.market_data_batch_size,
+                per_host=settings.market_data_per_host,
+                retries=settings.market_data_retries,
+                backoff_seconds=settings.market_data_backoff_seconds,
+            )
+        return self._client
+
+    def refresh(self, store: InputStore, coins: Sequence[str] | None = None) -> RefreshReport:
+        """Fetch on the private loop, then write ``store`` from the calling thread.
+
+        ``store`` may be the shared Redis input store; its blocking writes must
+        not stall the fetches of other callers.
+        """
+
+        ids = get_settings().market_data_ids
+        wanted = ids if coins is None else coins
+        selected = {coin: ids[coin] for coin in wanted if coin in ids}
+
+        async def run() -> tuple[RefreshReport, list[str], np.ndarray]:
+            return await self._get_client().fetch_features(selected)
+
+        report, refreshed, values = asyncio.run_coroutine_threadsafe(run(), self._loop).result()
+        write_features(store, refreshed, values)
+        return report
+
+    def close(self) -> None:
+        async def close_client() -> None:
+            if self._client is not None:
+                await self._client.aclose()
+
+        asyncio.run_coroutine_threadsafe(close_client(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+@lru_cache(1)
+def get_market_data_fetcher() -> MarketDataFetcher:
+    return MarketDataFetcher()
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import base64
+import json
+import threading
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from .score_store import ScoreSnapshot, get_score_store
+
+RankKey = tuple[float, str]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class UnknownTheme(LookupError):
+    pass
+
+
+def encode_cursor(key: RankKey) -> str:
+    raw = json.dumps([key[0], key[1]], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> RankKey:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, coin = json.loads(base64.urlsafe_b64decode(padded))
+        return float(score), str(coin)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor(cursor) from exc
+
+
+@dataclass(frozen=True)
+class RankedCoin:
+    rank: int
+    coin: str
+    score: float
+
+
+class RankingIndex:
+    """Coins kept sorted by descending score, ties broken by coin id.
+
+    Keys are stored as ``(-score, coin)`` in an ascending list, so rank lookups
+    and cursor seeks are binary searches and a score change only moves one key.
+    """
+
+    def __init__(self) -> None:
+        self._keys: list[RankKey] = []
+        self._scores: dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def update(self, coin: str, score: float) -> None:
+        previous = self._scores.get(coin)
+        if previous == score:
+            return
+        if previous is not None:
+            del self._keys[bisect_left(self._keys, (-previous, coin))]
+        self._scores[coin] = score
+        insort(self._keys, (-score, coin))
+
+    def remove(self, coin: str) -> None:
+        previous = self._scores.pop(coin, None)
+        if previous is not None:
+            del self._keys[bisect_left(self._keys, (-previous, coin))]
+
+    def rank(self, coin: str) -> RankedCoin | None:
+        score = self._scores.get(coin)
+        if score is None:
+            return None
+        return RankedCoin(bisect_left(self._keys, (-score, coin)) + 1, coin, score)
+
+    def page(
+        self, limit: int, after: RankKey | None = None
+    ) -> tuple[list[RankedCoin], RankKey | None]:
+        start = 0 if after is None else bisect_right(self._keys, after)
+        keys = self._keys[start : start + limit]
+        items = [
+            RankedCoin(start + offset + 1, coin, -negated)
+            for offset, (negated, coin) in enumerate(keys)
+        ]
+        has_more = start + limit < len(self._keys)
+        return items, (keys[-1] if keys and has_more else None)
+
+
+class Rankings:
+    """Composite and per-theme ranking indexes kept in sync with the score store."""
+
+    def __init__(self, snapshot: ScoreSnapshot) -> None:
+        self._lock = threading.Lock()
+        self._indexes: dict[str | None, RankingIndex] = {}
+        self.version = 0
+        self.apply(None, snapshot)
+
+    def apply(self, previous: ScoreSnapshot | None, snapshot: ScoreSnapshot) -> None:
+        """Move only the coins whose score differs from ``previous``."""
+
+        with self._lock:
+            for theme in (None, *snapshot.themes):
+                index = self._indexes.setdefault(theme, RankingIndex())
+                scores = snapshot.column(theme)
+                if previous is not None and theme in (None, *previous.themes):
+                    if np.array_equal(previous.coins, snapshot.coins):
+                        changed = np.flatnonzero(previous.column(theme) != scores)
+                    else:
+                        for coin in set(previous.positions) - set(snapshot.positions):
+                            index.remove(coin)
+                        changed = np.arange(len(snapshot))
+                else:
+                    changed = np.arange(len(snapshot))
+                coins = snapshot.coins[changed].tolist()
+                for coin, score in zip(coins, scores[changed].tolist()):
+                    index.update(coin, score)
+            for theme in set(self._indexes) - {None, *snapshot.themes}:
+                del self._indexes[theme]
+            self.version = snapshot.version
+
+    def _index(self, theme: str | None) -> RankingIndex:
+        index = self._indexes.get(theme)
+        if index is None:
+            raise UnknownTheme(theme)
+        return index
+
+    def page(
+        self, limit: int, cursor: str | None = None, theme: str | None = None
+    ) -> tuple[int, list[RankedCoin], str | None]:
+        """Version, items and next cursor of one page, read under a single lock."""
+
+        after = decode_cursor(cursor) if cursor else None
+        with self._lock:
+            items, last = self._index(theme).page(limit, after)
+            version = self.version
+        return version, items, (encode_cursor(last) if last is not None else None)
+
+    def rank(self, coin: str, theme: str | None = None) -> tuple[RankedCoin | None, int]:
+        with self._lock:
+            index = self._index(theme)
+            return index.rank(coin), len(index)
+
+
+@lru_cache(1)
+def get_rankings() -> Rankings:
+    store = get_score_store()
+    rankings = Rankings(store.snapshot)
+    store.add_listener(rankings.apply)
+    return rankings
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+import brotli
+
+from .score_store import ScoreSnapshot, get_score_store
+
+MIN_COMPRESS_BYTES = 512
+
+
+def _compress(body: bytes) -> dict[str, bytes]:
+    if len(body) < MIN_COMPRESS_BYTES:
+        return {}
+    return {
+        "gzip": gzip.compress(body, compresslevel=6, mtime=0),
+        "br": brotli.compress(body, quality=5),
+    }
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    """A serialized response body with its pre-compressed variants and strong ETag."""
+
+    body: bytes
+    etag: str
+    encoded: dict[str, bytes] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, body: bytes) -> CachedBody:
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        return cls(body=body, etag=f'"{digest}"', encoded=_compress(body))
+
+    def etag_for(self, encoding: str | None) -> str:
+        """Strong ETags must differ between content codings of the same body."""
+
+        return self.etag if encoding is None else f'{self.etag[:-1]}-{encoding}"'
+
+    def matches(self, if_none_match: str, encoding: str | None = None) -> bool:
+        """Whether ``If-None-Match`` names the variant served with ``encoding``."""
+
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or self.etag_for(encoding) in tags
+
+
+class ResponseCache:
+    """Bodies of snapshot-derived responses keyed by snapshot version and query.
+
+    Entries are dropped when a new snapshot is published; keys also carry the
+    version so a body rendered from an older snapshot is never served.
+    """
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+        self._entries: OrderedDict[Hashable, CachedBody] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> CachedBody | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def fill(self, key: Hashable, render: Callable[[], bytes]) -> CachedBody:
+        """Render, compress and store the body of ``key``."""
+
+        entry = CachedBody.build(render())
+        with self._lock:
+            self._entries[key] = entry
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def get_or_render(self, key: Hashable, render: Callable[[], bytes]) -> CachedBody:
+        entry = self.get(key)
+        return entry if entry is not None else self.fill(key, render)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __call__(self, previous: ScoreSnapshot, snapshot: ScoreSnapshot) -> None:
+        self.clear()
+
+
+@lru_cache(1)
+def get_response_cache() -> ResponseCache:
+    cache = ResponseCache()
+    get_score_store().add_listener(cache)
+    return cache
@@ -0,0 +1,358 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import queue
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
+
+from ..core.config import get_settings
+from ..db.session import build_engine
+from ..models.score import ScoreHistory, ScoreRollup, ScoreSnapshotRecord
+from .score_store import ScoreSnapshot
+
+logger = logging.getLogger(__name__)
+
+_Pending = tuple[ScoreSnapshot, datetime, Future[None]]
+
+RESOLUTIONS: dict[str, timedelta] = {
+    "5m": timedelta(minutes=5),
+    "1h": timedelta(hours=1),
+    "1d": timedelta(days=1),
+}
+
+_PG_WRITE_SNAPSHOT = text(
+    """
+    WITH snapshot AS (
+        INSERT INTO score_snapshots (version, recorded_at, coins, themes)
+        VALUES (:version, :recorded_at, :count, CAST(:themes AS json))
+    ), history AS (
+        INSERT INTO score_history (coin, recorded_at, version, score, theme_scores)
+        SELECT coin, :recorded_at, :version, score, CAST(theme_scores AS jsonb)
+        FROM unnest(
+            CAST(:coins AS text[]), CAST(:scores AS float8[]), CAST(:theme_scores AS text[])
+        ) AS rows(coin, score, theme_scores)
+        ON CONFLICT DO NOTHING
+        RETURNING coin, score
+    )
+    INSERT INTO score_rollups AS rollup
+        (coin, resolution, bucket_start, open, high, low, close, samples)
+    SELECT coin, resolution, bucket_start, score, score, score, score, 1
+    FROM history
+    CROSS JOIN unnest(CAST(:resolutions AS text[]), CAST(:buckets AS timestamptz[]))
+        AS buckets(resolution, bucket_start)
+    ON CONFLICT (coin, resolution, bucket_start) DO UPDATE SET
+        high = GREATEST(rollup.high, EXCLUDED.high),
+        low = LEAST(rollup.low, EXCLUDED.low),
+        close = EXCLUDED.close,
+        samples = rollup.samples + 1
+    """
+)
+
+
+def bucket_start(moment: datetime, step: timedelta) -> datetime:
+    seconds = int(step.total_seconds())
+    timestamp = int(moment.timestamp())
+    return datetime.fromtimestamp(timestamp - timestamp % seconds, tz=timezone.utc)
+
+
+def _month_start(moment: datetime) -> datetime:
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(month: datetime) -> datetime:
+    return month.replace(year=month.year + month.month // 12, month=month.month % 12 + 1)
+
+
+async def ensure_partition(conn: AsyncConnection, moment: datetime) -> str:
+    """Create the monthly ``score_history`` partition holding ``moment`` (PostgreSQL)."""
+
+    month = _month_start(moment.astimezone(timezone.utc))
+    name = f"score_history_y{month:%Y}m{month:%m}"
+    await conn.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF score_history "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+        )
+    )
+    return name
+
+
+async def write_snapshot(
+    conn: AsyncConnection, snapshot: ScoreSnapshot, recorded_at: datetime
+) -> None:
+    """Persist ``snapshot``, its per-coin rows, and fold it into every rollup bucket.
+
+    PostgreSQL gets a single statement whose parameters are arrays, so the
+    round trip and the parameter count do not grow with the universe; other
+    dialects insert the rows with ``executemany``. Only rows that were actually
+    inserted reach the rollups, so writing the same snapshot twice is a no-op.
+    """
+
+    coins = snapshot.coins.tolist()
+    scores = snapshot.scores.tolist()
+    themes = list(snapshot.themes)
+    theme_scores = [dict(zip(themes, row)) for row in snapshot.theme_scores.tolist()]
+    buckets = {name: bucket_start(recorded_at, step) for name, step in RESOLUTIONS.items()}
+    if conn.dialect.name == "postgresql":
+        await conn.execute(
+            _PG_WRITE_SNAPSHOT,
+            {
+                "version": snapshot.version,
+                "recorded_at": recorded_at,
+                "count": len(coins),
+                "themes": json.dumps(themes),
+                "coins": coins,
+                "scores": scores,
+                "theme_scores": [json.dumps(row) for row in theme_scores],
+                "resolutions": list(buckets),
+                "buckets": list(buckets.values()),
+            },
+        )
+        return
+    await conn.execute(
+        insert(ScoreSnapshotRecord).values(
+            version=snapshot.version, recorded_at=recorded_at, coins=len(coins), themes=themes
+        )
+    )
+    if not coins:
+        return
+    inserted = await conn.execute(
+        sqlite_insert(ScoreHistory)
+        .on_conflict_do_nothing()
+        .returning(ScoreHistory.coin, ScoreHistory.score),
+        [
+            {
+                "coin": coin,
+                "recorded_at": recorded_at,
+                "version": snapshot.version,
+                "score": score,
+                "theme_scores": row,
+            }
+            for coin, score, row in zip(coins, scores, theme_scores)
+        ],
+    )
+    rows = inserted.all()
+    if not rows:
+        return
+    upsert = sqlite_insert(ScoreRollup)
+    upsert = upsert.on_conflict_do_update(
+        index_elements=[ScoreRollup.coin, ScoreRollup.resolution, ScoreRollup.bucket_start],
+        set_={
+            "high": func.max(ScoreRollup.high, upsert.excluded.high),
+            "low": func.min(ScoreRollup.low, upsert.excluded.low),
+            "close": upsert.excluded.close,
+            "samples": ScoreRollup.samples + 1,
+        },
+    )
+    await conn.execute(
+        upsert,
+        [
+            {
+                "coin": coin,
+                "resolution": resolution,
+                "bucket_start": start,
+                "open": score,
+                "high": score,
+                "low": score,
+                "close": score,
+                "samples": 1,
+            }
+            for resolution, start in buckets.items()
+            for coin, score in rows
+        ],
+    )
+
+
+async def prune_rollups(conn: AsyncConnection, cutoffs: dict[str, datetime]) -> int:
+    """Delete the buckets of each resolution that start before its cutoff."""
+
+    deleted = 0
+    for resolution, cutoff in cutoffs.items():
+        result = await conn.execute(
+            delete(ScoreRollup).where(
+                ScoreRollup.resolution == resolution, ScoreRollup.bucket_start < cutoff
+            )
+        )
+        deleted += result.rowcount
+    return deleted
+
+
+def retention_cutoffs(now: datetime, fine_retention: timedelta) -> dict[str, datetime]:
+    """Oldest bucket kept per resolution; the coarse rollups are kept forever."""
+
+    return {"5m": bucket_start(now - fine_retention, RESOLUTIONS["5m"])}
+
+
+def choose_resolution(
+    start: datetime,
+    end: datetime,
+    max_buckets: int,
+    cutoffs: dict[str, datetime] | None = None,
+) -> str | None:
+    """Finest resolution covering ``start``..``end`` in at most ``max_buckets`` buckets.
+
+    Resolutions whose retention ``cutoffs`` fall after ``start`` are skipped.
+    """
+
+    for name, step in RESOLUTIONS.items():
+        if cutoffs is not None and name in cutoffs and start < cutoffs[name]:
+            continue
+        if (end - start) / step <= max_buckets:
+            return name
+    return None
+
+
+async def has_history(session: AsyncSession, coin: str) -> bool:
+    """Whether any rollup of ``coin`` exists, including coins no longer listed."""
+
+    query = select(ScoreRollup.coin).where(ScoreRollup.coin == coin).limit(1)
+    return (await session.execute(query)).first() is not None
+
+
+async def load_rollups(
+    session: AsyncSession, coin: str, resolution: str, start: datetime, end: datetime
+) -> list[Any]:
+    """Buckets of ``coin`` starting in ``[start, end)``, read from the primary key index."""
+
+    query = (
+        select(
+            ScoreRollup.bucket_start,
+            ScoreRollup.open,
+            ScoreRollup.high,
+            ScoreRollup.low,
+            ScoreRollup.close,
+        )
+        .where(
+            ScoreRollup.coin == coin,
+            ScoreRollup.resolution == resolution,
+            ScoreRollup.bucket_start >= bucket_start(start, RESOLUTIONS[resolution]),
+            ScoreRollup.bucket_start < end,
+        )
+        .order_by(ScoreRollup.bucket_start)
+    )
+    return list((await session.execute(query)).all())
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of ``threshold`` points keeping the shape."""
+
+    size = len(x)
+    if threshold >= size or threshold < 3:
+        return np.arange(size)
+    selected = np.empty(threshold, dtype=np.intp)
+    selected[0], selected[-1] = 0, size - 1
+    edges = np.linspace(1, size - 1, threshold - 1).astype(np.intp)
+    previous = 0
+    for index in range(threshold - 2):
+        lo, hi = edges[index], edges[index + 1]
+        next_lo, next_hi = hi, edges[index + 2] if index + 2 < len(edges) else size
+        if next_hi <= next_lo:
+            next_hi = next_lo + 1
+        avg_x, avg_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        area = np.abs(
+            (x[previous] - avg_x) * (y[lo:hi] - y[previous])
+            - (x[previous] - x[lo:hi]) * (avg_y - y[previous])
+        )
+        previous = lo + int(np.argmax(area))
+        selected[index + 1] = previous
+    return selected
+
+
+class ScoreHistoryWriter:
+    """Persists published snapshots off the recalculation path.
+
+    Snapshots are queued and written one at a time, in submission order, by a
+    private thread with its own event loop and engine, so the synchronous
+    Dramatiq actors never wait for the database. :meth:`submit` blocks once
+    ``max_pending`` snapshots are waiting. Fine rollups older than
+    ``fine_retention`` are pruned at most once an hour.
+    """
+
+    def __init__(
+        self,
+        engine_factory: Callable[[], AsyncEngine],
+        max_pending: int = 8,
+        fine_retention: timedelta | None = None,
+    ) -> None:
+        self._engine_factory = engine_factory
+        self._engine: AsyncEngine | None = None
+        self._partitions: set[datetime] = set()
+        self._fine_retention = fine_retention
+        self._pruned_at: datetime | None = None
+        self._queue: queue.Queue[_Pending | None] = queue.Queue(max_pending)
+        self._thread = threading.Thread(target=self._run, name="score-history-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, snapshot: ScoreSnapshot, recorded_at: datetime | None = None) -> Future[None]:
+        recorded_at = recorded_at or datetime.now(timezone.utc)
+        future: Future[None] = Future()
+        future.add_done_callback(self._log_failure)
+        self._queue.put((snapshot, recorded_at, future))
+        return future
+
+    @staticmethod
+    def _log_failure(future: Future[None]) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("Failed to persist score snapshot", exc_info=future.exception())
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        try:
+            while (pending := self._queue.get()) is not None:
+                snapshot, recorded_at, future = pending
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    loop.run_until_complete(self._write(snapshot, recorded_at))
+                except Exception as exc:
+                    future.set_exception(exc)
+                else:
+                    future.set_result(None)
+            if self._engine is not None:
+                loop.run_until_complete(self._engine.dispose())
+        finally:
+            loop.close()
+
+    async def _write(self, snapshot: ScoreSnapshot, recorded_at: datetime) -> None:
+        if self._engine is None:
+            self._engine = self._engine_factory()
+        partition = None
+        hour = bucket_start(recorded_at, RESOLUTIONS["1h"])
+        async with self._engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                month = _month_start(recorded_at.astimezone(timezone.utc))
+                if month not in self._partitions:
+                    partition = await ensure_partition(conn, month)
+            await write_snapshot(conn, snapshot, recorded_at)
+            prune = self._fine_retention is not None and hour != self._pruned_at
+            if prune:
+                await prune_rollups(conn, retention_cutoffs(recorded_at, self._fine_retention))
+        if partition is not None:
+            self._partitions.add(month)
+        if prune:
+            self._pruned_at = hour
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+
+@lru_cache(1)
+def get_history_writer() -> ScoreHistoryWriter:
+    settings = get_settings()
+    return ScoreHistoryWriter(
+        lambda: build_engine(settings.database_url),
+        max_pending=settings.history_queue_size,
+        fine_retention=timedelta(days=settings.history_fine_retention_days),
+    )
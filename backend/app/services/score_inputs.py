@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Mapping, Sequence
+from functools import lru_cache
+
+import numpy as np
+
+from ..core.config import get_settings
+from .scoring import FeatureFrame
+
+
+class InputStore(ABC):
+    """Latest scoring features of every coin.
+
+    Upserting ``NaN`` leaves a value unchanged. Coins whose values change are
+    remembered as dirty until a recalculation claims them; every claim gets the
+    next sequence number, so a worker can tell whether another one claimed
+    changes since its own last run.
+    """
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+    @abstractmethod
+    def upsert_many(
+        self, coins: Sequence[str], feature_names: Sequence[str], values: np.ndarray
+    ) -> None:
+        """Write a ``len(coins) x len(feature_names)`` block; ``NaN`` leaves a value unchanged."""
+
+    def upsert(self, coin: str, features: Mapping[str, float]) -> None:
+        names = list(features)
+        self.upsert_many([coin], names, np.array([[features[name] for name in names]]))
+
+    @abstractmethod
+    def mark_dirty(self, coins: Sequence[str]) -> None: ...
+
+    @abstractmethod
+    def claim_dirty(self) -> tuple[list[str], int]:
+        """Return and clear the coins changed since the previous claim, with the claim number."""
+
+    def take_dirty(self) -> list[str]:
+        return self.claim_dirty()[0]
+
+    @abstractmethod
+    def frame(self, coins: Sequence[str] | None = None) -> FeatureFrame:
+        """Copy the whole matrix, or only the rows of the known ``coins``."""
+
+
+class InMemoryInputStore(InputStore):
+    """Process-local store keeping the features as a growable float matrix.
+
+    Unknown features add a ``NaN``-filled column; :meth:`frame` hands out a copy
+    so recalculations never observe a concurrent upsert.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._coins: list[str] = []
+        self._positions: dict[str, int] = {}
+        self._feature_names: list[str] = []
+        self._columns: dict[str, int] = {}
+        self._matrix = np.full((0, 0), np.nan)
+        self._dirty: set[str] = set()
+        self._claims = 0
+
+    def __len__(self) -> int:
+        return len(self._coins)
+
+    def _ensure_columns(self, names: Sequence[str]) -> np.ndarray:
+        for name in names:
+            if name not in self._columns:
+                self._columns[name] = len(self._feature_names)
+                self._feature_names.append(name)
+        missing = len(self._feature_names) - self._matrix.shape[1]
+        if missing:
+            padding = np.full((self._matrix.shape[0], missing), np.nan)
+            self._matrix = np.hstack([self._matrix, padding])
+        return np.array([self._columns[name] for name in names], dtype=np.intp)
+
+    def _ensure_rows(self, coins: Sequence[str]) -> np.ndarray:
+        new = [coin for coin in dict.fromkeys(coins) if coin not in self._positions]
+        if new:
+            for coin in new:
+                self._positions[coin] = len(self._coins)
+                self._coins.append(coin)
+            padding = np.full((len(new), self._matrix.shape[1]), np.nan)
+            self._matrix = np.vstack([self._matrix, padding])
+        return np.array([self._positions[coin] for coin in coins], dtype=np.intp)
+
+    def upsert_many(
+        self, coins: Sequence[str], feature_names: Sequence[str], values: np.ndarray
+    ) -> None:
+        values = np.asarray(values, dtype=np.float64).reshape(len(coins), len(feature_names))
+        with self._lock:
+            columns = self._ensure_columns(feature_names)
+            rows = self._ensure_rows(coins)
+            block = self._matrix[np.ix_(rows, columns)]
+            merged = np.where(np.isnan(values), block, values)
+            changed = ~((merged == block) | (np.isnan(merged) & np.isnan(block))).all(axis=1)
+            self._matrix[np.ix_(rows, columns)] = merged
+            self._dirty.update(coin for coin, flag in zip(coins, changed.tolist()) if flag)
+
+    def mark_dirty(self, coins: Sequence[str]) -> None:
+        with self._lock:
+            self._dirty.update(coin for coin in coins if coin in self._positions)
+
+    def claim_dirty(self) -> tuple[list[str], int]:
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            self._claims += 1
+            return sorted(dirty), self._claims
+
+    def frame(self, coins: Sequence[str] | None = None) -> FeatureFrame:
+        with self._lock:
+            if coins is None:
+                names = list(self._coins)
+                matrix = self._matrix.copy()
+            else:
+                names = [coin for coin in coins if coin in self._positions]
+                matrix = self._matrix[[self._positions[coin] for coin in names]]
+            return FeatureFrame(
+                coins=np.array(names, dtype=np.str_),
+                features=matrix,
+                feature_names=tuple(self._feature_names),
+            )
+
+
+# ARGV: prefix, coin count, feature count, coins..., feature names..., values (row-major)
+_UPSERT = """
+local prefix = ARGV[1]
+local count, width = tonumber(ARGV[2]), tonumber(ARGV[3])
+local names = 4 + count
+local values = names + width
+for column = 0, width - 1 do
+    local name = ARGV[names + column]
+    if redis.call('SADD', prefix .. ':feature_set', name) == 1 then
+        redis.call('RPUSH', prefix .. ':features', name)
+    end
+end
+for row = 0, count - 1 do
+    local coin = ARGV[4 + row]
+    if not redis.call('ZSCORE', prefix .. ':coins', coin) then
+        redis.call('ZADD', prefix .. ':coins', redis.call('INCR', prefix .. ':coin_seq'), coin)
+    end
+    local changed = false
+    for column = 0, width - 1 do
+        local value = ARGV[values + row * width + column]
+        if value ~= 'nan' then
+            local key = prefix .. ':values:' .. ARGV[names + column]
+            if redis.call('HGET', key, coin) ~= value then
+                redis.call('HSET', key, coin, value)
+                changed = true
+            end
+        end
+    end
+    if changed then
+        redis.call('SADD', prefix .. ':dirty', coin)
+    end
+end
+"""
+
+# ARGV: prefix, coins...
+_MARK_DIRTY = """
+for index = 2, #ARGV do
+    if redis.call('ZSCORE', ARGV[1] .. ':coins', ARGV[index]) then
+        redis.call('SADD', ARGV[1] .. ':dirty', ARGV[index])
+    end
+end
+"""
+
+
+class RedisInputStore(InputStore):
+    """Store shared by every API and worker process.
+
+    Each feature is a hash of coin -> value; coins keep their insertion order in
+    a sorted set. Upserts run as one Lua script, so a value and its dirty mark
+    change together. Large blocks are written ``chunk_rows`` coins per script,
+    pipelined, so an ingestion batch never blocks Redis for long.
+    """
+
+    def __init__(
+        self, url: str, prefix: str = "tokenlysis:inputs", chunk_rows: int = 1000
+    ) -> None:
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self._prefix = prefix
+        self._chunk_rows = chunk_rows
+        self._upsert = self._redis.register_script(_UPSERT)
+        self._mark_dirty = self._redis.register_script(_MARK_DIRTY)
+
+    def __len__(self) -> int:
+        return int(self._redis.zcard(f"{self._prefix}:coins"))
+
+    def upsert_many(
+        self, coins: Sequence[str], feature_names: Sequence[str], values: np.ndarray
+    ) -> None:
+        values = np.asarray(values, dtype=np.float64).reshape(len(coins), len(feature_names))
+        if not len(coins) or not len(feature_names):
+            return
+        with self._redis.pipeline(transaction=False) as pipe:
+            for start in range(0, len(coins), self._chunk_rows):
+                chunk = list(coins[start : start + self._chunk_rows])
+                cells = [
+                    "nan" if np.isnan(value) else repr(value)
+                    for value in values[start : start + len(chunk)].ravel().tolist()
+                ]
+                self._upsert(
+                    args=[
+                        self._prefix,
+                        len(chunk),
+                        len(feature_names),
+                        *chunk,
+                        *feature_names,
+                        *cells,
+                    ],
+                    client=pipe,
+                )
+            pipe.execute()
+
+    def mark_dirty(self, coins: Sequence[str]) -> None:
+        if coins:
+            self._mark_dirty(args=[self._prefix, *coins])
+
+    def claim_dirty(self) -> tuple[list[str], int]:
+        with self._redis.pipeline() as pipe:
+            pipe.smembers(f"{self._prefix}:dirty")
+            pipe.delete(f"{self._prefix}:dirty")
+            pipe.incr(f"{self._prefix}:claims")
+            dirty, _, claim = pipe.execute()
+        return sorted(coin.decode() for coin in dirty), int(claim)
+
+    def frame(self, coins: Sequence[str] | None = None) -> FeatureFrame:
+        with self._redis.pipeline() as pipe:
+            pipe.lrange(f"{self._prefix}:features", 0, -1)
+            pipe.zrange(f"{self._prefix}:coins", 0, -1)
+            raw_names, raw_coins = pipe.execute()
+        feature_names = tuple(name.decode() for name in raw_names)
+        known = [coin.decode() for coin in raw_coins]
+        if coins is None:
+            names = known
+        else:
+            members = set(known)
+            names = [coin for coin in coins if coin in members]
+        matrix = np.full((len(names), len(feature_names)), np.nan)
+        if names and feature_names:
+            with self._redis.pipeline(transaction=False) as pipe:
+                for feature in feature_names:
+                    pipe.hmget(f"{self._prefix}:values:{feature}", names)
+                columns = pipe.execute()
+            for position, column in enumerate(columns):
+                matrix[:, position] = [
+                    np.nan if value is None else float(value) for value in column
+                ]
+        return FeatureFrame(
+            coins=np.array(names, dtype=np.str_),
+            features=matrix,
+            feature_names=feature_names,
+        )
+
+
+def _seed_inputs(store: InputStore) -> None:
+    names = [
+        "market_cap",
+        "volume_24h",
+        "dev_commits_4w",
+        "dev_contributors",
+        "social_followers",
+        "social_mentions_24h",
+    ]
+    store.upsert_many(
+        ["btc", "eth", "sol"],
+        names,
+        np.array(
+            [
+                [1.2e12, 3.5e10, 180.0, 95.0, 6.5e6, 4.1e4],
+                [4.0e11, 1.8e10, 420.0, 310.0, 3.4e6, 2.9e4],
+                [8.0e10, 3.0e9, 260.0, 140.0, 2.6e6, 2.2e4],
+            ]
+        ),
+    )
+
+
+@lru_cache(1)
+def get_input_store() -> InputStore:
+    settings = get_settings()
+    store: InputStore
+    if settings.input_store == "redis":
+        store = RedisInputStore(settings.redis_url)
+    else:
+        store = InMemoryInputStore()
+    if not len(store):
+        _seed_inputs(store)
+        store.take_dirty()
+    return store
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
+
+import msgpack
+import numpy as np
+
+from ..core.serialization import WireFormat, dumps
+
+DEFAULT_THEMES: tuple[str, ...] = ("liquidity", "technology", "community")
+
+SnapshotListener = Callable[["ScoreSnapshot", "ScoreSnapshot"], None]
+
+
+@dataclass(frozen=True)
+class ScoreSnapshot:
+    """Immutable columnar view of the scored coin universe.
+
+    Row ``i`` of every array describes ``coins[i]``. ``theme_scores`` holds one
+    column per entry of ``themes`` and ``scores`` the composite score.
+    """
+
+    version: int
+    coins: np.ndarray
+    themes: tuple[str, ...]
+    scores: np.ndarray
+    theme_scores: np.ndarray
+    updated_at: np.ndarray
+    _rendered: dict[tuple[WireFormat, str | None], bytes] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+
+    def __len__(self) -> int:
+        return int(self.coins.shape[0])
+
+    @cached_property
+    def positions(self) -> dict[str, int]:
+        return {coin: index for index, coin in enumerate(self.coins.tolist())}
+
+    def column(self, theme: str | None = None) -> np.ndarray:
+        """Return the composite scores, or the scores of a single theme."""
+
+        if theme is None:
+            return self.scores
+        return self.theme_scores[:, self.themes.index(theme)]
+
+    @cached_property
+    def _json_rows(self) -> list[bytes]:
+        return [b'{"coin":' + dumps(coin) + b',"score":' for coin in self.coins.tolist()]
+
+    @cached_property
+    def _msgpack_rows(self) -> list[bytes]:
+        packer = msgpack.Packer(use_bin_type=True)
+        keys = packer.pack("coin"), packer.pack("score")
+        return [
+            packer.pack_map_header(2) + keys[0] + packer.pack(coin) + keys[1]
+            for coin in self.coins.tolist()
+        ]
+
+    def _render_json(self, scores: np.ndarray) -> bytes:
+        if not len(scores):
+            return b"[]"
+        values = dumps(np.ascontiguousarray(scores, dtype=np.float64))[1:-1].split(b",")
+        rows = b",".join(row + value + b"}" for row, value in zip(self._json_rows, values))
+        return b"[" + rows + b"]"
+
+    def _render_msgpack(self, scores: np.ndarray) -> bytes:
+        # float 64 is 0xcb followed by the big-endian IEEE 754 value
+        values = np.ascontiguousarray(scores, dtype=">f8").tobytes()
+        header = msgpack.Packer().pack_array_header(len(scores))
+        return header + b"".join(
+            row + b"\xcb" + values[offset : offset + 8]
+            for row, offset in zip(self._msgpack_rows, range(0, len(values), 8))
+        )
+
+    def render(self, theme: str | None = None, fmt: WireFormat = "json") -> bytes:
+        """Serialize ``[{"coin", "score"}, ...]`` once per theme, format and snapshot.
+
+        Rows are assembled straight from the columns: the per-coin prefixes are
+        encoded once per snapshot and the scores in one call per column.
+        """
+
+        body = self._rendered.get((fmt, theme))
+        if body is None:
+            scores = self.column(theme)
+            body = self._render_msgpack(scores) if fmt == "msgpack" else self._render_json(scores)
+            self._rendered[(fmt, theme)] = body
+        return body
+
+
+def build_snapshot(
+    version: int,
+    coins: list[str] | np.ndarray,
+    scores: list[float] | np.ndarray,
+    theme_scores: list[list[float]] | np.ndarray,
+    themes: tuple[str, ...] = DEFAULT_THEMES,
+    updated_at: list[int] | np.ndarray | None = None,
+) -> ScoreSnapshot:
+    """Copy the columns into read-only arrays owned by the new snapshot."""
+
+    coin_array = np.array(coins, dtype=np.str_)
+    score_array = np.array(scores, dtype=np.float64)
+    theme_array = np.array(theme_scores, dtype=np.float64).reshape(len(coin_array), len(themes))
+    if updated_at is None:
+        updated_at = np.full(len(coin_array), int(time.time()), dtype=np.int64)
+    timestamp_array = np.array(updated_at, dtype=np.int64)
+    if not (len(coin_array) == len(score_array) == len(timestamp_array)):
+        raise ValueError("Snapshot columns must have the same length")
+    for array in (coin_array, score_array, theme_array, timestamp_array):
+        array.setflags(write=False)
+    return ScoreSnapshot(
+        version=version,
+        coins=coin_array,
+        themes=tuple(themes),
+        scores=score_array,
+        theme_scores=theme_array,
+        updated_at=timestamp_array,
+    )
+
+
+class ScoreStore:
+    """Holds the current snapshot of a worker and swaps it atomically.
+
+    Readers grab :attr:`snapshot` once and work on that immutable object, so a
+    concurrent :meth:`publish` never exposes a half-written universe.
+    Listeners are called with ``(previous, current)`` in publication order.
+    """
+
+    def __init__(self, snapshot: ScoreSnapshot) -> None:
+        self._snapshot = snapshot
+        self._lock = threading.Lock()
+        self._listeners: list[SnapshotListener] = []
+        self._next_version: Callable[[int], int] | None = None
+
+    @property
+    def snapshot(self) -> ScoreSnapshot:
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def add_listener(self, listener: SnapshotListener) -> None:
+        with self._lock:
+            self._listeners.append(listener)
+
+    def set_version_source(self, next_version: Callable[[int], int]) -> None:
+        """Allocate publish versions with ``next_version(current)`` instead of ``current + 1``.
+
+        Replicators install a source shared by every process, so snapshots
+        published by different workers never reuse a version.
+        """
+
+        self._next_version = next_version
+
+    def publish(
+        self,
+        coins: list[str] | np.ndarray,
+        scores: list[float] | np.ndarray,
+        theme_scores: list[list[float]] | np.ndarray,
+        themes: tuple[str, ...] = DEFAULT_THEMES,
+        updated_at: list[int] | np.ndarray | None = None,
+    ) -> ScoreSnapshot:
+        # Allocated outside the lock: a shared source may be a network round trip.
+        allocated = self._next_version(self.version) if self._next_version is not None else 0
+        with self._lock:
+            version = max(allocated, self._snapshot.version + 1)
+            snapshot = build_snapshot(version, coins, scores, theme_scores, themes, updated_at)
+            previous, self._snapshot = self._snapshot, snapshot
+            for listener in self._listeners:
+                listener(previous, snapshot)
+        return snapshot
+
+    def install(self, snapshot: ScoreSnapshot) -> bool:
+        """Swap in a read-only snapshot built elsewhere, without copying its columns.
+
+        It keeps the version it was published with; a snapshot no newer than the
+        current one is ignored. Returns whether it was installed.
+        """
+
+        with self._lock:
+            if snapshot.version <= self._snapshot.version:
+                return False
+            previous, self._snapshot = self._snapshot, snapshot
+            for listener in self._listeners:
+                listener(previous, snapshot)
+        return True
+
+
+def _seed_snapshot() -> ScoreSnapshot:
+    return build_snapshot(
+        version=1,
+        coins=["btc", "eth", "sol"],
+        scores=[0.91, 0.87, 0.84],
+        theme_scores=[
+            [0.95, 0.86, 0.92],
+            [0.89, 0.93, 0.79],
+            [0.81, 0.88, 0.83],
+        ],
+    )
+
+
+@lru_cache(1)
+def get_score_store() -> ScoreStore:
+    return ScoreStore(_seed_snapshot())
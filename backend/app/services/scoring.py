@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+
+import numpy as np
+
+Extractor = Callable[["FeatureFrame"], np.ndarray]
+
+
+@dataclass(frozen=True)
+class FeatureFrame:
+    """Feature matrix of the coin universe, one row per coin and one column per feature.
+
+    Missing values are ``NaN``; extractors and normalization are NaN-aware.
+    """
+
+    coins: np.ndarray
+    features: np.ndarray
+    feature_names: tuple[str, ...]
+    _columns: dict[str, int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        columns = {name: index for index, name in enumerate(self.feature_names)}
+        object.__setattr__(self, "_columns", columns)
+
+    def __len__(self) -> int:
+        return int(self.coins.shape[0])
+
+    def select(self, names: Sequence[str]) -> np.ndarray:
+        """Return the requested columns, NaN-filled when a feature is unknown."""
+
+        out = np.full((len(self), len(names)), np.nan)
+        for position, name in enumerate(names):
+            index = self._columns.get(name)
+            if index is not None:
+                out[:, position] = self.features[:, index]
+        return out
+
+    def prefixed(self, prefix: str) -> np.ndarray:
+        indexes = [index for name, index in self._columns.items() if name.startswith(prefix)]
+        if not indexes:
+            return np.full((len(self), 1), np.nan)
+        return self.features[:, indexes]
+
+    def rows(self, indexes: np.ndarray) -> FeatureFrame:
+        return FeatureFrame(self.coins[indexes], self.features[indexes], self.feature_names)
+
+
+@dataclass(frozen=True)
+class ScoreComponent:
+    """A thematic score computed from the features of each coin.
+
+    ``extract`` must be row-wise: the raw values of a coin may only depend on
+    that coin's features. Cross-sectional normalization is done by the engine.
+    """
+
+    name: str
+    weight: float
+    extract: Extractor
+
+
+@dataclass
+class ComponentStats:
+    """NaN-aware running moments of the raw values of a component, per column."""
+
+    count: np.ndarray
+    total: np.ndarray
+    total_sq: np.ndarray
+
+    @classmethod
+    def from_raw(cls, raw: np.ndarray) -> ComponentStats:
+        present = ~np.isnan(raw)
+        values = np.where(present, raw, 0.0)
+        return cls(present.sum(axis=0), values.sum(axis=0), np.square(values).sum(axis=0))
+
+    def add(self, raw: np.ndarray) -> None:
+        self._shift(raw, 1.0)
+
+    def remove(self, raw: np.ndarray) -> None:
+        self._shift(raw, -1.0)
+
+    def _shift(self, raw: np.ndarray, sign: float) -> None:
+        present = ~np.isnan(raw)
+        values = np.where(present, raw, 0.0)
+        self.count = self.count + int(sign) * present.sum(axis=0)
+        self.total = self.total + sign * values.sum(axis=0)
+        self.total_sq = self.total_sq + sign * np.square(values).sum(axis=0)
+
+    @property
+    def mean(self) -> np.ndarray:
+        return self.total / np.maximum(self.count, 1)
+
+    @property
+    def std(self) -> np.ndarray:
+        variance = self.total_sq / np.maximum(self.count, 1) - np.square(self.mean)
+        std = np.sqrt(np.maximum(variance, 0.0))
+        return np.where(std > 1e-12, std, 1.0)
+
+
+@dataclass(frozen=True)
+class ScoreResult:
+    coins: np.ndarray
+    themes: tuple[str, ...]
+    scores: np.ndarray
+    theme_scores: np.ndarray
+
+
+@dataclass
+class ScoringState:
+    """Raw component values and moments kept between incremental recalculations.
+
+    ``stats`` track the current raw values; ``normalized_with`` are the moments
+    every row of ``theme_scores`` was normalized with.
+    """
+
+    coins: list[str]
+    positions: dict[str, int]
+    themes: tuple[str, ...]
+    raws: list[np.ndarray]
+    stats: list[ComponentStats]
+    theme_scores: np.ndarray
+    scores: np.ndarray
+    normalized_with: list[ComponentStats]
+
+    def result(self) -> ScoreResult:
+        return ScoreResult(
+            coins=np.array(self.coins, dtype=np.str_),
+            themes=self.themes,
+            scores=self.scores,
+            theme_scores=self.theme_scores,
+        )
+
+
+_registry: dict[str, ScoreComponent] = {}
+
+
+def register_component(name: str, weight: float = 1.0) -> Callable[[Extractor], Extractor]:
+    """Register ``extract`` as the thematic component ``name``.
+
+    Registration order defines the order of the theme columns in snapshots.
+    """
+
+    def decorator(extract: Extractor) -> Extractor:
+        _registry[name] = ScoreComponent(name=name, weight=weight, extract=extract)
+        return extract
+
+    return decorator
+
+
+def get_components() -> tuple[ScoreComponent, ...]:
+    return tuple(_registry.values())
+
+
+def drift(current: ComponentStats, reference: ComponentStats) -> float:
+    """Largest shift of a column's mean or spread, in units of the reference spread."""
+
+    shift = np.abs(current.mean - reference.mean) / reference.std
+    spread = np.abs(current.std / reference.std - 1.0)
+    return float(np.max(np.maximum(shift, spread), initial=0.0))
+
+
+def normalize(raw: np.ndarray, stats: ComponentStats) -> np.ndarray:
+    """Squash cross-sectional z-scores into ``(0, 1)``; missing values map to 0.5."""
+
+    z = np.clip((raw - stats.mean) / stats.std, -30.0, 30.0)
+    return np.where(np.isnan(z), 0.5, 1.0 / (1.0 + np.exp(-z)))
+
+
+class ScoringEngine:
+    """Computes every thematic score of the universe as whole-array operations.
+
+    ``drift_tolerance`` bounds how far the moments may move during incremental
+    updates before every row is renormalized.
+    """
+
+    def __init__(
+        self,
+        components: Sequence[ScoreComponent] | None = None,
+        drift_tolerance: float = 0.05,
+    ) -> None:
+        self.components = tuple(components) if components is not None else get_components()
+        if not self.components:
+            raise ValueError("At least one score component is required")
+        self.drift_tolerance = drift_tolerance
+        weights = np.array([component.weight for component in self.components], dtype=np.float64)
+        self._weights = weights / weights.sum()
+
+    @property
+    def themes(self) -> tuple[str, ...]:
+        return tuple(component.name for component in self.components)
+
+    def extract(self, frame: FeatureFrame) -> list[np.ndarray]:
+        raws = []
+        for component in self.components:
+            raw = np.asarray(component.extract(frame), dtype=np.float64)
+            raws.append(raw.reshape(len(frame), -1))
+        return raws
+
+    def combine(self, raws: Sequence[np.ndarray], stats: Sequence[ComponentStats]) -> np.ndarray:
+        theme_scores = np.empty((raws[0].shape[0], len(self.components)))
+        for position, (raw, component_stats) in enumerate(zip(raws, stats)):
+            theme_scores[:, position] = normalize(raw, component_stats).mean(axis=1)
+        return theme_scores
+
+    def score(self, frame: FeatureFrame) -> ScoreResult:
+        return self.full(frame).result()
+
+    def full(self, frame: FeatureFrame) -> ScoringState:
+        return self.from_raws(frame.coins, self.extract(frame))
+
+    def from_raws(self, coins: np.ndarray, raws: list[np.ndarray]) -> ScoringState:
+        """Normalize raw component values extracted elsewhere, e.g. by shards."""
+
+        stats = [ComponentStats.from_raw(raw) for raw in raws]
+        theme_scores = self.combine(raws, stats)
+        names = coins.tolist()
+        return ScoringState(
+            coins=names,
+            positions={coin: index for index, coin in enumerate(names)},
+            themes=self.themes,
+            raws=raws,
+            stats=stats,
+            theme_scores=theme_scores,
+            scores=theme_scores @ self._weights,
+            normalized_with=stats,
+        )
+
+    def update(self, state: ScoringState, frame: FeatureFrame) -> ScoringState:
+        """Rescore only the coins of ``frame`` on top of ``state``.
+
+        The moments of every component are shifted by the dirty rows (old raw
+        values out, new ones in). While they stay within ``drift_tolerance`` of
+        the moments the snapshot was normalized with, only the dirty rows are
+        rescored, against those same moments. Past it, every row is renormalized
+        from the cached raw values in one vectorized pass.
+        """
+
+        if state.themes != self.themes:
+            raise ValueError("Scoring state was built with different components")
+        coins = frame.coins.tolist()
+        new_coins = [coin for coin in dict.fromkeys(coins) if coin not in state.positions]
+        positions = dict(state.positions)
+        for coin in new_coins:
+            positions[coin] = len(positions)
+        rows = np.array([positions[coin] for coin in coins], dtype=np.intp)
+        known = rows < len(state.coins)
+
+        raws = self.extract(frame)
+        if any(raw.shape[1] != old.shape[1] for raw, old in zip(raws, state.raws)):
+            raise ValueError("Feature columns changed since the scoring state was built")
+        total = len(positions)
+        theme_scores = np.resize(state.theme_scores, (total, len(self.themes)))
+        scores = np.resize(state.scores, total)
+        stats = []
+        for position, raw in enumerate(raws):
+            merged = state.raws[position]
+            if new_coins:
+                padding = np.full((len(new_coins), merged.shape[1]), np.nan)
+                merged = np.vstack([merged, padding])
+            component_stats = ComponentStats(
+                state.stats[position].count,
+                state.stats[position].total,
+                state.stats[position].total_sq,
+            )
+            component_stats.remove(merged[rows[known]])
+            component_stats.add(raw)
+            merged[rows] = raw
+            state.raws[position] = merged
+            stats.append(component_stats)
+        normalized_with = state.normalized_with
+        if any(
+            drift(current, reference) > self.drift_tolerance
+            for current, reference in zip(stats, normalized_with)
+        ):
+            normalized_with = stats
+            theme_scores = self.combine(state.raws, stats)
+            scores = theme_scores @ self._weights
+        else:
+            theme_scores[rows] = self.combine(raws, normalized_with)
+            scores[rows] = theme_scores[rows] @ self._weights
+        return ScoringState(
+            coins=state.coins + new_coins,
+            positions=positions,
+            themes=self.themes,
+            raws=state.raws,
+            stats=stats,
+            theme_scores=theme_scores,
+            scores=scores,
+            normalized_with=normalized_with,
+        )
+
+
+def _log_scale(values: np.ndarray) -> np.ndarray:
+    return np.log1p(np.clip(values, 0.0, None))
+
+
+@register_component("liquidity", weight=1.0)
+def liquidity(frame: FeatureFrame) -> np.ndarray:
+    market_cap, volume = frame.select(["market_cap", "volume_24h"]).T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        turnover = np.where(market_cap > 0, volume / market_cap, np.nan)
+    return np.column_stack([_log_scale(volume), _log_scale(market_cap), turnover])
+
+
+@register_component("technology", weight=1.0)
+def technology(frame: FeatureFrame) -> np.ndarray:
+    return _log_scale(frame.prefixed("dev_"))
+
+
+@register_component("community", weight=1.0)
+def community(frame: FeatureFrame) -> np.ndarray:
+    return _log_scale(frame.prefixed("social_"))
@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import logging
+import os
+import struct
+import tempfile
+import threading
+import uuid
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from ..core.config import get_settings
+from .backplane import ScoreReplicator, get_score_replicator
+from .score_store import ScoreSnapshot, ScoreStore, get_score_store
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"TKLSNAP1"
+POINTER = "CURRENT"
+LOCK = "CURRENT.lock"
+VERSION = "VERSION"
+
+# magic, version, coins, themes, coin id width, theme name width (UTF-32 code units)
+HEADER = struct.Struct("<8sQQIII28x")
+
+
+def snapshot_name(version: int, origin: str) -> str:
+    return f"scores-{version:012d}-{origin}.bin"
+
+
+def parse_snapshot_name(name: str) -> tuple[int, str]:
+    """Version and origin of a snapshot file name; raises :class:`ValueError`."""
+
+    stem, _, suffix = name.partition(".")
+    prefix, _, rest = stem.partition("-")
+    version, _, origin = rest.partition("-")
+    if prefix != "scores" or suffix != "bin" or not version.isdigit() or not origin:
+        raise ValueError(f"Not a score snapshot name: {name!r}")
+    return int(version), origin
+
+
+def encode_snapshot(snapshot: ScoreSnapshot) -> list[bytes | memoryview]:
+    """Fixed little-endian layout: a 64-byte header, then the 8-byte aligned columns.
+
+    ``scores`` (f8), ``theme_scores`` (f8, row-major), ``updated_at`` (i8), the
+    coin ids and the theme names (fixed-width UTF-32) follow the header in that
+    order.
+    """
+
+    count, theme_count = len(snapshot), len(snapshot.themes)
+    coin_width = max((len(coin) for coin in snapshot.coins.tolist()), default=0) or 1
+    theme_width = max((len(theme) for theme in snapshot.themes), default=0) or 1
+    header = HEADER.pack(MAGIC, snapshot.version, count, theme_count, coin_width, theme_width)
+    columns = [
+        np.ascontiguousarray(snapshot.scores, dtype="<f8"),
+        np.ascontiguousarray(snapshot.theme_scores, dtype="<f8"),
+        np.ascontiguousarray(snapshot.updated_at, dtype="<i8"),
+        np.ascontiguousarray(snapshot.coins, dtype=f"<U{coin_width}"),
+        np.array(snapshot.themes, dtype=f"<U{theme_width}"),
+    ]
+    return [header, *(column.reshape(-1).view(np.uint8).data for column in columns)]
+
+
+def map_snapshot(path: str | Path) -> ScoreSnapshot:
+    """Map a snapshot file read-only; the columns are views on the shared pages."""
+
+    buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    if len(buffer) < HEADER.size:
+        raise ValueError(f"Truncated score snapshot: {path}")
+    magic, version, count, theme_count, coin_width, theme_width = HEADER.unpack(
+        buffer[: HEADER.size].tobytes()
+    )
+    if magic != MAGIC:
+        raise ValueError(f"Not a score snapshot: {path}")
+    offset = HEADER.size
+
+    def column(dtype: str, items: int) -> np.ndarray:
+        nonlocal offset
+        array = np.frombuffer(buffer, dtype=dtype, count=items, offset=offset)
+        offset += array.nbytes
+        return array
+
+    scores = column("<f8", count)
+    theme_scores = column("<f8", count * theme_count).reshape(count, theme_count)
+    updated_at = column("<i8", count)
+    coins = column(f"<U{coin_width}", count)
+    themes = tuple(column(f"<U{theme_width}", theme_count).tolist())
+    return ScoreSnapshot(
+        version=version,
+        coins=coins,
+        themes=themes,
+        scores=scores,
+        theme_scores=theme_scores,
+        updated_at=updated_at,
+    )
+
+
+class MappedSnapshotReplicator:
+    """Shares score snapshots between processes through memory-mapped files.
+
+    Every local publish is written once to ``directory`` (a tmpfs such as
+    ``/dev/shm``) under a unique name, then the ``CURRENT`` pointer is replaced
+    atomically. Other processes poll the pointer, map the new file read-only and
+    install it in their store without copying, so every worker reads the same
+    physical pages. The pointer only moves forward: writers compare versions
+    under an ``fcntl`` lock, and a snapshot no newer than ``CURRENT`` is
+    discarded. Versions are allocated from a counter file under the same lock
+    (:meth:`next_version`). Files older than the ``keep`` most recent versions
+    are unlinked; processes still mapping them keep a valid view.
+    """
+
+    def __init__(
+        self,
+        store: ScoreStore,
+        directory: str | Path,
+        origin: str | None = None,
+        keep: int = 3,
+        poll_seconds: float = 0.01,
+    ) -> None:
+        self.store = store
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.origin = origin or uuid.uuid4().hex[:12]
+        self.keep = keep
+        self.poll_seconds = poll_seconds
+        self._applying = threading.local()
+        self._pointer: tuple[int, int] | None = None
+
+    def __call__(self, previous: ScoreSnapshot, snapshot: ScoreSnapshot) -> None:
+        if getattr(self._applying, "active", False):
+            return
+        self.write(snapshot)
+
+    def write(self, snapshot: ScoreSnapshot) -> Path | None:
+        """Publish ``snapshot`` as ``CURRENT``; ``None`` if a newer one already is."""
+
+        name = snapshot_name(snapshot.version, self.origin)
+        path = self.directory / name
+        temporary = path.with_suffix(".tmp")
+        with open(temporary, "wb") as handle:
+            handle.writelines(encode_snapshot(snapshot))
+        with open(self.directory / LOCK, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            if snapshot.version <= self._current_version():
+                temporary.unlink(missing_ok=True)
+                logger.info(
+                    "Dropping a score snapshot older than the shared one",
+                    extra={"version": snapshot.version},
+                )
+                return None
+            os.replace(temporary, path)
+            pointer = self.directory / f"{POINTER}.{self.origin}.tmp"
+            pointer.write_text(name)
+            os.replace(pointer, self.directory / POINTER)
+            self._prune()
+        return path
+
+    def next_version(self, current: int) -> int:
+        """Allocate a version above ``current`` and above every one allocated in ``directory``."""
+
+        counter = self.directory / VERSION
+        with open(self.directory / LOCK, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                allocated = int(counter.read_text())
+            except (FileNotFoundError, ValueError):
+                allocated = 0
+            version = max(allocated, current) + 1
+            temporary = self.directory / f"{VERSION}.{self.origin}.tmp"
+            temporary.write_text(str(version))
+            os.replace(temporary, counter)
+        return version
+
+    def _current_version(self) -> int:
+        try:
+            return parse_snapshot_name((self.directory / POINTER).read_text().strip())[0]
+        except (FileNotFoundError, ValueError):
+            return -1
+
+    def _prune(self) -> None:
+        files = []
+        for path in self.directory.glob("scores-*.bin"):
+            try:
+                files.append((parse_snapshot_name(path.name)[0], path))
+            except ValueError:
+                continue
+        for _, stale in sorted(files)[: -self.keep]:
+            stale.unlink(missing_ok=True)
+
+    def poll(self) -> bool:
+        """Install the snapshot behind ``CURRENT`` if it is newer; return whether it was."""
+
+        snapshot = self._next()
+        return snapshot is not None and self._install(snapshot)
+
+    def _next(self) -> ScoreSnapshot | None:
+        """Map the snapshot behind ``CURRENT`` if it is newer than the local one.
+
+        The version is read from the file name, so older snapshots are skipped
+        without being mapped.
+        """
+
+        pointer = self.directory / POINTER
+        try:
+            stat = pointer.stat()
+            identity = (stat.st_ino, stat.st_mtime_ns)
+            if identity == self._pointer:
+                return None
+            name = pointer.read_text().strip()
+            version, origin = parse_snapshot_name(name)
+            if origin == self.origin or version <= self.store.version:
+                self._pointer = identity
+                return None
+            snapshot = map_snapshot(self.directory / name)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            self._pointer = identity
+            raise
+        self._pointer = identity
+        return snapshot
+
+    def _install(self, snapshot: ScoreSnapshot) -> bool:
+        self._applying.active = True
+        try:
+            return self.store.install(snapshot)
+        finally:
+            self._applying.active = False
+
+    async def run(self) -> None:
+        """Switch to new snapshots until cancelled.
+
+        Only the pointer check runs on the event loop; installing a snapshot
+        and running the store's listeners happens in a worker thread.
+        """
+
+        while True:
+            try:
+                snapshot = self._next()
+                if snapshot is not None:
+                    await asyncio.to_thread(self._install, snapshot)
+            except (OSError, ValueError):
+                logger.exception("Failed to map the shared score snapshot")
+            await asyncio.sleep(self.poll_seconds)
+
+
+def default_snapshot_dir() -> Path:
+    shm = Path("/dev/shm")
+    return (shm if shm.is_dir() else Path(tempfile.gettempdir())) / "tokenlysis-scores"
+
+
+@lru_cache(1)
+def get_mapped_replicator() -> MappedSnapshotReplicator:
+    settings = get_settings()
+    store = get_score_store()
+    replicator = MappedSnapshotReplicator(
+        store,
+        settings.score_snapshot_dir or default_snapshot_dir(),
+        poll_seconds=settings.score_snapshot_poll_seconds,
+    )
+    store.add_listener(replicator)
+    store.set_version_source(replicator.next_version)
+    return replicator
+
+
+def get_replicator() -> ScoreReplicator | MappedSnapshotReplicator:
+    """The configured transport forwarding this worker's snapshots to the others.
+
+    The first call registers it with the score store; processes make that call
+    at startup (the API lifespan, the Dramatiq worker's process boot).
+    """
+
+    if get_settings().score_transport == "mmap":
+        return get_mapped_replicator()
+    return get_score_replicator()
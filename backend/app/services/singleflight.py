@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from functools import lru_cache
+from typing import Any, TypeVar
+
+from prometheus_client import Counter
+
+T = TypeVar("T")
+
+SINGLE_FLIGHT_CALLS = Counter(
+    "tokenlysis_single_flight_calls_total",
+    "Calls that ran their computation (executed) or joined an in-flight one (coalesced).",
+    ["name", "outcome"],
+)
+
+
+class SingleFlight:
+    """Runs one computation per key at a time and shares its outcome with concurrent callers.
+
+    The computation runs in its own task, so a caller that goes away does not
+    cancel it for the others. Results are not kept once the task is done.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._calls: dict[Hashable, asyncio.Future[Any]] = {}
+        self._executed = SINGLE_FLIGHT_CALLS.labels(name=name, outcome="executed")
+        self._coalesced = SINGLE_FLIGHT_CALLS.labels(name=name, outcome="coalesced")
+        self.executed = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self.coalesced += 1
+            self._coalesced.inc()
+        else:
+            self.executed += 1
+            self._executed.inc()
+            task = asyncio.ensure_future(call())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Future[Any]) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every caller went away
+
+
+@lru_cache(None)
+def get_single_flight(name: str) -> SingleFlight:
+    return SingleFlight(name)
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import AsyncIterator, Iterable
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+
+from ..core.config import get_settings
+from ..core.serialization import WireFormat, dumps, packb
+from .score_store import ScoreSnapshot, get_score_store
+
+DeltaKey = tuple[str, str | None]
+
+
+class SocketMessage:
+    """A WebSocket payload encoded at most once per wire format, shared by all channels.
+
+    JSON is sent as a text frame, MessagePack as a binary frame.
+    """
+
+    __slots__ = ("payload", "_encoded")
+
+    def __init__(self, payload: dict[str, Any]) -> None:
+        self.payload = payload
+        self._encoded: dict[WireFormat, str | bytes] = {}
+
+    def encode(self, fmt: WireFormat) -> str | bytes:
+        encoded = self._encoded.get(fmt)
+        if encoded is None:
+            encoded = packb(self.payload) if fmt == "msgpack" else dumps(self.payload).decode()
+            self._encoded[fmt] = encoded
+        return encoded
+
+
+def encode_delta(coin: str, score: float, theme: str | None = None) -> SocketMessage:
+    payload: dict[str, Any] = {"type": "score", "coin": coin, "score": score}
+    if theme is not None:
+        payload["theme"] = theme
+    return SocketMessage(payload)
+
+
+class SocketChannel:
+    """Outgoing side of one WebSocket: the latest pending delta per (coin, theme).
+
+    A burst of updates for the same coin collapses into one message, so a slow
+    socket holds at most one message per subscribed topic.
+    """
+
+    def __init__(self, fmt: WireFormat = "json") -> None:
+        self.format = fmt
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._lock = threading.Lock()
+        self._pending: dict[DeltaKey, SocketMessage] = {}
+        self.closed = False
+        self.coalesced = 0
+
+    def offer(self, deltas: Iterable[tuple[DeltaKey, SocketMessage]]) -> None:
+        with self._lock:
+            if self.closed:
+                return
+            before = len(self._pending)
+            count = 0
+            for key, message in deltas:
+                self._pending[key] = message
+                count += 1
+            self.coalesced += count - (len(self._pending) - before)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._wakeup.set()
+        else:
+            try:
+                self._loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                self.closed = True
+
+    def close(self) -> None:
+        self.closed = True
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            pass
+
+    async def messages(self) -> AsyncIterator[str | bytes]:
+        while not self.closed:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                if not batch:
+                    self._wakeup.clear()
+            if not batch:
+                await self._wakeup.wait()
+                continue
+            for message in batch.values():
+                yield message.encode(self.format)
+
+
+class SubscriptionIndex:
+    """Topic to channel index; pushes only the scores that changed.
+
+    Coin topics receive composite score deltas, theme topics receive the theme
+    score of every coin whose value in that theme changed. Each delta is
+    serialized once per wire format and shared by every subscribed channel.
+    """
+
+    def __init__(self, max_topics: int = 1000) -> None:
+        self._lock = threading.Lock()
+        self._max_topics = max_topics
+        self._coins: dict[str, set[SocketChannel]] = {}
+        self._themes: dict[str, set[SocketChannel]] = {}
+        self._topics: dict[SocketChannel, tuple[set[str], set[str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._topics)
+
+    def subscribe(
+        self,
+        channel: SocketChannel,
+        snapshot: ScoreSnapshot,
+        coins: Iterable[str] = (),
+        themes: Iterable[str] = (),
+    ) -> None:
+        """Add topics to ``channel`` and queue their current values."""
+
+        coins = [coin for coin in coins if coin in snapshot.positions]
+        themes = [theme for theme in themes if theme in snapshot.themes]
+        with self._lock:
+            own_coins, own_themes = self._topics.setdefault(channel, (set(), set()))
+            if len(own_coins) + len(own_themes) + len(coins) + len(themes) > self._max_topics:
+                raise ValueError("Too many subscriptions")
+            for coin in coins:
+                self._coins.setdefault(coin, set()).add(channel)
+            for theme in themes:
+                self._themes.setdefault(theme, set()).add(channel)
+            own_coins.update(coins)
+            own_themes.update(themes)
+        rows = np.array([snapshot.positions[coin] for coin in coins], dtype=np.intp)
+        channel.offer(self._deltas(snapshot, rows, None))
+        for theme in themes:
+            channel.offer(self._deltas(snapshot, np.arange(len(snapshot)), theme))
+
+    def unsubscribe(
+        self,
+        channel: SocketChannel,
+        coins: Iterable[str] | None = None,
+        themes: Iterable[str] | None = None,
+    ) -> None:
+        """Drop the given topics, or every topic of ``channel`` when none are given."""
+
+        with self._lock:
+            own_coins, own_themes = self._topics.get(channel, (set(), set()))
+            drop_all = coins is None and themes is None
+            for topic, index, owned in (
+                (set(own_coins) if drop_all else set(coins or ()), self._coins, own_coins),
+                (set(own_themes) if drop_all else set(themes or ()), self._themes, own_themes),
+            ):
+                for name in topic & owned:
+                    channels = index.get(name)
+                    if channels is not None:
+                        channels.discard(channel)
+                        if not channels:
+                            del index[name]
+                owned.difference_update(topic)
+            if drop_all:
+                self._topics.pop(channel, None)
+
+    @staticmethod
+    def _deltas(
+        snapshot: ScoreSnapshot, rows: np.ndarray, theme: str | None
+    ) -> list[tuple[DeltaKey, SocketMessage]]:
+        coins = snapshot.coins[rows].tolist()
+        scores = snapshot.column(theme)[rows].tolist()
+        return [
+            ((coin, theme), encode_delta(coin, score, theme)) for coin, score in zip(coins, scores)
+        ]
+
+    def __call__(self, previous: ScoreSnapshot, snapshot: ScoreSnapshot) -> None:
+        same_universe = np.array_equal(previous.coins, snapshot.coins)
+        same_themes = previous.themes == snapshot.themes
+        everyone = np.arange(len(snapshot))
+
+        coin_deltas: list[tuple[DeltaKey, SocketMessage]] = []
+        if self._coins:
+            rows = np.flatnonzero(previous.scores != snapshot.scores) if same_universe else everyone
+            coin_deltas = self._deltas(snapshot, rows, None)
+        theme_deltas: dict[str, list[tuple[DeltaKey, SocketMessage]]] = {}
+        for theme in list(self._themes):
+            if theme not in snapshot.themes:
+                continue
+            if same_universe and same_themes:
+                rows = np.flatnonzero(previous.column(theme) != snapshot.column(theme))
+            else:
+                rows = everyone
+            theme_deltas[theme] = self._deltas(snapshot, rows, theme)
+
+        outgoing: dict[SocketChannel, list[tuple[DeltaKey, SocketMessage]]] = {}
+        with self._lock:
+            for key, message in coin_deltas:
+                for channel in self._coins.get(key[0], ()):
+                    outgoing.setdefault(channel, []).append((key, message))
+            for theme, deltas in theme_deltas.items():
+                for channel in self._themes.get(theme, ()):
+                    outgoing.setdefault(channel, []).extend(deltas)
+        for channel, deltas in outgoing.items():
+            channel.offer(deltas)
+
+
+@lru_cache(1)
+def get_subscription_index() -> SubscriptionIndex:
+    index = SubscriptionIndex(max_topics=get_settings().ws_max_topics)
+    get_score_store().add_listener(index)
+    return index
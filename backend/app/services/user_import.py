@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from collections.abc import Iterator
+from typing import Any
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.user import User
+from ..schemas.user import UserCreate, UserImportIssue, UserImportReport
+
+_user_adapter = TypeAdapter(UserCreate)
+
+
+class UnsupportedImport(ValueError):
+    """Raised for an upload whose content type is neither JSON nor CSV."""
+
+
+def parse_rows(content_type: str, body: bytes) -> list[dict[str, Any]]:
+    """Decode a JSON array of objects or a CSV file with ``email,full_name`` headers.
+
+    Raises :class:`UnsupportedImport` for other content types and ``ValueError``
+    for a malformed body.
+    """
+
+    media_type = content_type.split(";")[0].strip().lower()
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError as exc:
+        raise ValueError("Body must be UTF-8") from exc
+    if media_type == "application/json":
+        try:
+            rows = json.loads(text)
+        except json.JSONDecodeError as exc:
+            raise ValueError("Invalid JSON") from exc
+        if not isinstance(rows, list):
+            raise ValueError("Expected a JSON array")
+        return rows
+    if media_type in ("text/csv", "application/csv"):
+        reader = csv.DictReader(io.StringIO(text))
+        if not reader.fieldnames or "email" not in reader.fieldnames:
+            raise ValueError("CSV must have a header row with an email column")
+        return list(reader)
+    raise UnsupportedImport(f"Unsupported content type: {media_type or 'none'}")
+
+
+def _batches(rows: list[Any], size: int) -> Iterator[tuple[int, list[Any]]]:
+    for start in range(0, len(rows), size):
+        yield start, rows[start : start + size]
+
+
+async def _insert_batch(session: AsyncSession, values: list[dict[str, Any]]) -> set[str]:
+    """Insert ``values`` skipping existing emails; return the emails actually inserted.
+
+    PostgreSQL and SQLite report the inserted rows through ``RETURNING``, so rows
+    skipped because a concurrent import created the email count as conflicts.
+    """
+
+    dialect = session.bind.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        upsert = pg_insert if dialect == "postgresql" else sqlite_insert
+        statement = (
+            upsert(User)
+            .values(values)
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User.email)
+        )
+        return set((await session.scalars(statement)).all())
+
+    emails = [value["email"] for value in values]
+    existing = set((await session.scalars(select(User.email).where(User.email.in_(emails)))).all())
+    fresh = [value for value in values if value["email"] not in existing]
+    if fresh:
+        # Without ON CONFLICT a concurrent insert fails the batch instead of being miscounted.
+        await session.execute(insert(User), fresh)
+    return {value["email"] for value in fresh}
+
+
+async def import_users(
+    session: AsyncSession, rows: list[Any], batch_size: int = 1000
+) -> UserImportReport:
+    """Validate and insert ``rows`` batch by batch, one transaction per batch.
+
+    Invalid rows and emails that already exist (in the table or earlier in the
+    upload) are reported with their 0-based row number; they never abort the
+    rest of the batch.
+    """
+
+    invalid: list[UserImportIssue] = []
+    conflicts: list[UserImportIssue] = []
+    seen: set[str] = set()
+    inserted = 0
+    for start, batch in _batches(rows, batch_size):
+        values: list[dict[str, Any]] = []
+        row_numbers: dict[str, int] = {}
+        for offset, raw in enumerate(batch):
+            row = start + offset
+            try:
+                user = _user_adapter.validate_python(raw)
+            except ValidationError as exc:
+                email = raw.get("email") if isinstance(raw, dict) else None
+                email = email if isinstance(email, str) else None
+                detail = "; ".join(error["msg"] for error in exc.errors())
+                invalid.append(UserImportIssue(row=row, email=email, detail=detail))
+                continue
+            if user.email in seen:
+                conflicts.append(
+                    UserImportIssue(row=row, email=user.email, detail="Duplicate email in upload")
+                )
+                continue
+            seen.add(user.email)
+            row_numbers[user.email] = row
+            values.append({"email": user.email, "full_name": user.full_name})
+        if not values:
+            continue
+        created = await _insert_batch(session, values)
+        await session.commit()
+        inserted += len(created)
+        for value in values:
+            if value["email"] not in created:
+                conflicts.append(
+                    UserImportIssue(
+                        row=row_numbers[value["email"]],
+                        email=value["email"],
+                        detail="Email already exists",
+                    )
+                )
+    conflicts.sort(key=lambda issue: issue.row)
+    return UserImportReport(
+        received=len(rows), inserted=inserted, conflicts=conflicts, invalid=invalid
+    )
@@ -2,6 +2,31 @@ from __future__ import annotations
 
 import dramatiq
 from dramatiq.brokers.stub import StubBroker
+from dramatiq.middleware import GroupCallbacks
+from dramatiq.rate_limits.backends import StubBackend as StubRateLimiterBackend
+from dramatiq.results import ResultBackend, Results
+from dramatiq.results.backends import StubBackend as StubResultBackend
 
-broker = StubBroker()
+from ..core.config import get_settings
+
+_settings = get_settings()
+broker: dramatiq.Broker
+results_backend: ResultBackend
+
+# The stub broker keeps messages and results in this process: tests and local
+# runs only. Workers in other processes need the Redis broker and backends.
+if _settings.broker == "redis":
+    from dramatiq.brokers.redis import RedisBroker
+    from dramatiq.rate_limits.backends import RedisBackend as RedisRateLimiterBackend
+    from dramatiq.results.backends import RedisBackend as RedisResultBackend
+
+    results_backend = RedisResultBackend(url=_settings.redis_url)
+    broker = RedisBroker(url=_settings.redis_url)
+    broker.add_middleware(Results(backend=results_backend))
+    broker.add_middleware(GroupCallbacks(RedisRateLimiterBackend(url=_settings.redis_url)))
+else:
+    results_backend = StubResultBackend()
+    broker = StubBroker()
+    broker.add_middleware(Results(backend=results_backend))
+    broker.add_middleware(GroupCallbacks(StubRateLimiterBackend()))
 dramatiq.set_broker(broker)
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import uuid
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+
+from .jobs import JobStore
+
+Sender = Callable[[str, str, int], None]
+
+
+class ScopeBusy(Exception):
+    """Raised when a job starts while another job of the same scope is running."""
+
+
+@dataclass(frozen=True)
+class Trigger:
+    job_id: str
+    scope: str
+    coalesced: bool
+
+
+class RecalculationCoalescer:
+    """Debounces recalculation triggers to at most one pending and one running job per scope.
+
+    The first trigger of a scope enqueues a job delayed by ``debounce_ms``; every
+    trigger received until that job starts joins it and gets the same job id.
+    A pending ``full`` job also absorbs ``incremental`` triggers. The pending and
+    running job of each scope live in ``jobs``, shared by the API and the
+    workers, and expire after ``lease_seconds`` so a job that never starts or
+    never finishes cannot hold its scope forever.
+    """
+
+    def __init__(
+        self, send: Sender, debounce_ms: int, jobs: JobStore, lease_seconds: float = 900.0
+    ) -> None:
+        self._send = send
+        self._debounce_ms = debounce_ms
+        self._jobs = jobs
+        self._lease = lease_seconds
+
+    def request(self, scope: str, coins: Iterable[str] = ()) -> Trigger:
+        candidates = (scope,) if scope == "full" else (scope, "full")
+        job_id = uuid.uuid4().hex
+        owner, owner_scope = self._jobs.join_pending(candidates, job_id, coins, self._lease)
+        if owner != job_id:
+            return Trigger(owner, owner_scope, coalesced=True)
+        self._jobs.create(job_id, scope)
+        self._send(job_id, scope, self._debounce_ms)
+        return Trigger(job_id, scope, coalesced=False)
+
+    def start(self, scope: str, job_id: str) -> list[str]:
+        """Move ``job_id`` from pending to running and return the coins it collected."""
+
+        if not self._jobs.acquire_running(scope, job_id, self._lease):
+            raise ScopeBusy(scope)
+        return self._jobs.claim_pending(scope, job_id)
+
+    def finish(self, scope: str, job_id: str) -> None:
+        self._jobs.release_running(scope, job_id)
+
+    def pending(self, scope: str) -> str | None:
+        return self._jobs.pending(scope)
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import logging
+
+import dramatiq
+
+from ..core.config import get_settings
+from ..services.ingestion import IngestionReport, get_object_source, ingest
+from ..services.score_inputs import get_input_store
+from .jobs import get_job_store
+from .recalculate import get_coalescer
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_EVERY_BATCHES = 10
+
+
+@dramatiq.actor(max_retries=0, time_limit=6 * 60 * 60 * 1000)
+def ingest_dataset(key: str, fmt: str | None = None, job_id: str | None = None) -> None:
+    """Load an uploaded dataset into the scoring inputs and schedule a recalculation.
+
+    Progress events carry the running row count and throughput. The batches go
+    to the configured input store, which must be ``redis`` when recalculations
+    run in other processes; the coins whose inputs changed are marked dirty
+    there and rescored by a coalesced incremental recalculation.
+    """
+
+    jobs = get_job_store()
+
+    def report_progress(report: IngestionReport) -> None:
+        if job_id is not None and report.batches % PROGRESS_EVERY_BATCHES == 0:
+            jobs.update(job_id, rows_ingested=report.rows)
+            jobs.append_event(job_id, {"type": "progress", **report.as_dict()})
+
+    if job_id is not None:
+        jobs.start(job_id)
+    try:
+        report = ingest(
+            get_object_source(),
+            key,
+            get_input_store(),
+            fmt,
+            get_settings().ingestion_batch_rows,
+            report_progress,
+        )
+    except Exception as exc:
+        if job_id is not None:
+            jobs.fail(job_id, repr(exc))
+        raise
+    logger.info("Ingested dataset", extra=report.as_dict())
+    trigger = get_coalescer().request("incremental")
+    if job_id is not None:
+        jobs.update(job_id, rows_ingested=report.rows)
+        jobs.append_event(
+            job_id, {"type": "progress", **report.as_dict(), "recalculation": trigger.job_id}
+        )
+        jobs.succeed(job_id, len(report.coins))
@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Iterable, Sequence
+from functools import lru_cache
+from typing import Any
+
+from ..core.config import get_settings
+
+TERMINAL_STATES = frozenset({"succeeded", "failed"})
+
+
+class JobStore(ABC):
+    """Status record and ordered progress events of recalculation jobs."""
+
+    @abstractmethod
+    def create(self, job_id: str, scope: str) -> None: ...
+
+    @abstractmethod
+    def update(self, job_id: str, **fields: Any) -> None: ...
+
+    @abstractmethod
+    def increment(self, job_id: str, field: str, amount: int = 1) -> int: ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> dict[str, Any] | None: ...
+
+    @abstractmethod
+    def append_event(self, job_id: str, event: dict[str, Any]) -> None: ...
+
+    @abstractmethod
+    def events(self, job_id: str, since: int = 0) -> list[dict[str, Any]]: ...
+
+    @abstractmethod
+    def join_pending(
+        self, scopes: Sequence[str], job_id: str, coins: Iterable[str], ttl: float
+    ) -> tuple[str, str]:
+        """Add ``coins`` to the first pending job of ``scopes`` and return its id and scope.
+
+        Without one, ``job_id`` becomes the pending job of ``scopes[0]`` for
+        ``ttl`` seconds.
+        """
+
+    @abstractmethod
+    def claim_pending(self, scope: str, job_id: str) -> list[str]:
+        """Clear the pending job of ``scope`` if it is ``job_id`` and return its coins."""
+
+    @abstractmethod
+    def pending(self, scope: str) -> str | None: ...
+
+    @abstractmethod
+    def acquire_running(self, scope: str, job_id: str, ttl: float) -> bool:
+        """Mark ``job_id`` as the running job of ``scope`` for ``ttl`` seconds.
+
+        Fails while another unexpired job holds the scope.
+        """
+
+    @abstractmethod
+    def release_running(self, scope: str, job_id: str) -> None: ...
+
+    @staticmethod
+    def new_record(job_id: str, scope: str) -> dict[str, Any]:
+        return {
+            "id": job_id,
+            "scope": scope,
+            "state": "pending",
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "duration_ms": None,
+            "shards_total": 0,
+            "shards_done": 0,
+            "coins_updated": 0,
+            "error": None,
+        }
+
+    def start(self, job_id: str) -> None:
+        self.update(job_id, state="running", started_at=time.time())
+        self.append_event(job_id, {"type": "started"})
+
+    def succeed(self, job_id: str, coins_updated: int) -> None:
+        self._finish(job_id, "succeeded", coins_updated=coins_updated)
+
+    def fail(self, job_id: str, error: str) -> None:
+        self._finish(job_id, "failed", error=error)
+
+    def _finish(self, job_id: str, state: str, **fields: Any) -> None:
+        record = self.get(job_id) or {}
+        finished_at = time.time()
+        started_at = record.get("started_at") or record.get("created_at") or finished_at
+        duration_ms = round((finished_at - started_at) * 1000, 2)
+        self.update(job_id, state=state, finished_at=finished_at, duration_ms=duration_ms, **fields)
+        self.append_event(job_id, {"type": state, "duration_ms": duration_ms, **fields})
+
+
+class InMemoryJobStore(JobStore):
+    """Process-local store keeping the ``max_jobs`` most recent jobs."""
+
+    def __init__(self, max_jobs: int = 1000) -> None:
+        self._lock = threading.Lock()
+        self._max_jobs = max_jobs
+        self._records: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._events: dict[str, list[dict[str, Any]]] = {}
+        # scope -> (job id, expiry on the monotonic clock, coins)
+        self._pending: dict[str, tuple[str, float, set[str]]] = {}
+        self._running: dict[str, tuple[str, float]] = {}
+
+    def create(self, job_id: str, scope: str) -> None:
+        with self._lock:
+            self._records[job_id] = self.new_record(job_id, scope)
+            self._events[job_id] = []
+            while len(self._records) > self._max_jobs:
+                evicted, _ = self._records.popitem(last=False)
+                self._events.pop(evicted, None)
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        with self._lock:
+            record = self._records.get(job_id)
+            if record is not None:
+                record.update(fields)
+
+    def increment(self, job_id: str, field: str, amount: int = 1) -> int:
+        with self._lock:
+            record = self._records.get(job_id)
+            if record is None:
+                return 0
+            record[field] = int(record.get(field) or 0) + amount
+            return int(record[field])
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            record = self._records.get(job_id)
+            return dict(record) if record is not None else None
+
+    def append_event(self, job_id: str, event: dict[str, Any]) -> None:
+        with self._lock:
+            events = self._events.get(job_id)
+            if events is not None:
+                events.append({**event, "at": time.time()})
+
+    def events(self, job_id: str, since: int = 0) -> list[dict[str, Any]]:
+        with self._lock:
+            return list(self._events.get(job_id, [])[since:])
+
+    def _live_pending(self, scope: str) -> tuple[str, float, set[str]] | None:
+        entry = self._pending.get(scope)
+        if entry is not None and entry[1] <= time.monotonic():
+            del self._pending[scope]
+            return None
+        return entry
+
+    def join_pending(
+        self, scopes: Sequence[str], job_id: str, coins: Iterable[str], ttl: float
+    ) -> tuple[str, str]:
+        with self._lock:
+            for scope in scopes:
+                entry = self._live_pending(scope)
+                if entry is not None:
+                    entry[2].update(coins)
+                    return entry[0], scope
+            self._pending[scopes[0]] = (job_id, time.monotonic() + ttl, set(coins))
+            return job_id, scopes[0]
+
+    def claim_pending(self, scope: str, job_id: str) -> list[str]:
+        with self._lock:
+            entry = self._live_pending(scope)
+            if entry is None or entry[0] != job_id:
+                return []
+            del self._pending[scope]
+            return sorted(entry[2])
+
+    def pending(self, scope: str) -> str | None:
+        with self._lock:
+            entry = self._live_pending(scope)
+            return entry[0] if entry is not None else None
+
+    def acquire_running(self, scope: str, job_id: str, ttl: float) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            holder = self._running.get(scope)
+            if holder is not None and holder[0] != job_id and holder[1] > now:
+                return False
+            self._running[scope] = (job_id, now + ttl)
+            return True
+
+    def release_running(self, scope: str, job_id: str) -> None:
+        with self._lock:
+            holder = self._running.get(scope)
+            if holder is not None and holder[0] == job_id:
+                del self._running[scope]
+
+
+# KEYS: pending key of every candidate scope; ARGV: job id, ttl (ms), coins...
+_JOIN_PENDING = """
+local function add_coins(key)
+    -- unpack() is bounded by the Lua stack, so coins are added in chunks
+    for first = 3, #ARGV, 1000 do
+        redis.call('SADD', key, unpack(ARGV, first, math.min(first + 999, #ARGV)))
+    end
+end
+for index, key in ipairs(KEYS) do
+    local owner = redis.call('GET', key)
+    if owner then
+        if #ARGV > 2 then
+            add_coins(key .. ':coins')
+            redis.call('PEXPIRE', key .. ':coins', redis.call('PTTL', key))
+        end
+        return {owner, index}
+    end
+end
+redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[2])
+redis.call('DEL', KEYS[1] .. ':coins')
+if #ARGV > 2 then
+    add_coins(KEYS[1] .. ':coins')
+    redis.call('PEXPIRE', KEYS[1] .. ':coins', ARGV[2])
+end
+return {ARGV[1], 1}
+"""
+
+# KEYS: pending key; ARGV: job id
+_CLAIM_PENDING = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return {}
+end
+local coins = redis.call('SMEMBERS', KEYS[1] .. ':coins')
+redis.call('DEL', KEYS[1], KEYS[1] .. ':coins')
+return coins
+"""
+
+# KEYS: running key; ARGV: job id, ttl (ms)
+_ACQUIRE_RUNNING = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    return 1
+end
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+# KEYS: running key; ARGV: job id
+_RELEASE_RUNNING = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisJobStore(JobStore):
+    """Store shared by API and worker processes; fields are JSON-encoded hash values.
+
+    The pending and running job of each scope are plain keys with a TTL, updated
+    by Lua scripts so that processes racing on a scope see a single owner.
+    """
+
+    def __init__(self, url: str, ttl_seconds: int = 86_400, prefix: str = "tokenlysis:job") -> None:
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self._ttl = ttl_seconds
+        self._prefix = prefix
+        self._join_pending = self._redis.register_script(_JOIN_PENDING)
+        self._claim_pending = self._redis.register_script(_CLAIM_PENDING)
+        self._acquire_running = self._redis.register_script(_ACQUIRE_RUNNING)
+        self._release_running = self._redis.register_script(_RELEASE_RUNNING)
+
+    def _key(self, job_id: str) -> str:
+        return f"{self._prefix}:{job_id}"
+
+    def _scope_key(self, scope: str, kind: str) -> str:
+        return f"{self._prefix}:scope:{scope}:{kind}"
+
+    def create(self, job_id: str, scope: str) -> None:
+        record = {name: json.dumps(value) for name, value in self.new_record(job_id, scope).items()}
+        with self._redis.pipeline() as pipe:
+            pipe.hset(self._key(job_id), mapping=record)
+            pipe.expire(self._key(job_id), self._ttl)
+            pipe.execute()
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        mapping = {name: json.dumps(value) for name, value in fields.items()}
+        self._redis.hset(self._key(job_id), mapping=mapping)
+
+    def increment(self, job_id: str, field: str, amount: int = 1) -> int:
+        return int(self._redis.hincrby(self._key(job_id), field, amount))
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        raw = self._redis.hgetall(self._key(job_id))
+        if not raw:
+            return None
+        return {name.decode(): json.loads(value) for name, value in raw.items()}
+
+    def append_event(self, job_id: str, event: dict[str, Any]) -> None:
+        key = f"{self._key(job_id)}:events"
+        with self._redis.pipeline() as pipe:
+            pipe.rpush(key, json.dumps({**event, "at": time.time()}))
+            pipe.expire(key, self._ttl)
+            pipe.execute()
+
+    def events(self, job_id: str, since: int = 0) -> list[dict[str, Any]]:
+        raw = self._redis.lrange(f"{self._key(job_id)}:events", since, -1)
+        return [json.loads(item) for item in raw]
+
+    def join_pending(
+        self, scopes: Sequence[str], job_id: str, coins: Iterable[str], ttl: float
+    ) -> tuple[str, str]:
+        owner, index = self._join_pending(
+            keys=[self._scope_key(scope, "pending") for scope in scopes],
+            args=[job_id, max(1, int(ttl * 1000)), *coins],
+        )
+        return owner.decode(), scopes[int(index) - 1]
+
+    def claim_pending(self, scope: str, job_id: str) -> list[str]:
+        coins = self._claim_pending(keys=[self._scope_key(scope, "pending")], args=[job_id])
+        return sorted(coin.decode() for coin in coins)
+
+    def pending(self, scope: str) -> str | None:
+        owner = self._redis.get(self._scope_key(scope, "pending"))
+        return owner.decode() if owner is not None else None
+
+    def acquire_running(self, scope: str, job_id: str, ttl: float) -> bool:
+        acquired = self._acquire_running(
+            keys=[self._scope_key(scope, "running")], args=[job_id, max(1, int(ttl * 1000))]
+        )
+        return bool(acquired)
+
+    def release_running(self, scope: str, job_id: str) -> None:
+        self._release_running(keys=[self._scope_key(scope, "running")], args=[job_id])
+
+
+@lru_cache(1)
+def get_job_store() -> JobStore:
+    settings = get_settings()
+    if settings.job_store == "redis":
+        return RedisJobStore(settings.redis_url)
+    return InMemoryJobStore()
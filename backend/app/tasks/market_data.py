@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import logging
+
+import dramatiq
+
+from ..services.market_data import get_market_data_fetcher
+from ..services.score_inputs import get_input_store
+from .recalculate import get_coalescer
+
+logger = logging.getLogger(__name__)
+
+
+@dramatiq.actor(max_retries=3)
+def refresh_market_data(coins: list[str] | None = None) -> None:
+    """Refresh market features of ``coins`` (default: every mapped coin) and rescore them.
+
+    The features are written to the configured input store before the
+    recalculation is requested; with the ``redis`` store they reach whichever
+    worker runs it.
+    """
+
+    inputs = get_input_store()
+    report = get_market_data_fetcher().refresh(inputs, coins)
+    logger.info(
+        "Refreshed market data",
+        extra={
+            "requests": report.requests,
+            "not_modified": report.not_modified,
+            "coins": len(report.refreshed),
+        },
+    )
+    if report.refreshed:
+        get_coalescer().request("incremental", report.refreshed)
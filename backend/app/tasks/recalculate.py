@@ -1,12 +1,330 @@
 from __future__ import annotations
 
+import base64
 import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Literal
 
 import dramatiq
+import numpy as np
+from dramatiq import Message
+
+from ..core.config import get_settings
+from ..services.score_history import get_history_writer
+from ..services.score_inputs import get_input_store
+from ..services.score_store import get_score_store
+from ..services.shared_snapshot import get_replicator
+from ..services.scoring import FeatureFrame, ScoringEngine, ScoringState
+from . import broker, results_backend
+from .coalescing import RecalculationCoalescer, ScopeBusy
+from .jobs import TERMINAL_STATES, get_job_store
 
 logger = logging.getLogger(__name__)
 
+RecalculationMode = Literal["full", "incremental"]
+
+_state: ScoringState | None = None
+# Dirty-set claim ``_state`` is up to date with; another worker's claim makes it stale.
+_state_claim: int | None = None
+_state_lock = threading.Lock()
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def reset_state() -> None:
+    global _state, _state_claim
+    with _state_lock:
+        _state, _state_claim = None, None
+
+
+def encode_array(array: np.ndarray) -> dict[str, Any]:
+    array = np.ascontiguousarray(array, dtype=np.float64)
+    return {"shape": list(array.shape), "data": base64.b64encode(array.tobytes()).decode()}
+
+
+def decode_array(payload: dict[str, Any]) -> np.ndarray:
+    data = base64.b64decode(payload["data"])
+    return np.frombuffer(data, dtype=np.float64).reshape(payload["shape"])
+
+
+def _extract_rows(
+    coins: list[str], features: np.ndarray, names: tuple[str, ...]
+) -> list[np.ndarray]:
+    frame = FeatureFrame(np.array(coins, dtype=np.str_), features, names)
+    return ScoringEngine().extract(frame)
+
+
+def _get_pool(processes: int) -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            context = multiprocessing.get_context("spawn")
+            _pool = ProcessPoolExecutor(max_workers=processes, mp_context=context)
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
+class ProcessPoolShutdown(dramatiq.Middleware):
+    """Stops the extraction process pool when the Dramatiq worker exits."""
+
+    def after_worker_shutdown(self, broker: dramatiq.Broker, worker: dramatiq.Worker) -> None:
+        shutdown_pool()
+
+
+class ScoreReplication(dramatiq.Middleware):
+    """Registers the snapshot replicator once the worker process has booted.
+
+    From then on every published snapshot is forwarded to the API workers.
+    """
+
+    def after_process_boot(self, broker: dramatiq.Broker) -> None:
+        get_replicator()
+
+
+broker.add_middleware(ProcessPoolShutdown())
+broker.add_middleware(ScoreReplication())
+
+
+def _extract(frame: FeatureFrame) -> list[np.ndarray]:
+    """Extract raw component values, split across the worker's process pool if enabled."""
+
+    processes = get_settings().recalc_pool_processes
+    if processes <= 1 or len(frame) < 2 * processes:
+        return ScoringEngine().extract(frame)
+    bounds = np.array_split(np.arange(len(frame)), processes)
+    chunks = [
+        (frame.coins[rows].tolist(), frame.features[rows], frame.feature_names)
+        for rows in bounds
+    ]
+    parts = list(_get_pool(processes).map(_extract_rows, *zip(*chunks)))
+    return [np.vstack(component) for component in zip(*parts)]
+
+
+def _publish(state: ScoringState, mode: str, dirty: int, started: float) -> int:
+    """Publish ``state`` and return how many coins got a new composite score."""
+
+    result = state.result()
+    store = get_score_store()
+    previous = store.snapshot
+    snapshot = store.publish(result.coins, result.scores, result.theme_scores, result.themes)
+    if get_settings().score_history_enabled:
+        get_history_writer().submit(snapshot)
+    if np.array_equal(previous.coins, snapshot.coins):
+        updated = int(np.count_nonzero(previous.scores != snapshot.scores))
+    else:
+        updated = len(snapshot)
+    logger.info(
+        "Recalculated thematic scores",
+        extra={
+            "mode": mode,
+            "coins": len(snapshot),
+            "dirty": dirty,
+            "version": snapshot.version,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        },
+    )
+    return updated
+
+
+def _fan_out(frame: FeatureFrame, shard_size: int, job_id: str | None, claim: int) -> int:
+    """Send one :func:`score_shard` message per slice and merge them once all are done.
+
+    Messages only name the coins and features of their slice; shards read the
+    values from the shared input store. A shard that fails for good fails the
+    job through :func:`fail_shards`.
+    """
+
+    shards = []
+    for start in range(0, len(frame), shard_size):
+        rows = slice(start, start + shard_size)
+        shards.append(
+            score_shard.message_with_options(
+                args=(frame.coins[rows].tolist(), list(frame.feature_names), job_id),
+                on_failure=fail_shards,
+            )
+        )
+    merge = merge_shards.message(
+        [shard.message_id for shard in shards], time.time(), job_id, claim
+    )
+    if job_id is not None:
+        get_job_store().update(job_id, shards_total=len(shards))
+    fan_out = dramatiq.group(shards)
+    fan_out.add_completion_callback(merge)
+    fan_out.run()
+    return len(shards)
+
+
+def _send_recalculation(job_id: str, scope: str, delay_ms: int) -> None:
+    recalculate_scores.send_with_options(args=(scope, None, job_id), delay=delay_ms)
+
+
+@lru_cache(1)
+def get_coalescer() -> RecalculationCoalescer:
+    settings = get_settings()
+    return RecalculationCoalescer(
+        _send_recalculation,
+        settings.recalc_debounce_ms,
+        get_job_store(),
+        lease_seconds=settings.recalc_lease_seconds,
+    )
+
+
+def _recalculate(
+    mode: RecalculationMode, coins: list[str] | None, job_id: str | None
+) -> int | None:
+    """Run one recalculation and return the number of updated coins.
+
+    ``None`` means the run was fanned out and continues in shard actors.
+    """
+
+    global _state, _state_claim
+    started = time.perf_counter()
+    inputs = get_input_store()
+    engine = ScoringEngine(drift_tolerance=get_settings().recalc_drift_tolerance)
+    with _state_lock:
+        claimed, claim = inputs.claim_dirty()
+        dirty = sorted(set(claimed) | set(coins or []))
+        if _state is not None and _state_claim != claim - 1:
+            logger.info("Another worker claimed input changes, running a full recalculation")
+            _state = None
+        _state_claim = claim
+        if mode == "incremental" and _state is not None:
+            if not dirty:
+                logger.info("No dirty coins, skipping recalculation")
+                return 0
+            try:
+                _state = engine.update(_state, inputs.frame(dirty))
+            except ValueError:
+                logger.info("Scoring state is stale, running a full recalculation")
+                mode = "full"
+        else:
+            mode = "full"
+        if mode == "full":
+            frame = inputs.frame()
+            shard_size = get_settings().recalc_shard_size
+            if shard_size and len(frame) > shard_size:
+                shards = _fan_out(frame, shard_size, job_id, claim)
+                _state = None  # replaced by merge_shards, wherever it runs
+                logger.info("Fanned out recalculation", extra={"shards": shards})
+                return None
+            _state = engine.full(frame)
+        state = _state
+    return _publish(state, mode, len(dirty), started)
+
 
 @dramatiq.actor
-def recalculate_scores() -> None:
-    logger.info("Recalculating thematic scores")
+def recalculate_scores(
+    mode: RecalculationMode = "full",
+    coins: list[str] | None = None,
+    job_id: str | None = None,
+) -> None:
+    """Score the universe, or only the coins whose inputs changed.
+
+    ``incremental`` rescores the dirty coins of the input store plus ``coins``;
+    it falls back to a full run when this worker has no scoring state yet.
+    Full runs over more than ``recalc_shard_size`` coins are fanned out to
+    :func:`score_shard` and published by :func:`merge_shards`. Jobs scheduled
+    through :func:`get_coalescer` carry a ``job_id`` and wait for the running
+    job of their scope to finish.
+    """
+
+    if job_id is None:
+        _recalculate(mode, coins, None)
+        return
+    coalescer = get_coalescer()
+    jobs = get_job_store()
+    try:
+        claimed = coalescer.start(mode, job_id)
+    except ScopeBusy:
+        _send_recalculation(job_id, mode, get_settings().recalc_debounce_ms)
+        return
+    jobs.start(job_id)
+    try:
+        updated = _recalculate(mode, sorted(set(coins or []) | set(claimed)), job_id)
+    except Exception as exc:
+        coalescer.finish(mode, job_id)
+        jobs.fail(job_id, repr(exc))
+        raise
+    if updated is not None:
+        coalescer.finish(mode, job_id)
+        jobs.succeed(job_id, updated)
+
+
+@dramatiq.actor(store_results=True, max_retries=3)
+def score_shard(
+    coins: list[str], feature_names: list[str], job_id: str | None = None
+) -> dict[str, Any]:
+    """Extract the raw component values of one slice of the universe.
+
+    Only ``feature_names`` are read, so every shard of a run has the same columns.
+    """
+
+    inputs = get_input_store().frame(coins)
+    frame = FeatureFrame(inputs.coins, inputs.select(feature_names), tuple(feature_names))
+    raws = [encode_array(raw) for raw in _extract(frame)]
+    if job_id is not None:
+        jobs = get_job_store()
+        done = jobs.increment(job_id, "shards_done")
+        jobs.append_event(job_id, {"type": "progress", "shards_done": done, "coins": len(frame)})
+    return {"coins": frame.coins.tolist(), "raws": raws}
+
+
+@dramatiq.actor
+def fail_shards(message_data: dict[str, Any], exception_data: dict[str, Any]) -> None:
+    """Fail the job of a shard that ran out of retries and release its scope."""
+
+    job_id = message_data["args"][2]
+    if job_id is None:
+        return
+    jobs = get_job_store()
+    record = jobs.get(job_id)
+    if record is not None and record["state"] not in TERMINAL_STATES:
+        jobs.fail(job_id, f"{exception_data['type']}: {exception_data['message']}")
+    get_coalescer().finish("full", job_id)
+
+
+@dramatiq.actor
+def merge_shards(
+    shard_ids: list[str], requested_at: float, job_id: str | None = None, claim: int | None = None
+) -> None:
+    """Normalize the raw values of every shard together and publish one snapshot."""
+
+    global _state, _state_claim
+    started = time.perf_counter()
+    coins: list[str] = []
+    parts: list[list[np.ndarray]] = []
+    for message_id in shard_ids:
+        message: Message[Any] = Message(
+            queue_name=score_shard.queue_name,
+            actor_name=score_shard.actor_name,
+            args=(),
+            kwargs={},
+            options={},
+            message_id=message_id,
+        )
+        shard = results_backend.get_result(message)
+        coins.extend(shard["coins"])
+        parts.append([decode_array(raw) for raw in shard["raws"]])
+    raws = [np.vstack(component) for component in zip(*parts)]
+    state = ScoringEngine().from_raws(np.array(coins, dtype=np.str_), raws)
+    with _state_lock:
+        _state, _state_claim = state, claim
+    updated = _publish(state, "sharded", 0, started)
+    if job_id is not None:
+        get_coalescer().finish("full", job_id)
+        get_job_store().succeed(job_id, updated)
+    logger.info(
+        "Merged recalculation shards",
+        extra={"shards": len(shard_ids), "latency_s": round(time.time() - requested_at, 3)},
+    )
@@ -8,8 +8,12 @@ from pathlib import Path
 
 import pytest
 from fastapi.testclient import TestClient
+from sse_starlette.sse import AppStatus
 
 ROOT = Path(__file__).resolve().parents[1]
+os.environ.setdefault("TOKENLYSIS_SCORE_HISTORY_ENABLED", "false")
+os.environ.setdefault("TOKENLYSIS_OIDC_PREFETCH_JWKS", "false")
+os.environ.setdefault("TOKENLYSIS_AUTH_TEST_TOKENS", "true")
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
@@ -17,17 +21,51 @@ if str(ROOT) not in sys.path:
 @pytest.fixture
 def client(tmp_path) -> Iterator[TestClient]:
     from backend.app.api import deps
+    from backend.app.core import rbac
     from backend.app.core.config import get_settings
+    from backend.app.core.security import get_token_verifier
     from backend.app.db import session as db_session
     from backend.app.db.base import Base
     from backend.app.main import create_app
+    from backend.app.services.backplane import get_backplane, get_score_replicator
+    from backend.app.services.broadcast import get_score_broadcaster
+    from backend.app.services.files import get_file_service
+    from backend.app.services.ingestion import get_object_source
+    from backend.app.services.ranking import get_rankings
+    from backend.app.services.response_cache import get_response_cache
+    from backend.app.services.score_store import get_score_store
+    from backend.app.services.shared_snapshot import get_mapped_replicator
+    from backend.app.services.subscriptions import get_subscription_index
+    from backend.app.tasks import broker
+    from backend.app.tasks.jobs import get_job_store
+    from backend.app.tasks.recalculate import get_coalescer, reset_state
 
     database_file = tmp_path / "tokenlysis_test.db"
     os.environ["TOKENLYSIS_DATABASE_URL"] = f"sqlite+aiosqlite:///{database_file}"
 
     get_settings.cache_clear()
+    get_token_verifier.cache_clear()
+    rbac.get_enforcer.cache_clear()
+    rbac.get_decision_table.cache_clear()
+    AppStatus.should_exit_event = None
+    get_score_store.cache_clear()
+    get_rankings.cache_clear()
+    get_response_cache.cache_clear()
+    get_file_service.cache_clear()
+    get_object_source.cache_clear()
+    get_score_broadcaster.cache_clear()
+    get_subscription_index.cache_clear()
+    get_backplane.cache_clear()
+    get_score_replicator.cache_clear()
+    get_mapped_replicator.cache_clear()
+    get_coalescer.cache_clear()
+    get_job_store.cache_clear()
+    reset_state()
+    broker.flush_all()
     db_session._engine = None  # type: ignore[attr-defined]
     db_session._SessionLocal = None  # type: ignore[attr-defined]
+    db_session._read_engine = None  # type: ignore[attr-defined]
+    db_session._ReadSessionLocal = None  # type: ignore[attr-defined]
 
     engine = db_session.get_engine()
     async_session = db_session.get_sessionmaker()
@@ -45,6 +83,7 @@ def client(tmp_path) -> Iterator[TestClient]:
             yield session
 
     app.dependency_overrides[deps.get_db] = override_get_db
+    app.dependency_overrides[deps.get_read_db] = override_get_db
 
     with TestClient(app) as test_client:
         yield test_client
@@ -60,6 +99,8 @@ def client(tmp_path) -> Iterator[TestClient]:
         database_file.unlink()
     db_session._engine = None  # type: ignore[attr-defined]
     db_session._SessionLocal = None  # type: ignore[attr-defined]
+    db_session._read_engine = None  # type: ignore[attr-defined]
+    db_session._ReadSessionLocal = None  # type: ignore[attr-defined]
     os.environ.pop("TOKENLYSIS_DATABASE_URL", None)
     get_settings.cache_clear()
 
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from backend.app.core.config import Settings
+from backend.app.db.session import engine_options
+
+
+def test_engine_options_apply_pool_settings_to_postgres():
+    settings = Settings(db_pool_size=5, db_max_overflow=2, db_statement_cache_size=0)
+    options = engine_options("postgresql+asyncpg://user:secret@db/tokenlysis", settings)
+
+    assert options["pool_size"] == 5
+    assert options["max_overflow"] == 2
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"] == {"statement_cache_size": 0}
+    assert engine_options("sqlite+aiosqlite:///tokenlysis.db", settings) == {}
+
+
+def test_read_engine_defaults_to_primary(monkeypatch):
+    from backend.app.core.config import get_settings
+    from backend.app.db import session as db_session
+
+    monkeypatch.setenv("TOKENLYSIS_DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+    get_settings.cache_clear()
+    monkeypatch.setattr(db_session, "_engine", None)
+    monkeypatch.setattr(db_session, "_read_engine", None)
+    try:
+        assert db_session.get_read_engine() is db_session.get_engine()
+    finally:
+        get_settings.cache_clear()
@@ -11,3 +11,52 @@ def test_signed_upload_url(client, authorized_headers):
     data = response.json()
     assert data["url"].startswith("https://minio.local")
     assert "fields" in data
+
+
+def test_upload_signature_matches_botocore():
+    import base64
+    import json
+    from datetime import datetime, timezone
+
+    from backend.app.services.files import get_file_service
+
+    get_file_service.cache_clear()
+    service = get_file_service()
+    expected = service.client.generate_presigned_post(
+        Bucket=service.bucket,
+        Key="reports/daily.csv",
+        Fields={"acl": "private", "success_action_status": "201"},
+        Conditions=[{"acl": "private"}, {"success_action_status": "201"}],
+        ExpiresIn=60,
+    )
+    policy = json.loads(base64.b64decode(expected["fields"]["policy"]))
+    signed_at = datetime.strptime(expected["fields"]["x-amz-date"], "%Y%m%dT%H%M%SZ")
+    expiration = datetime.strptime(policy["expiration"], "%Y-%m-%dT%H:%M:%SZ")
+    expires_in = int((expiration - signed_at).total_seconds())
+
+    signature = service.create_upload_signature(
+        "reports/daily.csv", expires_in, signed_at.replace(tzinfo=timezone.utc)
+    )
+    assert signature == expected
+    assert get_file_service() is service
+
+
+def test_batch_signing(client, authorized_headers):
+    names = [f"uploads/{index}.csv" for index in range(3)]
+    response = client.post(
+        "/api/files/sign/batch",
+        json={"object_names": names, "expires_in": 60},
+        headers=authorized_headers,
+    )
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [item["object_name"] for item in items] == names
+    assert [item["fields"]["key"] for item in items] == names
+    assert len({item["fields"]["x-amz-date"] for item in items}) == 1
+
+    invalid = client.post(
+        "/api/files/sign/batch",
+        json={"object_names": ["bad name"], "expires_in": 60},
+        headers=authorized_headers,
+    )
+    assert invalid.status_code == 422
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import gzip
+import json
+
+import numpy as np
+import pytest
+
+
+def test_csv_is_ingested_in_bounded_batches(tmp_path):
+    from backend.app.services.ingestion import LocalObjectSource, ingest
+    from backend.app.services.score_inputs import InMemoryInputStore
+
+    (tmp_path / "dumps").mkdir()
+    (tmp_path / "dumps" / "market.csv").write_text(
+        "coin,market_cap,volume_24h\n"
+        "btc,1.0e12,3.0e10\n"
+        "eth,4.0e11,\n"
+        "sol,oops,1.0e9\n"
+        ",1.0,2.0\n"
+        "ada,2.0e10,5.0e8\n"
+    )
+    store = InMemoryInputStore()
+    seen = []
+
+    report = ingest(
+        LocalObjectSource(tmp_path),
+        "dumps/market.csv",
+        store,
+        batch_rows=2,
+        progress=lambda report: seen.append(report.rows),
+    )
+
+    assert (report.rows, report.rejected, report.batches) == (3, 2, 2)
+    assert seen == [2, 3]
+    assert report.rows_per_second > 0
+    frame = store.frame(["btc", "eth", "ada"])
+    assert frame.feature_names == ("market_cap", "volume_24h")
+    np.testing.assert_array_equal(frame.features[0], [1.0e12, 3.0e10])
+    assert frame.features[1, 0] == 4.0e11 and np.isnan(frame.features[1, 1])
+    assert store.take_dirty() == ["ada", "btc", "eth"]
+
+
+def test_gzipped_ndjson_merges_into_existing_inputs(tmp_path):
+    from backend.app.services.ingestion import LocalObjectSource, ingest
+    from backend.app.services.score_inputs import InMemoryInputStore
+
+    lines = [
+        {"coin": "btc", "volume_24h": 4.0e10},
+        {"coin": "eth", "dev_commits_4w": 12, "volume_24h": None},
+        {"volume_24h": 1.0},
+        "not an object",
+    ]
+    with gzip.open(tmp_path / "social.ndjson.gz", "wt") as handle:
+        handle.write("\n".join(json.dumps(line) for line in lines) + "\n\n")
+    store = InMemoryInputStore()
+    store.upsert("eth", {"volume_24h": 1.8e10})
+    store.take_dirty()
+
+    report = ingest(LocalObjectSource(tmp_path), "social.ndjson.gz", store)
+
+    assert (report.format, report.rows, report.rejected) == ("ndjson", 2, 2)
+    frame = store.frame(["eth"])
+    features = dict(zip(frame.feature_names, frame.features[0]))
+    assert features == {"volume_24h": 1.8e10, "dev_commits_4w": 12.0}
+
+
+def test_parquet_round_trips_numeric_columns(tmp_path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    from backend.app.services.ingestion import LocalObjectSource, ingest
+    from backend.app.services.score_inputs import InMemoryInputStore
+
+    table = pa.table(
+        {
+            "coin": ["btc", "eth", None, "sol"],
+            "market_cap": [1.0e12, 4.0e11, 1.0, 8.0e10],
+            "dev_commits_4w": pa.array([40, None, 3, 12], type=pa.int32()),
+            "name": ["Bitcoin", "Ether", "?", "Solana"],
+        }
+    )
+    pq.write_table(table, tmp_path / "market.parquet", row_group_size=2)
+    store = InMemoryInputStore()
+
+    report = ingest(LocalObjectSource(tmp_path), "market.parquet", store, batch_rows=2)
+
+    assert (report.format, report.rows, report.rejected, report.batches) == ("parquet", 3, 1, 2)
+    frame = store.frame(["btc", "eth", "sol"])
+    assert frame.feature_names == ("market_cap", "dev_commits_4w")
+    np.testing.assert_array_equal(frame.features[[0, 2]], [[1.0e12, 40.0], [8.0e10, 12.0]])
+    assert frame.features[1, 0] == 4.0e11 and np.isnan(frame.features[1, 1])
+
+
+def test_unknown_formats_and_paths_are_rejected(tmp_path):
+    from backend.app.services.ingestion import (
+        LocalObjectSource,
+        UnsupportedFormat,
+        detect_format,
+    )
+
+    assert detect_format("a/b.jsonl") == ("ndjson", False)
+    assert detect_format("dump.bin.gz", "csv") == ("csv", True)
+    with pytest.raises(UnsupportedFormat):
+        detect_format("dump.xlsx")
+    with pytest.raises(FileNotFoundError):
+        LocalObjectSource(tmp_path / "root").open("../secrets.csv")
+
+
+def test_ingestion_job_feeds_inputs_and_schedules_recalculation(
+    client, authorized_headers, tmp_path, monkeypatch
+):
+    from backend.app.core.config import get_settings
+    from backend.app.services.score_inputs import get_input_store
+    from backend.app.tasks.ingest import ingest_dataset
+
+    (tmp_path / "uploads").mkdir()
+    (tmp_path / "uploads" / "daily.csv").write_text("coin,volume_24h\nbtc,4.2e10\n")
+    monkeypatch.setenv("TOKENLYSIS_INGESTION_SOURCE", "local")
+    monkeypatch.setenv("TOKENLYSIS_INGESTION_LOCAL_ROOT", str(tmp_path / "uploads"))
+    get_settings.cache_clear()
+    get_input_store.cache_clear()
+
+    response = client.post(
+        "/api/files/ingest", json={"object_name": "daily.csv"}, headers=authorized_headers
+    )
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    assert response.json()["format"] == "csv"
+
+    ingest_dataset("daily.csv", "csv", job_id)
+
+    status = client.get(f"/api/tasks/{job_id}", headers=authorized_headers).json()
+    assert status["state"] == "succeeded"
+    assert (status["rows_ingested"], status["coins_updated"]) == (1, 1)
+    frame = get_input_store().frame(["btc"])
+    assert frame.features[0, frame.feature_names.index("volume_24h")] == 4.2e10
+    get_input_store.cache_clear()
+
+    unsupported = client.post(
+        "/api/files/ingest", json={"object_name": "daily.xlsx"}, headers=authorized_headers
+    )
+    assert unsupported.status_code == 415
+
+
+def test_s3_source_reads_objects_in_ranged_chunks():
+    import io
+
+    from backend.app.services.ingestion import S3ObjectSource, read_csv
+
+    body = b"coin,volume_24h\n" + b"".join(f"c{i},{i}\n".encode() for i in range(20_000))
+    ranges = []
+
+    class Bucket:
+        def head_object(self, Bucket, Key):
+            return {"ContentLength": len(body)}
+
+        def get_object(self, Bucket, Key, Range):
+            start, end = (int(part) for part in Range.removeprefix("bytes=").split("-"))
+            ranges.append(end - start + 1)
+            return {"Body": io.BytesIO(body[start : end + 1])}
+
+    source = S3ObjectSource(Bucket(), "tokenlysis", read_bytes=64 * 1024)
+    with source.open("dump.csv") as stream:
+        batches = list(read_csv(stream, batch_rows=5000))
+
+    assert [len(batch.coins) for batch in batches] == [5000] * 4
+    assert batches[-1].values[-1, 0] == 19_999
+    assert len(ranges) > 1 and max(ranges) <= 64 * 1024
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+import pytest
+
+
+class MockCoinGecko:
+    """Local stand-in for ``/coins/markets`` with ETags, failures and a slow mode."""
+
+    def __init__(self) -> None:
+        self.markets = {
+            "bitcoin": {"market_cap": 1.2e12, "total_volume": 3.5e10},
+            "ethereum": {"market_cap": 4.0e11, "total_volume": 1.8e10},
+            "solana": {"market_cap": 8.0e10, "total_volume": 3.0e9},
+        }
+        self.requests: list[dict[str, str]] = []
+        self.failures = 0
+        self.delay = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def handler(self) -> type[BaseHTTPRequestHandler]:
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                with mock.lock:
+                    mock.requests.append(dict(self.headers))
+                    mock.in_flight += 1
+                    mock.max_in_flight = max(mock.max_in_flight, mock.in_flight)
+                    failing = mock.failures > 0
+                    mock.failures -= failing
+                time.sleep(mock.delay)
+                with mock.lock:
+                    mock.in_flight -= 1
+                if failing:
+                    self._reply(503, b"")
+                    return
+                url = urlparse(self.path)
+                ids = parse_qs(url.query)["ids"][0].split(",")
+                rows = [{"id": coin, **mock.markets[coin]} for coin in ids if coin in mock.markets]
+                body = json.dumps(rows).encode()
+                etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self._reply(304, b"", etag)
+                    return
+                self._reply(200, body, etag)
+
+            def _reply(self, status: int, body: bytes, etag: str | None = None) -> None:
+                self.send_response(status)
+                if etag:
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+@pytest.fixture
+def coingecko() -> Iterator[tuple[MockCoinGecko, str]]:
+    mock = MockCoinGecko()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), mock.handler())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield mock, f"http://127.0.0.1:{server.server_address[1]}/api/v3/"
+    server.shutdown()
+    server.server_close()
+
+
+IDS = {"btc": "bitcoin", "eth": "ethereum", "sol": "solana"}
+
+
+def _refresh(url: str, store, **options):
+    from backend.app.services.market_data import MarketDataClient
+
+    async def run():
+        async with httpx.AsyncClient(base_url=url) as http:
+            client = MarketDataClient(http, backoff_seconds=0, **options)
+            first = await client.refresh(store, IDS)
+            second = await client.refresh(store, IDS)
+            return first, second
+
+    return asyncio.run(run())
+
+
+def test_batched_refresh_skips_unchanged_data(coingecko):
+    from backend.app.services.score_inputs import InMemoryInputStore
+
+    mock, url = coingecko
+    store = InMemoryInputStore()
+
+    first, second = _refresh(url, store, batch_size=2)
+
+    assert (first.requests, first.not_modified, first.refreshed) == (2, 0, ["btc", "eth", "sol"])
+    assert (second.requests, second.not_modified, second.refreshed) == (2, 2, [])
+    assert sum("If-None-Match" in headers for headers in mock.requests) == 2
+    assert store.take_dirty() == ["btc", "eth", "sol"]
+    frame = store.frame(["eth"])
+    assert dict(zip(frame.feature_names, frame.features[0])) == {
+        "market_cap": 4.0e11,
+        "volume_24h": 1.8e10,
+    }
+
+
+def test_failures_are_retried_and_hosts_are_limited(coingecko):
+    from backend.app.services.score_inputs import InMemoryInputStore
+
+    mock, url = coingecko
+    mock.failures = 2
+    mock.delay = 0.05
+
+    first, _ = _refresh(url, InMemoryInputStore(), batch_size=1, per_host=2)
+
+    assert first.refreshed == ["btc", "eth", "sol"]
+    assert len(mock.requests) == 3 + 2 + 3
+    assert mock.max_in_flight == 2
+
+
+def test_refresh_actor_marks_coins_for_recalculation(client, coingecko, monkeypatch):
+    from backend.app.core.config import get_settings
+    from backend.app.services.market_data import get_market_data_fetcher
+    from backend.app.services.score_inputs import get_input_store
+    from backend.app.tasks.market_data import refresh_market_data
+    from backend.app.tasks.recalculate import get_coalescer
+
+    mock, url = coingecko
+    mock.markets["bitcoin"]["total_volume"] = 4.4e10
+    monkeypatch.setenv("TOKENLYSIS_MARKET_DATA_URL", url)
+    get_settings.cache_clear()
+    get_market_data_fetcher.cache_clear()
+    get_input_store.cache_clear()
+    try:
+        refresh_market_data(["btc"])
+    finally:
+        get_market_data_fetcher().close()
+        get_market_data_fetcher.cache_clear()
+
+    frame = get_input_store().frame(["btc"])
+    assert frame.features[0, frame.feature_names.index("volume_24h")] == 4.4e10
+    assert get_coalescer().pending("incremental") is not None
+    get_input_store.cache_clear()
@@ -10,3 +10,36 @@ def test_metrics_endpoint(client, authorized_headers):
 def test_metrics_requires_admin(client, limited_headers):
     response = client.get("/metrics", headers=limited_headers)
     assert response.status_code == 403
+
+
+def test_database_time_is_reported_per_request(client, authorized_headers):
+    response = client.get("/api/users", headers=authorized_headers)
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert 'desc="1 queries"' in response.headers["Server-Timing"]
+
+    metrics = client.get("/metrics", headers=authorized_headers)
+    assert b'tokenlysis_db_queries_per_request_count{handler="/api/users"' in metrics.content
+
+
+async def test_repeated_statements_fail_in_detection_mode():
+    import pytest
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    from backend.app.db.instrumentation import (
+        QueryPolicy,
+        RepeatedQueryError,
+        instrument_engine,
+        track_queries,
+    )
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    instrument_engine(engine.sync_engine, QueryPolicy(repeated_query_limit=2))
+    with track_queries() as stats:
+        async with engine.connect() as conn:
+            for value in range(2):
+                await conn.execute(text("select :value"), {"value": value})
+            with pytest.raises(RepeatedQueryError):
+                await conn.execute(text("select :value"), {"value": 3})
+    await engine.dispose()
+    assert stats.count == 3
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from backend.app.services.ranking import Rankings, RankingIndex, UnknownTheme
+from backend.app.services.score_store import ScoreStore, build_snapshot
+
+
+def test_ranking_index_moves_updated_coin():
+    index = RankingIndex()
+    for coin, score in (("btc", 0.9), ("eth", 0.8), ("sol", 0.7)):
+        index.update(coin, score)
+
+    index.update("sol", 0.95)
+
+    assert index.rank("sol").rank == 1
+    assert index.rank("btc").rank == 2
+    items, last = index.page(2)
+    assert [item.coin for item in items] == ["sol", "btc"]
+    assert [item.coin for item in index.page(2, last)[0]] == ["eth"]
+
+
+def test_rankings_follow_store_publications():
+    store = ScoreStore(build_snapshot(1, ["btc", "eth"], [0.9, 0.8], np.zeros((2, 3))))
+    rankings = Rankings(store.snapshot)
+    store.add_listener(rankings.apply)
+
+    store.publish(["btc", "eth", "sol"], [0.5, 0.8, 0.6], [[0.1, 0.0, 0.0]] * 3)
+
+    version, items, _ = rankings.page(10)
+    assert [item.coin for item in items] == ["eth", "sol", "btc"]
+    assert version == rankings.version == 2
+    assert rankings.rank("sol", "liquidity")[1] == 3
+    with pytest.raises(UnknownTheme):
+        rankings.page(10, theme="memes")
+
+
+def test_ranking_endpoint_paginates(client, authorized_headers):
+    first = client.get("/api/ranking", params={"limit": 2}, headers=authorized_headers)
+    assert first.status_code == 200
+    page = first.json()
+    assert [item["coin"] for item in page["items"]] == ["btc", "eth"]
+
+    second = client.get(
+        "/api/ranking",
+        params={"limit": 2, "cursor": page["next_cursor"]},
+        headers=authorized_headers,
+    )
+    assert [item["rank"] for item in second.json()["items"]] == [3]
+    assert second.json()["next_cursor"] is None
+
+
+def test_coin_rank_by_theme(client, authorized_headers):
+    response = client.get(
+        "/api/ranking/eth", params={"theme": "technology"}, headers=authorized_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["rank"] == 1
+
+    missing = client.get("/api/ranking/doge", headers=authorized_headers)
+    assert missing.status_code == 404
+
+    for path in ("/api/ranking", "/api/ranking/eth"):
+        unknown = client.get(path, params={"theme": "memes"}, headers=authorized_headers)
+        assert unknown.status_code == 422
+
+
+def test_ranking_endpoint_answers_not_modified(client, authorized_headers):
+    first = client.get("/api/ranking", params={"limit": 2}, headers=authorized_headers)
+    headers = {**authorized_headers, "If-None-Match": first.headers["ETag"]}
+    again = client.get("/api/ranking", params={"limit": 2}, headers=headers)
+    assert again.status_code == 304
+    other = client.get("/api/ranking", params={"limit": 3}, headers=headers)
+    assert other.status_code == 200
+
+
+def test_ranking_endpoint_serves_msgpack(client, authorized_headers):
+    import msgpack
+
+    params = {"limit": 2}
+    as_json = client.get("/api/ranking", params=params, headers=authorized_headers).json()
+    packed = client.get(
+        "/api/ranking",
+        params=params,
+        headers={**authorized_headers, "Accept": "application/msgpack"},
+    )
+
+    assert packed.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(packed.content) == as_json
+    assert as_json["items"][0] == {"rank": 1, "coin": "btc", "score": 0.91}
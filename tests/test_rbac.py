@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import os
+import shutil
+
+from backend.app.core.rbac import DecisionTable
+
+MODEL = "backend/app/core/rbac_model.conf"
+POLICY = "backend/app/core/rbac_policy.csv"
+
+
+def test_decision_table_includes_inherited_roles(tmp_path):
+    policy = tmp_path / "policy.csv"
+    shutil.copy(POLICY, policy)
+    table = DecisionTable(MODEL, str(policy), check_seconds=3600)
+
+    assert table.allows(["admin"], "users", "write")
+    assert table.allows(["analyst"], "stream", "read")
+    assert not table.allows(["analyst"], "users", "write")
+    assert not table.allows(["unknown"], "stream", "read")
+
+
+def test_decision_table_reloads_changed_policy(tmp_path):
+    policy = tmp_path / "policy.csv"
+    shutil.copy(POLICY, policy)
+    table = DecisionTable(MODEL, str(policy), check_seconds=0)
+    assert not table.allows(["user"], "files", "write")
+
+    policy.write_text(policy.read_text() + "p, user, files, write\n")
+    stat = policy.stat()
+    os.utime(policy, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert table.allows(["user"], "files", "write")
+    assert not table.reload()
@@ -1,16 +1,161 @@
 from __future__ import annotations
 
+from backend.app.services.broadcast import BroadcastHub, Frame, encode_frame
+
+
+def _short_streams():
+    from backend.app.core.config import get_settings
+
+    get_settings().stream_max_seconds = 0.2
+
 
 def test_sse_stream(client, authorized_headers):
+    _short_streams()
     with client.stream("GET", "/api/stream/scores", headers=authorized_headers) as response:
         assert response.status_code == 200
         body = b"".join(response.iter_bytes())
     assert b"event: score" in body
 
 
+def test_sse_stream_pushes_changed_scores_and_resumes(client, authorized_headers):
+    from backend.app.services.broadcast import get_score_broadcaster
+    from backend.app.services.score_store import get_score_store
+
+    _short_streams()
+    get_score_broadcaster()
+    snapshot = get_score_store().snapshot
+    scores = snapshot.scores.copy()
+    scores[2] = 0.99
+    get_score_store().publish(snapshot.coins, scores, snapshot.theme_scores)
+
+    headers = {**authorized_headers, "Last-Event-ID": "0"}
+    with client.stream("GET", "/api/stream/scores", headers=headers) as response:
+        body = b"".join(response.iter_bytes())
+    assert body.count(b"event: score") == 1
+    assert b'"coin":"sol","score":0.99' in body
+
+
 def test_websocket_scores(client) -> None:
     with client.websocket_connect("/ws/scores") as websocket:
         websocket.send_json({"type": "subscribe", "coin": "btc"})
         data = websocket.receive_json()
         assert data["coin"] == "btc"
         assert "score" in data
+
+
+async def test_hub_serializes_once_and_bounds_slow_subscribers():
+    hub = BroadcastHub(history=8, queue_size=2)
+    fast, slow = hub.subscribe(), hub.subscribe()
+
+    frames = hub.publish("score", [("btc", {"score": 1}), ("eth", {"score": 2})])
+    received = [frame async for frame in fast.frames(timeout=0.05)]
+    assert received[0].data is frames[0].data
+    assert [frame.id for frame in received] == [1, 2]
+
+    hub.publish("score", [("btc", {"score": 3}), ("sol", {"score": 4})])
+    pending = [frame async for frame in slow.frames(timeout=0.05)]
+    assert [frame.key for frame in pending] == ["btc", "sol"]
+    assert slow.dropped == 2
+
+
+async def test_hub_replays_history_after_last_event_id():
+    hub = BroadcastHub(history=2)
+    hub.publish("score", [("btc", 1), ("eth", 2), ("sol", 3)])
+
+    resumed = hub.subscribe(last_event_id=2)
+    assert [frame.id async for frame in resumed.frames(timeout=0.01)] == [3]
+
+    snapshot = Frame(0, "snapshot", None, encode_frame(0, "snapshot", {"btc": 1}))
+    too_old = hub.subscribe(last_event_id=0, initial=[snapshot])
+    assert [frame async for frame in too_old.frames(timeout=0.01)] == [snapshot]
+
+
+def test_websocket_pushes_deltas_for_subscribed_topics(client) -> None:
+    from backend.app.services.score_store import get_score_store
+
+    with client.websocket_connect("/ws/scores") as websocket:
+        websocket.send_json({"type": "subscribe", "coins": ["eth"], "themes": ["community"]})
+        initial = [websocket.receive_json() for _ in range(4)]
+        assert {(message["coin"], message.get("theme")) for message in initial} == {
+            ("eth", None),
+            ("btc", "community"),
+            ("eth", "community"),
+            ("sol", "community"),
+        }
+
+        snapshot = get_score_store().snapshot
+        scores, themes = snapshot.scores.copy(), snapshot.theme_scores.copy()
+        scores[0] = 0.5
+        themes[2, 2] = 0.1
+        get_score_store().publish(snapshot.coins, scores, themes)
+        scores[1] = 0.6
+        get_score_store().publish(snapshot.coins, scores, themes)
+
+        pushed = [websocket.receive_json() for _ in range(2)]
+        assert {(message["coin"], message.get("theme")) for message in pushed} == {
+            ("eth", None),
+            ("sol", "community"),
+        }
+
+
+def test_websocket_rejects_unknown_messages(client) -> None:
+    with client.websocket_connect("/ws/scores") as websocket:
+        websocket.send_json({"type": "dance"})
+        assert websocket.receive_json()["type"] == "error"
+        websocket.send_text("not json")
+        assert websocket.receive_json()["detail"] == "Malformed message"
+        for invalid in ({"coins": "btc"}, {"themes": [1]}, {"coin": ["btc"]}):
+            websocket.send_json({"type": "subscribe", **invalid})
+            assert websocket.receive_json()["type"] == "error"
+        websocket.send_json({"type": "subscribe", "coin": "btc"})
+        assert websocket.receive_json()["coin"] == "btc"
+
+
+def test_websocket_msgpack_subprotocol(client) -> None:
+    import msgpack
+
+    with client.websocket_connect("/ws/scores", subprotocols=["msgpack"]) as websocket:
+        assert websocket.accepted_subprotocol == "msgpack"
+        websocket.send_bytes(msgpack.packb({"type": "subscribe", "coin": "btc"}))
+        assert msgpack.unpackb(websocket.receive_bytes()) == {
+            "type": "score",
+            "coin": "btc",
+            "score": 0.91,
+        }
+        websocket.send_json({"type": "subscribe", "themes": ["nope"], "coins": ["eth"]})
+        assert msgpack.unpackb(websocket.receive_bytes())["coin"] == "eth"
+
+
+async def test_backplane_replicates_changed_rows_between_workers():
+    import asyncio
+
+    from backend.app.services.backplane import InProcessBackplane, ScoreReplicator
+    from backend.app.services.score_store import ScoreStore, _seed_snapshot
+
+    backplane = InProcessBackplane()
+    producer, consumer = ScoreStore(_seed_snapshot()), ScoreStore(_seed_snapshot())
+    seed = producer.snapshot
+    producer.publish(seed.coins, seed.scores, seed.theme_scores)  # the producer is ahead
+    local = ScoreReplicator(producer, backplane)
+    producer.add_listener(local)
+    remote = ScoreReplicator(consumer, backplane)
+    consumer.add_listener(remote)
+    versions: list[int] = []
+    consumer.add_listener(lambda previous, snapshot: versions.append(snapshot.version))
+
+    messages = backplane.messages()
+    received = asyncio.ensure_future(messages.__anext__())
+    await asyncio.sleep(0)
+    snapshot = producer.snapshot
+    scores = snapshot.scores.copy()
+    scores[1] = 0.5
+    producer.publish(snapshot.coins, scores, snapshot.theme_scores)
+    payload = await asyncio.wait_for(received, 1)
+    await messages.aclose()
+
+    assert b'"coins":["eth"]' in payload
+    assert not local.apply(payload)
+    assert remote.apply(payload)
+    assert consumer.snapshot.scores.tolist() == scores.tolist()
+    assert versions == [3] and consumer.version == producer.version
+    assert not remote.apply(payload)
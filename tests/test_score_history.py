@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from backend.app.db.base import Base
+from backend.app.models.score import ScoreHistory, ScoreSnapshotRecord
+from backend.app.services.score_history import ScoreHistoryWriter, _next_month
+from backend.app.services.score_store import _seed_snapshot
+
+
+def test_writer_persists_snapshot_rows(tmp_path):
+    import asyncio
+
+    url = f"sqlite+aiosqlite:///{tmp_path / 'history.db'}"
+
+    async def create_schema() -> None:
+        engine = create_async_engine(url)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        await engine.dispose()
+
+    asyncio.run(create_schema())
+    writer = ScoreHistoryWriter(lambda: create_async_engine(url))
+    recorded_at = datetime(2026, 10, 16, 12, 5, tzinfo=timezone.utc)
+    try:
+        writer.submit(_seed_snapshot(), recorded_at).result(timeout=5)
+
+        async def read():
+            engine = create_async_engine(url)
+            async with engine.connect() as conn:
+                snapshots = (await conn.execute(select(ScoreSnapshotRecord))).all()
+                rows = (await conn.execute(select(ScoreHistory).order_by(ScoreHistory.coin))).all()
+            await engine.dispose()
+            return snapshots, rows
+
+        snapshots, rows = asyncio.run(read())
+    finally:
+        writer.close()
+
+    assert [(row.version, row.coins) for row in snapshots] == [(1, 3)]
+    assert [row.coin for row in rows] == ["btc", "eth", "sol"]
+    assert rows[1].theme_scores["technology"] == 0.93
+
+
+def test_writer_commits_in_order_and_prunes_fine_rollups(tmp_path):
+    import asyncio
+    from datetime import timedelta
+
+    from backend.app.models.score import ScoreRollup
+    from backend.app.services.score_store import build_snapshot
+
+    url = f"sqlite+aiosqlite:///{tmp_path / 'history.db'}"
+
+    async def create_schema() -> None:
+        engine = create_async_engine(url)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        await engine.dispose()
+
+    asyncio.run(create_schema())
+    writer = ScoreHistoryWriter(
+        lambda: create_async_engine(url), max_pending=1, fine_retention=timedelta(days=1)
+    )
+    start = datetime(2026, 10, 14, 12, 0, tzinfo=timezone.utc)
+    try:
+        futures = [
+            writer.submit(build_snapshot(version, ["btc"], [score], [[score] * 3]), moment)
+            for version, (score, moment) in enumerate(
+                [
+                    (0.1, start),
+                    (0.2, start + timedelta(minutes=1)),
+                    (0.3, start + timedelta(minutes=2)),
+                    (0.4, start + timedelta(days=2)),
+                ]
+            )
+        ]
+        for future in futures:
+            future.result(timeout=5)
+
+        async def read():
+            engine = create_async_engine(url)
+            async with engine.connect() as conn:
+                order = (ScoreRollup.resolution, ScoreRollup.bucket_start)
+                rows = (await conn.execute(select(ScoreRollup).order_by(*order))).all()
+            await engine.dispose()
+            return rows
+
+        rows = asyncio.run(read())
+    finally:
+        writer.close()
+
+    hourly = [row for row in rows if row.resolution == "1h"]
+    assert [(row.close, row.samples) for row in hourly] == [(0.3, 3), (0.4, 1)]
+    assert [row.close for row in rows if row.resolution == "5m"] == [0.4]
+
+
+def test_partitions_roll_over_at_year_end():
+    december = datetime(2026, 12, 1, tzinfo=timezone.utc)
+    assert _next_month(december) == datetime(2027, 1, 1, tzinfo=timezone.utc)
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    import numpy as np
+
+    from backend.app.services.score_history import lttb
+
+    x = np.arange(100, dtype=float)
+    y = np.zeros(100)
+    y[40] = 5.0
+    selected = lttb(x, y, 10)
+    assert len(selected) == 10
+    assert selected[0] == 0 and selected[-1] == 99
+    assert 40 in selected
+
+
+def test_history_endpoint_serves_incremental_rollups(client, authorized_headers, monkeypatch):
+    import asyncio
+
+    import numpy as np
+
+    from backend.app.core.config import get_settings
+    from backend.app.services.score_history import write_snapshot
+    from backend.app.services.score_store import build_snapshot
+
+    monkeypatch.setattr(get_settings(), "history_fine_retention_days", 36500)
+    start = datetime(2026, 10, 16, 12, 0, tzinfo=timezone.utc)
+    seed = _seed_snapshot()
+
+    async def write() -> None:
+        engine = create_async_engine(get_settings().database_url)
+        async with engine.begin() as conn:
+            for step, score in enumerate([0.5, 0.9, 0.3, 0.6]):
+                scores = seed.scores.copy()
+                scores[0] = score
+                snapshot = build_snapshot(step + 2, seed.coins, scores, seed.theme_scores)
+                recorded_at = start.replace(minute=step * 15)
+                await write_snapshot(conn, snapshot, recorded_at)
+                await write_snapshot(conn, snapshot, recorded_at)  # a retried write
+            delisted = build_snapshot(6, ["luna"], [0.2], [[0.2, 0.2, 0.2]])
+            await write_snapshot(conn, delisted, start)
+        await engine.dispose()
+
+    asyncio.run(write())
+    params = {"start": "2026-10-16T12:00:00Z", "end": "2026-10-16T13:00:00Z", "resolution": "1h"}
+    response = client.get("/api/scores/btc/history", params=params, headers=authorized_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["resolution"] == "1h"
+    assert [(p["open"], p["high"], p["low"], p["close"]) for p in body["points"]] == [
+        (0.5, 0.9, 0.3, 0.6)
+    ]
+
+    auto = client.get(
+        "/api/scores/btc/history",
+        params={"start": params["start"], "end": params["end"], "max_points": 3},
+        headers=authorized_headers,
+    )
+    assert auto.json()["resolution"] == "5m"
+    assert len(auto.json()["points"]) == 3
+    assert np.isclose(auto.json()["points"][0]["close"], 0.5)
+
+    delisted = client.get("/api/scores/luna/history", params=params, headers=authorized_headers)
+    assert delisted.status_code == 200 and delisted.json()["points"][0]["close"] == 0.2
+
+    missing = client.get("/api/scores/doge/history", headers=authorized_headers)
+    assert missing.status_code == 404
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pytest
+
+from backend.app.services.score_store import ScoreStore, build_snapshot
+
+
+@pytest.fixture
+def store() -> ScoreStore:
+    return ScoreStore(
+        build_snapshot(1, ["btc", "eth"], [0.9, 0.8], [[0.9, 0.9, 0.9], [0.8, 0.8, 0.8]])
+    )
+
+
+def test_publish_swaps_snapshot_atomically(store):
+    previous = store.snapshot
+    snapshot = store.publish(["btc", "eth", "sol"], [0.7, 0.95, 0.5], np.zeros((3, 3)))
+
+    assert store.snapshot is snapshot
+    assert snapshot.version == previous.version + 1
+    assert previous.coins.tolist() == ["btc", "eth"]
+    assert snapshot.positions["sol"] == 2
+    assert not snapshot.scores.flags.writeable
+
+
+def test_render_is_cached_per_theme(store):
+    snapshot = store.snapshot
+    body = snapshot.render("technology")
+
+    assert snapshot.render("technology") is body
+    assert json.loads(body) == [{"coin": "btc", "score": 0.9}, {"coin": "eth", "score": 0.8}]
+
+
+def test_build_snapshot_rejects_ragged_columns():
+    with pytest.raises(ValueError):
+        build_snapshot(1, ["btc", "eth"], [0.9], [[0.9, 0.9, 0.9], [0.8, 0.8, 0.8]])
@@ -7,3 +7,132 @@ def test_scores_endpoint(client, authorized_headers):
     data = response.json()
     assert isinstance(data, list)
     assert data[0]["coin"] == "btc"
+
+
+def test_scores_endpoint_filters_by_theme(client, authorized_headers):
+    response = client.get("/api/scores", params={"theme": "technology"}, headers=authorized_headers)
+    assert response.status_code == 200
+    assert {row["coin"]: row["score"] for row in response.json()}["eth"] == 0.93
+
+    unknown = client.get("/api/scores", params={"theme": "unknown"}, headers=authorized_headers)
+    assert unknown.status_code == 422
+
+
+def test_scores_endpoint_revalidates_with_etag(client, authorized_headers):
+    from backend.app.services.score_store import get_score_store
+
+    first = client.get("/api/scores", headers=authorized_headers)
+    etag = first.headers["ETag"]
+    cached = client.get("/api/scores", headers={**authorized_headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    snapshot = get_score_store().snapshot
+    scores = snapshot.scores.copy()
+    scores[0] = 0.5
+    get_score_store().publish(snapshot.coins, scores, snapshot.theme_scores)
+    fresh = client.get("/api/scores", headers={**authorized_headers, "If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["ETag"] != etag
+    assert fresh.json()[0]["score"] == 0.5
+
+
+def test_cached_bodies_are_precompressed():
+    import gzip
+
+    import brotli
+
+    from backend.app.services.response_cache import ResponseCache
+
+    cache = ResponseCache()
+    body = b'[{"coin":"btc","score":0.9}]' * 100
+    entry = cache.get_or_render(("scores", 1, None), lambda: body)
+    assert cache.get_or_render(("scores", 1, None), lambda: b"unused") is entry
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert gzip.decompress(entry.encoded["gzip"]) == body
+    assert brotli.decompress(entry.encoded["br"]) == body
+    assert entry.matches(entry.etag_for("gzip"), "gzip")
+    assert not entry.matches(entry.etag_for("gzip"))
+    assert not entry.matches('"other"')
+
+
+def test_content_coding_negotiation():
+    from backend.app.api.caching import _negotiate_encoding
+
+    available = {"br": b"", "gzip": b""}
+    assert _negotiate_encoding("", available) == "identity"
+    assert _negotiate_encoding("gzip, br", available) == "br"
+    assert _negotiate_encoding("br;q=0.5, gzip", available) == "gzip"
+    assert _negotiate_encoding("*", available) == "br"
+    assert _negotiate_encoding("*;q=0, identity", available) == "identity"
+    assert _negotiate_encoding("gzip;q=0.2, identity;q=0.8", available) == "identity"
+    assert _negotiate_encoding("identity;q=0", {}) is None
+    assert _negotiate_encoding("deflate, identity;q=0", available) is None
+
+
+def test_not_modified_keeps_the_negotiated_etag(client, authorized_headers):
+    from backend.app.services.score_store import get_score_store
+
+    coins = [f"coin-{index}" for index in range(50)]
+    get_score_store().publish(coins, [0.5] * 50, [[0.5] * 3] * 50)
+    headers = {**authorized_headers, "Accept-Encoding": "gzip"}
+    first = client.get("/api/scores", headers=headers)
+    assert first.headers["Content-Encoding"] == "gzip"
+    etag = first.headers["ETag"]
+    assert etag.endswith('-gzip"')
+
+    again = client.get("/api/scores", headers={**headers, "If-None-Match": etag})
+    assert again.status_code == 304 and again.headers["ETag"] == etag
+    identity = {**authorized_headers, "Accept-Encoding": "identity", "If-None-Match": etag}
+    plain = client.get("/api/scores", headers=identity)
+    assert plain.status_code == 200 and "Content-Encoding" not in plain.headers
+
+
+async def test_single_flight_shares_one_computation():
+    import asyncio
+
+    from backend.app.services.singleflight import SingleFlight
+
+    flight = SingleFlight("test")
+    calls = 0
+
+    async def compute() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return 42
+
+    results = await asyncio.gather(*(flight.do("key", compute) for _ in range(5)))
+    assert results == [42] * 5
+    assert calls == 1
+    assert (flight.executed, flight.coalesced) == (1, 4)
+    assert len(flight) == 0
+    assert await flight.do("key", compute) == 42
+    assert calls == 2
+
+
+def test_scores_endpoint_negotiates_msgpack(client, authorized_headers):
+    import msgpack
+
+    as_json = client.get("/api/scores", headers=authorized_headers)
+    packed = client.get(
+        "/api/scores",
+        headers={**authorized_headers, "Accept": "application/msgpack, application/json;q=0.9"},
+    )
+
+    assert packed.headers["content-type"] == "application/msgpack"
+    assert packed.headers["Vary"] == "Accept, Accept-Encoding"
+    assert msgpack.unpackb(packed.content) == as_json.json()
+    assert packed.headers["ETag"] != as_json.headers["ETag"]
+
+
+def test_accept_header_negotiation():
+    from backend.app.core.serialization import negotiate
+
+    assert negotiate(None) == "json"
+    assert negotiate("*/*") == "json"
+    assert negotiate("application/msgpack, */*") == "msgpack"
+    assert negotiate("application/x-msgpack") == "msgpack"
+    assert negotiate("application/json, application/msgpack") == "json"
+    assert negotiate("application/msgpack;q=0.5, application/json") == "json"
+    assert negotiate("application/msgpack;q=0") == "json"
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import numpy as np
+
+from backend.app.services.scoring import (
+    FeatureFrame,
+    ScoreComponent,
+    ScoringEngine,
+    get_components,
+)
+
+
+def _frame(rows: int, features: int) -> FeatureFrame:
+    rng = np.random.default_rng(7)
+    names = ("market_cap", "volume_24h") + tuple(f"dev_metric_{i}" for i in range(features))
+    matrix = rng.lognormal(mean=10.0, sigma=2.0, size=(rows, len(names)))
+    matrix[rng.random(matrix.shape) < 0.05] = np.nan
+    coins = np.array([f"coin-{i}" for i in range(rows)], dtype=np.str_)
+    return FeatureFrame(coins, matrix, names)
+
+
+def test_engine_scores_whole_universe():
+    frame = _frame(rows=2_000, features=50)
+
+    result = ScoringEngine().score(frame)
+
+    assert result.themes == ("liquidity", "technology", "community")
+    assert result.theme_scores.shape == (2_000, 3)
+    assert np.all((result.scores > 0) & (result.scores < 1))
+    # No social_* features: the community theme is neutral for every coin.
+    assert np.allclose(result.theme_scores[:, 2], 0.5)
+
+
+def test_custom_components_are_weighted():
+    frame = _frame(rows=10, features=1)
+    volume = ScoreComponent("volume", 3.0, lambda f: f.select(["volume_24h"]))
+    inverse = ScoreComponent("inverse", 1.0, lambda f: -f.select(["volume_24h"]))
+
+    result = ScoringEngine([volume, inverse]).score(frame)
+
+    expected = result.theme_scores @ np.array([0.75, 0.25])
+    assert np.allclose(result.scores, expected)
+    assert [component.name for component in get_components()][:1] == ["liquidity"]
+
+
+def test_recalculate_scores_publishes_snapshot():
+    from backend.app.services.score_store import get_score_store
+    from backend.app.tasks.recalculate import recalculate_scores, reset_state
+
+    get_score_store.cache_clear()
+    reset_state()
+    recalculate_scores()
+
+    snapshot = get_score_store().snapshot
+    assert snapshot.version == 2
+    assert set(snapshot.coins.tolist()) == {"btc", "eth", "sol"}
+    get_score_store.cache_clear()
+    reset_state()
+
+
+def test_incremental_update_matches_full_moments():
+    frame = _frame(rows=200, features=5)
+    features = frame.features.copy()
+    features[3] *= 10
+    changed = FeatureFrame(frame.coins, features, frame.feature_names)
+    reference = ScoringEngine().full(changed)
+
+    tolerant = ScoringEngine(drift_tolerance=np.inf)
+    state = tolerant.full(frame)
+    before, original_stats = state.scores.copy(), state.stats
+    state = tolerant.update(state, changed.rows(np.array([3])))
+
+    for incremental, full in zip(state.stats, reference.stats):
+        assert np.allclose(incremental.total, full.total)
+        assert np.array_equal(incremental.count, full.count)
+    untouched = np.arange(200) != 3
+    assert np.array_equal(state.scores[untouched], before[untouched])
+    rescored = tolerant.combine([raw[[3]] for raw in reference.raws], original_stats)
+    np.testing.assert_allclose(state.theme_scores[3], rescored[0])
+
+    strict = ScoringEngine(drift_tolerance=0.0)
+    state = strict.update(strict.full(frame), changed.rows(np.array([3])))
+    np.testing.assert_allclose(state.scores, reference.scores)
+
+
+def test_incremental_recalculation_processes_dirty_coins_only(monkeypatch):
+    from backend.app.core.config import get_settings
+    from backend.app.services.score_inputs import get_input_store
+    from backend.app.services.score_store import get_score_store
+    from backend.app.tasks.recalculate import recalculate_scores, reset_state
+
+    monkeypatch.setenv("TOKENLYSIS_RECALC_DRIFT_TOLERANCE", "1e9")
+    get_settings.cache_clear()
+    get_score_store.cache_clear()
+    get_input_store.cache_clear()
+    reset_state()
+    recalculate_scores("full")
+    baseline = get_score_store().snapshot
+
+    get_input_store().upsert("sol", {"volume_24h": 9.0e10})
+    get_input_store().upsert("btc", {"volume_24h": 3.5e10})
+    recalculate_scores("incremental")
+
+    snapshot = get_score_store().snapshot
+    changed = baseline.coins[baseline.scores != snapshot.scores].tolist()
+    assert changed == ["sol"]
+    assert get_input_store().take_dirty() == []
+
+    get_settings.cache_clear()
+    get_score_store.cache_clear()
+    get_input_store.cache_clear()
+    reset_state()
+
+
+def test_state_is_rebuilt_after_another_worker_claims_changes(monkeypatch):
+    from backend.app.core.config import get_settings
+    from backend.app.services.score_inputs import get_input_store
+    from backend.app.services.score_store import get_score_store
+    from backend.app.tasks.recalculate import recalculate_scores, reset_state
+
+    monkeypatch.setenv("TOKENLYSIS_RECALC_DRIFT_TOLERANCE", "1e9")
+    get_settings.cache_clear()
+    get_score_store.cache_clear()
+    get_input_store.cache_clear()
+    reset_state()
+    inputs = get_input_store()
+    recalculate_scores("full")
+
+    inputs.upsert("sol", {"volume_24h": 9.0e10})
+    assert inputs.claim_dirty()[0] == ["sol"]  # claimed by another worker
+    inputs.upsert("btc", {"volume_24h": 3.5e10})
+    recalculate_scores("incremental")
+
+    expected = ScoringEngine().score(inputs.frame())
+    np.testing.assert_allclose(get_score_store().snapshot.scores, expected.scores)
+
+    get_settings.cache_clear()
+    get_score_store.cache_clear()
+    get_input_store.cache_clear()
+    reset_state()
+
+
+def test_sharded_recalculation_matches_single_pass():
+    import dramatiq
+
+    from backend.app.core.config import get_settings
+    from backend.app.services.score_inputs import get_input_store
+    from backend.app.services.score_store import get_score_store
+    from backend.app.tasks import broker
+    from backend.app.tasks.recalculate import recalculate_scores, reset_state
+
+    frame = _frame(rows=500, features=8)
+    get_input_store.cache_clear()
+    get_score_store.cache_clear()
+    get_settings.cache_clear()
+    reset_state()
+    get_input_store().upsert_many(frame.coins.tolist(), frame.feature_names, frame.features)
+    get_settings().recalc_shard_size = 120
+
+    broker.emit_after("process_boot")
+    worker = dramatiq.Worker(broker, worker_timeout=50)
+    worker.start()
+    try:
+        recalculate_scores("full")
+        broker.join(recalculate_scores.queue_name)
+        worker.join()
+    finally:
+        worker.stop()
+
+    snapshot = get_score_store().snapshot
+    expected = ScoringEngine().score(get_input_store().frame())
+    assert snapshot.coins.tolist() == expected.coins.tolist()
+    assert np.allclose(snapshot.scores, expected.scores)
+
+    get_input_store.cache_clear()
+    get_score_store.cache_clear()
+    get_settings.cache_clear()
+    reset_state()
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import json
+import time
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from backend.app.core.security import JwksCache, TokenVerifier, VerifiedTokenCache
+
+ISSUER = "https://auth.localhost/realms/tokenlysis"
+AUDIENCE = "tokenlysis-api"
+
+
+@pytest.fixture
+def key_server():
+    """Local stand-in for the identity provider's JWKS endpoint."""
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwks = {"keys": [{**jwk, "kid": "key-1", "use": "sig", "alg": "RS256"}]}
+    fetches: list[float] = []
+
+    def fetch():
+        fetches.append(time.monotonic())
+        return jwks
+
+    def sign(kid: str = "key-1", expires_in: int = 300, **claims) -> str:
+        payload = {
+            "sub": "user-1",
+            "iss": ISSUER,
+            "aud": AUDIENCE,
+            "exp": int(time.time()) + expires_in,
+            "roles": ["admin"],
+            **claims,
+        }
+        return jwt.encode(payload, private_key, algorithm="RS256", headers={"kid": kid})
+
+    return fetch, fetches, sign
+
+
+def test_verifier_caches_verified_tokens(key_server):
+    fetch, fetches, sign = key_server
+    verifier = TokenVerifier(ISSUER, AUDIENCE, JwksCache(fetch), ["RS256"])
+    token = sign()
+
+    assert verifier.verify(token)["roles"] == ["admin"]
+    assert verifier.cache.get(token) is not None
+    assert verifier.verify(token)["sub"] == "user-1"
+    assert len(fetches) == 1
+
+    with pytest.raises(jwt.InvalidAudienceError):
+        verifier.verify(sign(aud="someone-else"))
+
+
+def test_unknown_kid_refetches_at_most_once_per_interval(key_server):
+    fetch, fetches, sign = key_server
+    keys = JwksCache(fetch, min_refetch_seconds=60)
+    verifier = TokenVerifier(ISSUER, AUDIENCE, keys, ["RS256"])
+    verifier.verify(sign())
+
+    for _ in range(3):
+        with pytest.raises(jwt.InvalidTokenError):
+            verifier.verify(sign(kid="forged"))
+    assert len(fetches) == 1
+
+
+def test_token_cache_evicts_at_expiry():
+    cache = VerifiedTokenCache(max_entries=2)
+    cache.put("expired", {"exp": time.time() - 1})
+    cache.put("a", {"exp": time.time() + 60})
+    cache.put("b", {"exp": time.time() + 60})
+
+    assert cache.get("expired") is None
+    assert cache.get("a") is not None
+    assert len(cache) == 2
+
+
+def test_prefetch_loads_keys_and_concurrent_misses_share_one_fetch(key_server):
+    import threading
+
+    fetch, fetches, sign = key_server
+    release = threading.Event()
+
+    def slow_fetch():
+        release.wait(1)
+        return fetch()
+
+    def unreachable():
+        raise OSError("unreachable")
+
+    assert not JwksCache(unreachable).prefetch()
+
+    keys = JwksCache(slow_fetch, min_refetch_seconds=60)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(keys.get("key-1"))) for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(fetches) == 1
+    assert all(key is not None for key in results)
+    assert JwksCache(fetch).prefetch() and len(fetches) == 2
+
+
+def test_test_tokens_are_rejected_unless_enabled(monkeypatch):
+    from fastapi import HTTPException
+
+    from backend.app.core.config import get_settings
+    from backend.app.core.security import cached_user, decode_token, get_token_verifier
+
+    monkeypatch.setattr(get_settings(), "auth_test_tokens", False)
+    get_token_verifier.cache_clear()
+    try:
+        assert cached_user("test-token-with-admin") is None
+        with pytest.raises(HTTPException) as excinfo:
+            decode_token("test-token-with-admin")
+        assert excinfo.value.status_code == 401
+    finally:
+        get_token_verifier.cache_clear()
+
+
+def test_cached_claims_resolve_without_verification():
+    from backend.app.core.security import cached_user, get_token_verifier
+
+    get_token_verifier.cache_clear()
+    try:
+        claims = {"sub": "user-1", "exp": time.time() + 60, "realm_access": {"roles": ["admin"]}}
+        get_token_verifier().cache.put("opaque-token", claims)
+        user = cached_user("opaque-token")
+        assert user is not None and user.roles == ["admin"]
+        assert cached_user("unknown-token") is None
+    finally:
+        get_token_verifier.cache_clear()
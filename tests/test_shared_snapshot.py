@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _snapshot(version: int = 7):
+    from backend.app.services.score_store import build_snapshot
+
+    return build_snapshot(
+        version,
+        ["btc", "eth", "dogecoin"],
+        [0.9, 0.8, 0.1],
+        [[0.9, 0.8, 0.7], [0.6, 0.5, 0.4], [0.3, 0.2, 0.1]],
+        updated_at=[1, 2, 3],
+    )
+
+
+def test_snapshot_round_trips_through_a_read_only_mapping(tmp_path):
+    from backend.app.services.shared_snapshot import encode_snapshot, map_snapshot
+
+    snapshot = _snapshot()
+    path = tmp_path / "scores.bin"
+    path.write_bytes(b"".join(bytes(part) for part in encode_snapshot(snapshot)))
+
+    mapped = map_snapshot(path)
+
+    assert mapped.version == 7 and mapped.themes == snapshot.themes
+    assert mapped.coins.tolist() == ["btc", "eth", "dogecoin"]
+    np.testing.assert_array_equal(mapped.theme_scores, snapshot.theme_scores)
+    np.testing.assert_array_equal(mapped.updated_at, [1, 2, 3])
+    assert mapped.render() == snapshot.render()
+    assert not mapped.scores.flags.writeable
+    assert isinstance(mapped.scores.base, np.memmap)
+    with pytest.raises(ValueError):
+        mapped.scores[0] = 1.0
+
+    path.write_bytes(b"x" * 64)
+    with pytest.raises(ValueError):
+        map_snapshot(path)
+
+
+def test_workers_switch_to_the_latest_mapped_snapshot(tmp_path):
+    from backend.app.services.score_store import ScoreStore
+    from backend.app.services.shared_snapshot import MappedSnapshotReplicator
+
+    writer_store, reader_store = ScoreStore(_snapshot(1)), ScoreStore(_snapshot(1))
+    writer = MappedSnapshotReplicator(writer_store, tmp_path, keep=2)
+    reader = MappedSnapshotReplicator(reader_store, tmp_path)
+    writer_store.add_listener(writer)
+    reader_store.add_listener(reader)
+    seen = []
+    reader_store.add_listener(lambda previous, snapshot: seen.append(snapshot.version))
+
+    assert not reader.poll()
+    old = writer_store.publish(["btc"], [0.5], [[0.5, 0.5, 0.5]])
+    assert reader.poll() and not reader.poll()
+    held = reader_store.snapshot
+    assert held.version == old.version and held.coins.tolist() == ["btc"]
+
+    for score in (0.6, 0.7, 0.8):
+        writer_store.publish(["btc", "eth"], [score, 0.1], [[score] * 3, [0.1] * 3])
+    assert reader.poll()
+
+    assert seen == [2, 5]
+    assert reader_store.snapshot.scores.tolist() == [0.8, 0.1]
+    assert held.scores.tolist() == [0.5]
+    assert len(list(tmp_path.glob("scores-*.bin"))) == 2
+    assert not writer.poll()
+
+    lagging = MappedSnapshotReplicator(ScoreStore(_snapshot(1)), tmp_path)
+    assert lagging.write(_snapshot(3)) is None
+    assert (tmp_path / "CURRENT").read_text().startswith("scores-000000000005-")
+    assert not reader.poll()
+    assert reader_store.version == 5 and seen == [2, 5]
+    assert len(list(tmp_path.glob("scores-*"))) == 2
+
+
+def test_workers_allocate_distinct_versions(tmp_path):
+    from backend.app.services.score_store import ScoreStore
+    from backend.app.services.shared_snapshot import MappedSnapshotReplicator
+
+    workers = []
+    for _ in range(2):
+        store = ScoreStore(_snapshot(1))
+        replicator = MappedSnapshotReplicator(store, tmp_path)
+        store.add_listener(replicator)
+        store.set_version_source(replicator.next_version)
+        workers.append(store)
+    reader_store = ScoreStore(_snapshot(1))
+    reader = MappedSnapshotReplicator(reader_store, tmp_path)
+
+    versions = []
+    for store in (*workers, *workers):
+        versions.append(store.publish(["btc"], [0.5], [[0.5] * 3]).version)
+        assert reader.poll()
+    assert versions == [2, 3, 4, 5]
+    assert reader_store.version == 5
+
+
+def test_mapped_snapshots_are_installed_off_the_event_loop(tmp_path):
+    import asyncio
+    import threading
+
+    from backend.app.services.score_store import ScoreStore
+    from backend.app.services.shared_snapshot import MappedSnapshotReplicator
+
+    MappedSnapshotReplicator(ScoreStore(_snapshot(1)), tmp_path).write(_snapshot(4))
+    store = ScoreStore(_snapshot(1))
+    threads = []
+    store.add_listener(lambda previous, snapshot: threads.append(threading.get_ident()))
+    replicator = MappedSnapshotReplicator(store, tmp_path, poll_seconds=0.001)
+
+    async def follow() -> int:
+        task = asyncio.create_task(replicator.run())
+        while store.version != 4:
+            await asyncio.sleep(0.001)
+        task.cancel()
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(asyncio.wait_for(follow(), 5))
+    assert len(threads) == 1 and threads[0] != loop_thread
+
+
+def test_snapshot_is_mapped_by_another_process(tmp_path):
+    from backend.app.services.score_store import ScoreStore
+    from backend.app.services.shared_snapshot import MappedSnapshotReplicator
+
+    store = ScoreStore(_snapshot(1))
+    store.add_listener(MappedSnapshotReplicator(store, tmp_path))
+    store.publish(["btc", "sol"], [0.4, 0.3], [[0.4] * 3, [0.3] * 3])
+
+    script = (
+        "import json, sys\n"
+        "from backend.app.services.score_store import ScoreStore, _seed_snapshot\n"
+        "from backend.app.services.shared_snapshot import MappedSnapshotReplicator\n"
+        "store = ScoreStore(_seed_snapshot())\n"
+        "MappedSnapshotReplicator(store, sys.argv[1]).poll()\n"
+        "print(json.dumps([store.version, store.snapshot.coins.tolist()]))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script, str(tmp_path)],
+        cwd=ROOT,
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    assert json.loads(result.stdout) == [2, ["btc", "sol"]]
+
+
+def test_recalculation_publishes_through_the_mapped_transport(tmp_path, monkeypatch):
+    from backend.app.core.config import get_settings
+    from backend.app.services.score_store import get_score_store
+    from backend.app.services.shared_snapshot import get_mapped_replicator
+    from backend.app.tasks import broker
+    from backend.app.tasks.recalculate import recalculate_scores, reset_state
+
+    monkeypatch.setenv("TOKENLYSIS_SCORE_TRANSPORT", "mmap")
+    monkeypatch.setenv("TOKENLYSIS_SCORE_SNAPSHOT_DIR", str(tmp_path))
+    get_settings.cache_clear()
+    get_score_store.cache_clear()
+    get_mapped_replicator.cache_clear()
+    reset_state()
+    try:
+        broker.emit_after("process_boot")
+        assert get_mapped_replicator.cache_info().currsize == 1
+        recalculate_scores("full")
+        pointer = (tmp_path / "CURRENT").read_text()
+        assert pointer.startswith(f"scores-{get_score_store().version:012d}-")
+    finally:
+        get_settings.cache_clear()
+        get_score_store.cache_clear()
+        get_mapped_replicator.cache_clear()
+        reset_state()
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import pytest
+
 
 def test_schedule_recalculation(client, authorized_headers):
     response = client.post("/api/tasks/recalculate", headers=authorized_headers)
@@ -11,3 +13,150 @@ def test_schedule_recalculation(client, authorized_headers):
 def test_schedule_recalculation_requires_admin(client, limited_headers):
     response = client.post("/api/tasks/recalculate", headers=limited_headers)
     assert response.status_code == 403
+
+
+def test_schedule_full_recalculation(client, authorized_headers):
+    response = client.post(
+        "/api/tasks/recalculate", json={"mode": "full"}, headers=authorized_headers
+    )
+    assert response.status_code == 202
+    assert response.json()["mode"] == "full"
+
+
+def test_burst_of_triggers_is_coalesced(client, authorized_headers):
+    from backend.app.tasks import broker
+
+    responses = [
+        client.post("/api/tasks/recalculate", headers=authorized_headers).json()
+        for _ in range(5)
+    ]
+
+    assert len({response["job_id"] for response in responses}) == 1
+    assert [response["coalesced"] for response in responses] == [False, True, True, True, True]
+    assert broker.queues["default.DQ"].qsize() == 1
+
+
+def test_pending_full_job_absorbs_incremental_triggers(client, authorized_headers):
+    full = client.post(
+        "/api/tasks/recalculate", json={"mode": "full"}, headers=authorized_headers
+    ).json()
+    incremental = client.post(
+        "/api/tasks/recalculate", json={"coins": ["btc"]}, headers=authorized_headers
+    ).json()
+
+    assert incremental["job_id"] == full["job_id"]
+    assert incremental["mode"] == "full"
+
+
+def test_coalescer_allows_one_pending_and_one_running():
+    from backend.app.tasks.coalescing import RecalculationCoalescer, ScopeBusy
+    from backend.app.tasks.jobs import InMemoryJobStore
+
+    sent = []
+    coalescer = RecalculationCoalescer(
+        lambda job, scope, delay: sent.append(job), 0, InMemoryJobStore()
+    )
+    first = coalescer.request("incremental", ["btc"])
+    assert coalescer.start("incremental", first.job_id) == ["btc"]
+
+    second = coalescer.request("incremental", ["eth"])
+    assert not second.coalesced
+    assert coalescer.request("incremental").job_id == second.job_id
+    with pytest.raises(ScopeBusy):
+        coalescer.start("incremental", second.job_id)
+
+    coalescer.finish("incremental", first.job_id)
+    assert coalescer.start("incremental", second.job_id) == ["eth"]
+    assert sent == [first.job_id, second.job_id]
+
+
+def test_coalescer_state_is_shared_and_expires():
+    import time
+
+    from backend.app.tasks.coalescing import RecalculationCoalescer, ScopeBusy
+    from backend.app.tasks.jobs import InMemoryJobStore
+
+    jobs = InMemoryJobStore()
+    api = RecalculationCoalescer(lambda job, scope, delay: None, 0, jobs, lease_seconds=0.05)
+    worker = RecalculationCoalescer(lambda job, scope, delay: None, 0, jobs, lease_seconds=0.05)
+
+    first = api.request("full")
+    assert worker.start("full", first.job_id) == []
+    assert api.pending("full") is None
+    second = api.request("full")
+    assert not second.coalesced
+    with pytest.raises(ScopeBusy):
+        worker.start("full", second.job_id)
+
+    time.sleep(0.06)  # the first job never finished; its lease runs out
+    assert worker.start("full", second.job_id) == []
+    assert api.request("incremental").job_id != second.job_id
+
+
+def test_job_status_and_progress_events(client, authorized_headers):
+    from backend.app.tasks.recalculate import recalculate_scores
+
+    job = client.post(
+        "/api/tasks/recalculate", json={"mode": "full"}, headers=authorized_headers
+    ).json()
+    pending = client.get(f"/api/tasks/{job['job_id']}", headers=authorized_headers)
+    assert pending.status_code == 200
+    assert pending.json()["state"] == "pending"
+
+    recalculate_scores("full", None, job["job_id"])
+
+    status = client.get(f"/api/tasks/{job['job_id']}", headers=authorized_headers).json()
+    assert status["state"] == "succeeded"
+    assert status["duration_ms"] is not None
+    with client.stream(
+        "GET", f"/api/tasks/{job['job_id']}/events", headers=authorized_headers
+    ) as response:
+        body = b"".join(response.iter_bytes())
+    assert b"event: started" in body
+    assert b"event: succeeded" in body
+
+
+def test_unknown_job_is_404(client, authorized_headers):
+    response = client.get("/api/tasks/missing", headers=authorized_headers)
+    assert response.status_code == 404
+
+
+def test_schedule_market_data_refresh(client, authorized_headers, limited_headers):
+    from backend.app.tasks import broker
+
+    response = client.post(
+        "/api/tasks/market-data", json={"coins": ["btc"]}, headers=authorized_headers
+    )
+    assert response.status_code == 202
+    assert broker.queues["default"].qsize() == 1
+    assert client.post("/api/tasks/market-data", headers=limited_headers).status_code == 403
+
+
+def test_failed_shard_fails_the_job_and_releases_the_scope(client, monkeypatch):
+    import dramatiq
+
+    from backend.app.core.config import get_settings
+    from backend.app.tasks import broker, recalculate
+    from backend.app.tasks.jobs import get_job_store
+
+    def broken(frame):
+        raise RuntimeError("extractor crashed")
+
+    monkeypatch.setattr(get_settings(), "recalc_shard_size", 1)
+    monkeypatch.setattr(recalculate, "_extract", broken)
+    monkeypatch.setitem(recalculate.score_shard.options, "max_retries", 0)
+    job_id = "job-1"
+    get_job_store().create(job_id, "full")
+
+    worker = dramatiq.Worker(broker, worker_timeout=50)
+    worker.start()
+    try:
+        recalculate.recalculate_scores("full", None, job_id)
+        broker.join(recalculate.score_shard.queue_name)
+        worker.join()
+    finally:
+        worker.stop()
+
+    record = get_job_store().get(job_id)
+    assert record["state"] == "failed" and "extractor crashed" in record["error"]
+    assert get_job_store().acquire_running("full", "next-job", 60)
@@ -20,3 +20,80 @@ def test_rbac_blocks_non_admin(client, limited_headers):
         headers=limited_headers,
     )
     assert response.status_code == 403
+
+
+def test_list_users_paginates_by_id(client, authorized_headers):
+    for index in range(3):
+        payload = {"email": f"user{index}@example.com", "full_name": f"User {index}"}
+        client.post("/api/users", json=payload, headers=authorized_headers)
+
+    first = client.get("/api/users", params={"limit": 2}, headers=authorized_headers)
+    assert [user["email"] for user in first.json()] == ["user0@example.com", "user1@example.com"]
+    assert 'rel="next"' in first.headers["Link"]
+
+    after = first.json()[-1]["id"]
+    second = client.get("/api/users", params={"limit": 2, "after": after}, headers=authorized_headers)
+    assert [user["email"] for user in second.json()] == ["user2@example.com"]
+    assert "Link" not in second.headers
+
+
+def test_export_users_streams_ndjson_and_json(client, authorized_headers):
+    import json
+
+    for index in range(3):
+        payload = {"email": f"export{index}@example.com", "full_name": f"Export {index}"}
+        client.post("/api/users", json=payload, headers=authorized_headers)
+
+    ndjson = client.get("/api/users", params={"export": "ndjson"}, headers=authorized_headers)
+    assert ndjson.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in ndjson.text.splitlines()]
+    assert [line["email"] for line in lines][-1] == "export2@example.com"
+
+    array = client.get("/api/users", params={"export": "json"}, headers=authorized_headers)
+    assert array.json() == lines
+
+
+def test_import_users_reports_conflicts_per_row(client, authorized_headers):
+    client.post(
+        "/api/users",
+        json={"email": "existing@example.com", "full_name": "Existing"},
+        headers=authorized_headers,
+    )
+    rows = [
+        {"email": "new1@example.com", "full_name": "New 1"},
+        {"email": "existing@example.com", "full_name": "Again"},
+        {"email": "not-an-email", "full_name": "Broken"},
+        {"email": "new1@example.com", "full_name": "Duplicate"},
+        {"email": "new2@example.com", "full_name": "New 2"},
+    ]
+    response = client.post("/api/users/import", json=rows, headers=authorized_headers)
+    assert response.status_code == 200
+    report = response.json()
+    assert report["received"] == 5
+    assert report["inserted"] == 2
+    assert [issue["row"] for issue in report["conflicts"]] == [1, 3]
+    assert [issue["row"] for issue in report["invalid"]] == [2]
+
+
+def test_import_users_accepts_csv(client, authorized_headers):
+    body = "email,full_name\ncsv1@example.com,Csv One\ncsv2@example.com,Csv Two\n"
+    headers = {**authorized_headers, "Content-Type": "text/csv"}
+    response = client.post("/api/users/import", content=body, headers=headers)
+    assert response.json()["inserted"] == 2
+
+    unsupported = client.post(
+        "/api/users/import", content=b"x", headers={**authorized_headers, "Content-Type": "text/plain"}
+    )
+    assert unsupported.status_code == 415
+
+
+def test_import_users_rejects_oversized_bodies(client, authorized_headers, monkeypatch):
+    from backend.app.core.config import get_settings
+
+    monkeypatch.setattr(get_settings(), "user_import_max_bytes", 64)
+    rows = [{"email": f"user{index}@example.com", "full_name": "User"} for index in range(5)]
+    response = client.post("/api/users/import", json=rows, headers=authorized_headers)
+
+    assert response.status_code == 413
+    listed = client.get("/api/users", headers=authorized_headers).json()
+    assert not any(user["email"].startswith("user") for user in listed)